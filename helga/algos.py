@@ -1,23 +1,35 @@
-from helga.ring import is_euclidean_domain, is_polynomial_ring, get_base_ring
+from helga.ring import is_euclidean_domain, is_field, is_polynomial_ring, get_base_ring
 from helga.polynomial import make_polynomial_ring, polynomial
 from fractions import Fraction
+from functools import lru_cache
+import math
+import operator
+import random
 
 
 def extended_ea(a, b, ring=int):
-    (old_r, r) = (a, b)
-    (old_s, s) = (ring(1), ring(0))
-    (old_t, t) = (ring(0), ring(1))
+    if is_polynomial_ring(ring) and is_field(get_base_ring(ring)):
+        # the gcd a * s + b * t is then monic
+        _, s, t = poly_xgcd(a, b)
+        return (s, t)
+
+    old_r, r = (a, b)
+    old_s, s = (ring(1), ring(0))
+    old_t, t = (ring(0), ring(1))
 
     while r != ring(0):
         q = old_r // r
-        (old_r, r) = (r, old_r - q * r)
-        (old_s, s) = (s, old_s - q * s)
-        (old_t, t) = (t, old_t - q * t)
+        old_r, r = (r, old_r - q * r)
+        old_s, s = (s, old_s - q * s)
+        old_t, t = (t, old_t - q * t)
 
     return (old_s, old_t)
 
 
 def gcd(a, b, ring=int):
+    if is_polynomial_ring(ring) and is_field(get_base_ring(ring)):
+        return _poly_gcd(a, b)
+
     if is_euclidean_domain(ring):
         u, v = extended_ea(a, b, ring=ring)
         return a * u + b * v
@@ -28,14 +40,256 @@ def gcd(a, b, ring=int):
     raise NotImplementedError
 
 
-def int_poly_gcd(a, b):
-    content_gcd = gcd(a.content(), b.content(), ring=int)
-    primitive_gcd = gcd(
-        a.primitive_part().cast(Fraction),
-        b.primitive_part().cast(Fraction),
-        ring=make_polynomial_ring(Fraction),
+# int_poly_gcd computes gcds modulo primes just below 2^INT_POLY_GCD_PRIME_BITS. Large
+# primes mean few of them are needed, and make unlucky ones (which divide a resultant of
+# the inputs) rare.
+INT_POLY_GCD_PRIME_BITS = 62
+
+
+def _descending_primes(start):
+    n = start - 1
+    while n > 2:
+        if is_prime(n):
+            yield n
+        n -= 1
+
+
+def _gcd_mod_prime(a, b, p):
+    # the monic gcd of two integer polynomials reduced mod p, as dense coefficient lists
+    from helga.finite_field import make_prime_field
+
+    F_p = make_prime_field(p)
+    g = _poly_gcd(polynomial(a, F_p), polynomial(b, F_p))
+    return [int(c) for c in _dense_coefficients(g, g.degree + 1, F_p(0))]
+
+
+def _exact_quotient(f, g):
+    # f / g for dense integer coefficient lists, or None if g does not divide f in Z[x]
+    remainder = list(f)
+    lead = g[-1]
+    quotient = [0] * (len(f) - len(g) + 1)
+    for i in reversed(range(len(quotient))):
+        q, r = divmod(remainder[i + len(g) - 1], lead)
+        if r:
+            return None
+        quotient[i] = q
+        if q:
+            for j, c in enumerate(g):
+                remainder[i + j] -= q * c
+    if any(remainder[: len(g) - 1]):
+        return None
+    return quotient
+
+
+def _with_positive_lead(f):
+    if f and f.coefficients[f.degree] < 0:
+        return -f
+    return f
+
+
+def int_poly_gcd(a, b, processes=None):
+    """The gcd of two integer polynomials, with a positive leading coefficient.
+
+    The primitive parts are reduced modulo several large primes, their monic gcds over
+    F_p are scaled by the gcd of the leading coefficients, and the images are combined
+    with the Chinese remainder theorem until the result divides both polynomials. This
+    avoids the coefficient growth of Euclid's algorithm over the rationals.
+
+    With processes, the gcds modulo different primes are computed that many at a time
+    on a process pool.
+    """
+
+    if not a or not b:
+        return _with_positive_lead(a if b.degree < 0 else b)
+
+    content_gcd = math.gcd(a.content(), b.content())
+    a, b = a.primitive_part(), b.primitive_part()
+    if a.degree < b.degree:
+        a, b = b, a
+    if b.degree == 0:
+        return polynomial(content_gcd, int)
+
+    # the leading coefficient of the gcd divides lead, so lead times the monic gcd mod p
+    # is the image of an integer multiple of the gcd
+    lead = math.gcd(a.coefficients[a.degree], b.coefficients[b.degree])
+    dense_a = _dense_coefficients(a, a.degree + 1, 0)
+    dense_b = _dense_coefficients(b, b.degree + 1, 0)
+    primes = (
+        p
+        for p in _descending_primes(2**INT_POLY_GCD_PRIME_BITS)
+        if lead % p and dense_a[-1] % p and dense_b[-1] % p
     )
-    return content_gcd * primitive_gcd.cast(int)
+
+    def images():
+        if processes is None:
+            for p in primes:
+                yield p, _gcd_mod_prime(dense_a, dense_b, p)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(processes) as executor:
+            while True:
+                batch = [next(primes) for _ in range(processes)]
+                gcds = executor.map(
+                    _gcd_mod_prime,
+                    [dense_a] * processes,
+                    [dense_b] * processes,
+                    batch,
+                )
+                yield from zip(batch, gcds)
+
+    degree = b.degree + 1
+    for p, image in images():
+        if len(image) - 1 > degree:
+            # p divides the resultant of a / g and b / g
+            continue
+        if len(image) == 1:
+            return polynomial(content_gcd, int)
+
+        image = [c * lead % p for c in image]
+        if len(image) - 1 < degree:
+            # every earlier prime was unlucky
+            degree = len(image) - 1
+            modulus, combined = p, image
+        else:
+            scale = pow(modulus, -1, p)
+            combined = [
+                c + modulus * ((d - c) * scale % p) for c, d in zip(combined, image)
+            ]
+            modulus *= p
+
+        half = modulus // 2
+        candidate = polynomial(
+            [c - modulus if c > half else c for c in combined], int
+        ).primitive_part()
+        dense_candidate = _dense_coefficients(candidate, degree + 1, 0)
+        if (
+            _exact_quotient(dense_b, dense_candidate) is not None
+            and _exact_quotient(dense_a, dense_candidate) is not None
+        ):
+            return content_gcd * _with_positive_lead(candidate)
+
+
+# poly_xgcd and half_gcd take classical Euclidean steps on polynomials of degree below
+# this, and recurse on halves of the coefficients above it.
+HALF_GCD_THRESHOLD = 64
+
+
+def _monic(f):
+    return f * (f.ring(1) / f.coefficients[f.degree])
+
+
+def _shift_down(f, k):
+    # f divided by x^k, discarding the remainder
+    return polynomial(
+        {degree - k: c for degree, c in f.coefficients.items() if degree >= k}, f.ring
+    )
+
+
+def _matrix_mul(lhs, rhs):
+    # 2x2 matrices of polynomials, as tuples (m00, m01, m10, m11)
+    a, b, c, d = lhs
+    e, f, g, h = rhs
+    return (a * e + b * g, a * f + b * h, c * e + d * g, c * f + d * h)
+
+
+def _matrix_apply(matrix, a, b):
+    m00, m01, m10, m11 = matrix
+    return m00 * a + m01 * b, m10 * a + m11 * b
+
+
+def _euclidean_step(matrix, q):
+    # the product of [[0, 1], [1, -q]] and the matrix
+    m00, m01, m10, m11 = matrix
+    return (m10, m11, m00 - q * m10, m01 - q * m11)
+
+
+def half_gcd(a, b):
+    """Compute the first half of the remainder sequence of a and b, with the half-GCD
+    algorithm, for polynomials over a field with deg a > deg b.
+
+    Returns a matrix M, as a tuple (m00, m01, m10, m11), and the quotients of the
+    Euclidean algorithm that it is the product of. The remainders r, s given by
+    M (a, b) are consecutive in the remainder sequence, with
+    deg r >= ceil(deg a / 2) > deg s.
+
+    The quotients only depend on the leading coefficients of a and b, so the first
+    half of them is found recursively from the top halves of a and b, and the rest
+    from the top halves of what is left after applying them.
+    """
+
+    one = polynomial(1, a.ring)
+    zero = polynomial({}, a.ring)
+    matrix = (one, zero, zero, one)
+    m = (a.degree + 1) // 2
+    if b.degree < m:
+        return matrix, []
+
+    if a.degree < HALF_GCD_THRESHOLD:
+        quotients = []
+        while b.degree >= m:
+            q, r = a / b
+            matrix = _euclidean_step(matrix, q)
+            quotients.append(q)
+            a, b = b, r
+        return matrix, quotients
+
+    matrix, quotients = half_gcd(_shift_down(a, m), _shift_down(b, m))
+    a, b = _matrix_apply(matrix, a, b)
+    if b.degree < m:
+        return matrix, quotients
+
+    q, r = a / b
+    matrix = _euclidean_step(matrix, q)
+    quotients.append(q)
+    a, b = b, r
+    if b.degree < m:
+        return matrix, quotients
+
+    k = 2 * m - a.degree
+    rest, rest_quotients = half_gcd(_shift_down(a, k), _shift_down(b, k))
+    return _matrix_mul(rest, matrix), quotients + rest_quotients
+
+
+def poly_xgcd(a, b, quotients=False):
+    """Extended Euclidean algorithm for polynomials over a field.
+
+    Returns (g, s, t), where g is the monic gcd of a and b and g = s * a + t * b. With
+    quotients set, the list of the quotients of the Euclidean algorithm is returned
+    too, as a fourth item.
+
+    Polynomials of degree at least HALF_GCD_THRESHOLD are reduced with half_gcd, in
+    time quasi-linear in the degree, rather than quadratic.
+    """
+
+    one = polynomial(1, a.ring)
+    zero = polynomial({}, a.ring)
+    matrix = (one, zero, zero, one)
+    sequence = []
+    while b:
+        if a.degree > b.degree >= HALF_GCD_THRESHOLD:
+            step, step_quotients = half_gcd(a, b)
+            matrix = _matrix_mul(step, matrix)
+            sequence += step_quotients
+            a, b = _matrix_apply(step, a, b)
+            if not b:
+                break
+
+        q, r = a / b
+        matrix = _euclidean_step(matrix, q)
+        sequence.append(q)
+        a, b = b, r
+
+    s, t = matrix[0], matrix[1]
+    if a:
+        scale = a.ring(1) / a.coefficients[a.degree]
+        a, s, t = a * scale, s * scale, t * scale
+    result = (a, s, t)
+    if quotients:
+        return result + (sequence,)
+    return result
+
 
 def inv(n, p):
     coeff = extended_ea(n, p)[0]
@@ -43,59 +297,999 @@ def inv(n, p):
         coeff += p
     return coeff
 
+
+def batch_inverse(elements):
+    """Invert every element of a list of non-zero field elements at once.
+
+    Montgomery's trick inverts the product of all the elements and recovers each
+    inverse from it and the prefix products, which costs a single inversion and about
+    3N multiplications.
+    """
+
+    elements = list(elements)
+    if not elements:
+        return []
+
+    # prefix[i] = elements[0] * ... * elements[i]
+    prefix = []
+    product = None
+    for element in elements:
+        if not element:
+            raise ZeroDivisionError("zero has no inverse")
+        product = element if product is None else product * element
+        prefix.append(product)
+
+    inverse = type(product)(1) / product
+    inverses = [None] * len(elements)
+    for i in reversed(range(1, len(elements))):
+        inverses[i] = inverse * prefix[i - 1]
+        inverse = inverse * elements[i]
+    inverses[0] = inverse
+
+    return inverses
+
+
+class CRTBasis:
+    """A fixed list of pairwise coprime moduli, for the Chinese remainder theorem.
+
+    The products of the moduli over ranges form a binary tree, whose root is the
+    product M of all of them. reduce takes remainders modulo the nodes from the root
+    down, and reconstruct combines residues from the leaves up, so a basis can be
+    built once and reused for any number of values. The moduli are integers, or
+    polynomials over a field if ring is their polynomial ring.
+    """
+
+    def __init__(self, moduli, ring=int):
+        self.ring = ring
+        self.moduli = list(moduli)
+        if not self.moduli:
+            raise ValueError("there must be at least one modulus")
+
+        level = self.moduli
+        self.levels = [level]
+        while len(level) > 1:
+            level = [
+                level[i] * level[i + 1] if i + 1 < len(level) else level[i]
+                for i in range(0, len(level), 2)
+            ]
+            self.levels.append(level)
+        self._weights = None
+
+    def __len__(self):
+        return len(self.moduli)
+
+    @property
+    def modulus(self):
+        return self.levels[-1][0]
+
+    def reduce(self, value):
+        """The residues of value modulo every modulus."""
+
+        remainders = [value % self.modulus]
+        for level in reversed(self.levels[:-1]):
+            remainders = [remainders[i // 2] % node for i, node in enumerate(level)]
+        return remainders
+
+    def _get_weights(self):
+        # 1 / (M / m) mod m for every modulus m. The cofactor M / m of a node is the
+        # cofactor of its parent times its sibling.
+        if self._weights is None:
+            cofactors = [self.ring(1)]
+            for level in reversed(self.levels[:-1]):
+                cofactors = [
+                    (
+                        cofactors[i // 2] % node * (level[i ^ 1] % node) % node
+                        if i ^ 1 < len(level)
+                        else cofactors[i // 2]
+                    )
+                    for i, node in enumerate(level)
+                ]
+
+            weights = []
+            for cofactor, modulus in zip(cofactors, self.moduli):
+                if self.ring is int:
+                    try:
+                        weights.append(pow(cofactor, -1, modulus))
+                    except ValueError:
+                        raise ValueError("moduli must be pairwise coprime") from None
+                else:
+                    g, s, _ = poly_xgcd(cofactor, modulus)
+                    if g.degree != 0:
+                        raise ValueError("moduli must be pairwise coprime")
+                    weights.append(s)
+            self._weights = weights
+        return self._weights
+
+    def reconstruct(self, residues, symmetric=False):
+        """The value modulo M with the given residues modulo every modulus.
+
+        Integers are returned in [0, M), or in (-M / 2, M / 2] if symmetric.
+        """
+
+        residues = list(residues)
+        if len(residues) != len(self.moduli):
+            raise ValueError("there must be as many residues as moduli")
+
+        # the value is the sum of r (M / m) / (M / m) mod m over the residues r and
+        # moduli m. Each node combines the sums of its children as
+        # left * right node + right * left node.
+        sums = [
+            residue * weight % modulus
+            for residue, weight, modulus in zip(
+                residues, self._get_weights(), self.moduli
+            )
+        ]
+        for level in self.levels[:-1]:
+            sums = [
+                (
+                    sums[i] * level[i + 1] + sums[i + 1] * level[i]
+                    if i + 1 < len(sums)
+                    else sums[i]
+                )
+                for i in range(0, len(sums), 2)
+            ]
+
+        value = sums[0] % self.modulus
+        if symmetric and self.ring is int and 2 * value > self.modulus:
+            value -= self.modulus
+        return value
+
+    def reduce_many(self, values):
+        """Residues of every value, lazily."""
+
+        for value in values:
+            yield self.reduce(value)
+
+    def reconstruct_many(self, rows, symmetric=False):
+        """Values for every list of residues, lazily."""
+
+        for residues in rows:
+            yield self.reconstruct(residues, symmetric)
+
+
+def crt(residues, moduli, ring=int):
+    """The value congruent to every residue modulo the matching modulus.
+
+    moduli can be a list or a CRTBasis, which should be built once and reused when
+    there are many values to reconstruct.
+    """
+
+    if not isinstance(moduli, CRTBasis):
+        moduli = CRTBasis(moduli, ring)
+    return moduli.reconstruct(residues)
+
+
+def rational_reconstruction(
+    a, m, ring=int, numerator_bound=None, denominator_bound=None
+):
+    """Find n / d congruent to a modulo m, with n and d small.
+
+    Over the integers |n| <= numerator_bound and 0 < d <= denominator_bound, which
+    both default to about sqrt(m / 2), and the result is a Fraction. For polynomials
+    over a field the bounds are on the degrees, default to splitting deg m - 1
+    between them, and the result is a pair (n, d) with d monic. Raises ValueError if
+    there is no such fraction with d coprime to m.
+    """
+
+    if ring is int:
+        size = abs
+        if numerator_bound is None:
+            numerator_bound = math.isqrt((m - 1) // 2)
+        if denominator_bound is None:
+            denominator_bound = numerator_bound
+    else:
+        size = operator.attrgetter("degree")
+        default = (m.degree - 1) // 2
+        if numerator_bound is None:
+            numerator_bound = default
+        if denominator_bound is None:
+            denominator_bound = m.degree - 1 - numerator_bound
+
+    # the remainders r and cofactors t of the extended Euclidean algorithm on m and a
+    # have r = t a mod m, and the first r within the bound gives the fraction
+    r0, r1 = m, a % m
+    t0, t1 = ring(0), ring(1)
+    if (
+        ring is not int
+        and numerator_bound == default
+        and m.degree >= HALF_GCD_THRESHOLD
+    ):
+        # that is the first remainder of degree below ceil(deg m / 2)
+        (_, _, m10, m11), _ = half_gcd(m, r1)
+        r1, t1 = m10 * m + m11 * r1, m11
+    else:
+        while size(r1) > numerator_bound:
+            q = r0 // r1
+            r0, r1 = r1, r0 - q * r1
+            t0, t1 = t1, t0 - q * t1
+
+    if ring is int:
+        if t1 < 0:
+            r1, t1 = -r1, -t1
+        if t1 > denominator_bound or math.gcd(t1, m) != 1:
+            raise ValueError("no fraction within the bounds")
+        return Fraction(r1, t1)
+
+    if t1.degree > denominator_bound or _poly_gcd(t1, m).degree != 0:
+        raise ValueError("no fraction within the bounds")
+    scale = t1.ring(1) / t1.coefficients[t1.degree]
+    return (r1 * scale, t1 * scale)
+
+
+def powmod(base, exponent, modulus):
+    """Compute base^exponent mod modulus by sliding-window exponentiation.
+
+    The base and modulus can be integers or polynomials from the same ring. Polynomials
+    are reduced after every step, so the exponent can be arbitrarily large.
+
+    The exponent is read in windows of up to w bits that start and end with a one, each
+    costing one multiplication by a precomputed odd power of the base. The width w
+    minimises the estimated number of multiplications, about n / (w + 1) + 2^(w - 1)
+    for an exponent of n bits.
+    """
+
+    if isinstance(base, int):
+        return pow(base, exponent, modulus)
+
+    if exponent < 0:
+        raise ValueError("exponent must be non-negative")
+
+    bits = bin(exponent)[2:]
+    width = min(range(1, 8), key=lambda w: len(bits) / (w + 1) + 2 ** (w - 1))
+
+    base = base % modulus
+    odd_powers = [base]
+    if width > 1:
+        square = base * base % modulus
+        for _ in range(2 ** (width - 1) - 1):
+            odd_powers.append(odd_powers[-1] * square % modulus)
+
+    result = base.__class__(1) % modulus
+    i = 0
+    while i < len(bits):
+        if bits[i] == "0":
+            result = result * result % modulus
+            i += 1
+            continue
+
+        j = min(i + width, len(bits))
+        while bits[j - 1] == "0":
+            j -= 1
+        for _ in range(j - i):
+            result = result * result % modulus
+        result = result * odd_powers[int(bits[i:j], 2) // 2] % modulus
+        i = j
+
+    return result
+
+
+def frobenius(h, f):
+    """Compute h^q mod f, where h and f are polynomials over F_q.
+
+    For small q this uses h(x)^q = h(x^q), which holds because every coefficient c of h
+    satisfies c^q = c. Otherwise it falls back to powmod.
+    """
+
+    F_q = h.ring
+    q = F_q.characteristic**F_q.degree
+    if q >= 8:
+        return powmod(h, q, f)
+
+    coefficients = {degree * q: c for degree, c in h.coefficients.items()}
+    return polynomial(coefficients, F_q) % f
+
+
+# is_irreducible rejects polynomials with a factor of at most this degree as soon as the
+# corresponding power of x has been computed, before completing Rabin's test.
+SMALL_FACTOR_DEGREE = 8
+
+
 def is_irreducible(f):
+    """Test whether a polynomial over a finite field is irreducible, with Rabin's test.
+
+    A polynomial f of degree n over F_q is irreducible if and only if f divides
+    x^(q^n) - x and is coprime to x^(q^(n/r)) - x for every prime r dividing n. The
+    powers x^(q^k) mod f are found by raising the previous one to the q-th power, by
+    modular composition when q is large.
+    """
+
     n = f.degree
-    q = f.ring.characteristic
+    if n < 1:
+        return False
+
     F_q = f.ring
-    factors = list(set(prime_factors(n)))
-    for i in range(len(factors)):
-        n_i = n / factors[i]
-        h = polynomial({q**n_i: 1, 1: -1}, F_q) % f
-        g = gcd(f, h, ring=make_polynomial_ring(F_q))
-        if g.degree != 0:
-            return False
-    g = polynomial({q**n: 1, 1: -1}, F_q) % f
-    if g == polynomial(0, F_q):
-        return True
-    return False
+    q = F_q.characteristic**F_q.degree
+    ring = make_polynomial_ring(F_q)
+    x = polynomial({1: 1}, F_q) % f
+
+    # x^(q^k) - x is the product of the irreducible polynomials whose degree divides k,
+    # so a gcd with it finds factors of degree k. Checking small k first rejects most
+    # reducible polynomials early.
+    checks = set(range(1, min(SMALL_FACTOR_DEGREE, n // 2) + 1))
+    checks.update(n // factor for factor in prime_factors(n))
+
+    # h = x^(q^k) mod f
+    frobenius_map = _frobenius_map(f)
+    h = x
+    for k in range(1, n + 1):
+        h = frobenius_map(h)
+        if k in checks and k < n:
+            g = gcd(f, h - x, ring=ring)
+            if g.degree != 0:
+                return False
+
+    return h == x
+
+
+def _poly_gcd(a, b):
+    # the monic gcd of two polynomials over a field
+    if min(a.degree, b.degree) >= HALF_GCD_THRESHOLD:
+        return poly_xgcd(a, b)[0]
+
+    while b:
+        a, b = b, a % b
+    if a:
+        return _monic(a)
+    return a
+
+
+def _pth_root(f):
+    # over F_q, a polynomial whose derivative is zero is g(x^p) = h(x)^p, where every
+    # coefficient of h is the p-th root c^(q / p) of the matching coefficient of g
+    F_q = f.ring
+    p = F_q.characteristic
+    root = p ** (F_q.degree - 1)
+    return polynomial(
+        {degree // p: c**root for degree, c in f.coefficients.items()}, F_q
+    )
+
+
+def _random_polynomial(F_q, n):
+    p = F_q.characteristic
+    if F_q.degree == 1:
+        coefficients = [F_q(random.randrange(p)) for _ in range(n)]
+    else:
+        coefficients = [
+            F_q([random.randrange(p) for _ in range(F_q.degree)]) for _ in range(n)
+        ]
+    return polynomial(coefficients, F_q)
+
+
+def _dense_coefficients(h, length, zero):
+    vec = [zero] * length
+    for degree, c in h.coefficients.items():
+        vec[degree] = c
+    return vec
+
+
+def _modular_composer(xi, f):
+    """Return a function computing g(xi) mod f, for polynomials g over a field.
+
+    This is the baby-step giant-step modular composition of Brent and Kung. With m
+    about sqrt(deg f), the powers xi^0, ..., xi^(m-1) are computed once, and g(xi) is
+    a polynomial in xi^m whose coefficients are linear combinations of them. A
+    composition then takes about m products modulo f.
+    """
+
+    F_q = f.ring
+    n = f.degree
+    m = math.isqrt(n - 1) + 1 if n > 1 else 1
+    powers = [polynomial({0: 1}, F_q) % f]
+    for _ in range(m):
+        powers.append(powers[-1] * xi % f)
+    giant = powers.pop()
+
+    # over a prime field the linear combinations are taken on integers
+    if F_q.degree == 1:
+        zero, modulus = 0, F_q.characteristic
+    else:
+        zero, modulus = F_q(0), None
+
+    def raw_coefficients(h, length):
+        vec = _dense_coefficients(h, length, F_q(0))
+        if modulus is not None:
+            vec = [int(c) for c in vec]
+        return vec
+
+    rows = list(zip(*(raw_coefficients(power, n) for power in powers)))
+
+    def compose(g):
+        g = g % f
+        if g.degree < 1:
+            return g
+
+        coefficients = raw_coefficients(g, g.degree + 1)
+        blocks = []
+        for start in range(0, len(coefficients), m):
+            chunk = coefficients[start : start + m]
+            if modulus is None:
+                block = [sum(map(operator.mul, row, chunk), zero) for row in rows]
+            else:
+                block = [sum(map(operator.mul, row, chunk)) % modulus for row in rows]
+            blocks.append(polynomial(block, F_q))
+
+        # Horner's rule in xi^m
+        result = blocks.pop()
+        while blocks:
+            result = (result * giant + blocks.pop()) % f
+        return result
+
+    return compose
+
+
+def _frobenius_map(f):
+    """Return a function computing h^q mod f, for polynomials h over F_q.
+
+    As h^q = h(x^q), this is a modular composition with x^q mod f, as proposed for
+    factorisation by von zur Gathen and Shoup. Composition takes about sqrt(deg f)
+    products modulo f, against about log2(q) for powmod, so it is only used when q
+    has more bits than that.
+    """
+
+    F_q = f.ring
+    q = F_q.characteristic**F_q.degree
+    n = f.degree
+    if q < 8 or q.bit_length() <= math.isqrt(max(n - 1, 0)) + 1:
+        return lambda h: frobenius(h, f)
+
+    x = polynomial({1: 1}, F_q) % f
+    return _modular_composer(powmod(x, q, f), f)
+
+
+def square_free_decomposition(f):
+    """Decompose a polynomial over a finite field into square-free factors.
+
+    Returns a list of pairs (g, k), where the g are monic, square-free and coprime, and
+    f is its leading coefficient times the product of every g^k.
+    """
+
+    if f.degree < 1:
+        return []
+
+    f = _monic(f)
+    p = f.ring.characteristic
+    one = polynomial({0: 1}, f.ring)
+    result = []
+
+    derivative = f.derivative()
+    if not derivative:
+        return [(g, k * p) for g, k in square_free_decomposition(_pth_root(f))]
+
+    # c collects the factors whose multiplicity is a multiple of p, and w the product
+    # of the factors whose multiplicity is at least k
+    c = _poly_gcd(f, derivative)
+    w = f // c
+    k = 1
+    while w != one:
+        y = _poly_gcd(w, c)
+        z = w // y
+        if z != one:
+            result.append((z, k))
+        k += 1
+        w = y
+        c = c // y
+
+    if c != one:
+        result += [(g, j * p) for g, j in square_free_decomposition(_pth_root(c))]
+
+    return result
+
+
+def distinct_degree_factorization(f):
+    """Split a monic square-free polynomial over F_q by the degree of its factors.
+
+    Returns a list of pairs (g, d), sorted by d, where g is the product of the
+    irreducible factors of f of degree d.
+
+    This is the baby-step giant-step algorithm of Kaltofen and Shoup. An irreducible
+    polynomial of degree d divides x^(q^j) - x^(q^i) if and only if d divides j - i.
+    With l about sqrt(deg f / 2), the baby steps are x^(q^i) for i < l and the giant
+    steps x^(q^(l j)), and the product of the differences of giant step j with every
+    baby step collects the factors of degree l (j - 1) < d <= l j. Only about 2 l
+    powers of x are needed, rather than one for every degree.
+    """
+
+    n = f.degree
+    one = polynomial({0: 1}, f.ring)
+    x = polynomial({1: 1}, f.ring) % f
+    l = math.isqrt(max(n // 2 - 1, 0)) + 1
+
+    frobenius_map = _frobenius_map(f)
+    baby_steps = [x]
+    for _ in range(l):
+        baby_steps.append(frobenius_map(baby_steps[-1]))
+    giant_step = baby_steps.pop()
+    giant_map = _modular_composer(giant_step, f)
+
+    result = []
+    rest = f
+    j = 1
+    while 2 * (l * (j - 1) + 1) <= rest.degree:
+        interval = one
+        for baby_step in baby_steps:
+            interval = interval * (giant_step - baby_step) % f
+        g = _poly_gcd(rest, interval)
+        if g.degree > 0:
+            rest = rest // g
+            # the smallest degrees come first, so that a factor of degree d is not
+            # taken for one of degree a multiple of d
+            for i in reversed(range(l)):
+                if g.degree == 0:
+                    break
+                h = _poly_gcd(g, giant_step - baby_steps[i])
+                if h.degree > 0:
+                    result.append((h, l * j - i))
+                    g = g // h
+        j += 1
+        giant_step = giant_map(giant_step)
+
+    if rest.degree > 0:
+        result.append((rest, rest.degree))
+    return result
+
 
-def is_primitive_root(x, p):
-    # TODO: only check primes
-    for i in range(2, p - 1):
-        if pow(x, i, p) == 1:
-            return False
-    return True
+def equal_degree_factorization(f, d):
+    """Split a monic square-free polynomial over F_q whose irreducible factors all have
+    degree d, with the randomised algorithm of Cantor and Zassenhaus.
 
+    For a random a, the irreducible factors of f divide b = a^((q^d - 1) / 2) - 1 with
+    probability about 1/2 each, independently, so gcd(f, b) is usually a proper factor.
+    In characteristic 2 the trace a + a^2 + ... + a^(q^d / 2) plays the role of b. The
+    same b splits every factor of f found so far.
+    """
 
+    n = f.degree
+    if n <= d:
+        return [f]
+
+    F_q = f.ring
+    p = F_q.characteristic
+    q = p**F_q.degree
+    one = polynomial({0: 1}, F_q)
+
+    if p != 2:
+        # The norm a^(1 + q + ... + q^(d - 1)) is computed like a power, over the bits
+        # of d: if N_k is the norm for k and X_k = x^(q^k) mod f, then
+        # N_2k = N_k * N_k(X_k) and N_k+1 = N_k^q * a. The compositions with X_k do
+        # not depend on a, so they are prepared once.
+        frobenius_map = _frobenius_map(f)
+        bits = bin(d)[3:]
+        composers = []
+        x_power = frobenius_map(polynomial({1: 1}, F_q) % f)
+        for i, bit in enumerate(bits):
+            composers.append(_modular_composer(x_power, f))
+            if i + 1 < len(bits):
+                x_power = composers[-1](x_power)
+                if bit == "1":
+                    x_power = frobenius_map(x_power)
+
+    pending = [f]
+    result = []
+    while pending:
+        a = _random_polynomial(F_q, n) % f
+        if p == 2:
+            b = a
+            square = a
+            for _ in range(F_q.degree * d - 1):
+                square = square * square % f
+                b = b + square
+        else:
+            norm = a
+            for compose, bit in zip(composers, bits):
+                norm = norm * compose(norm) % f
+                if bit == "1":
+                    norm = frobenius_map(norm) * a % f
+
+        split = []
+        for g in pending:
+            # the power is taken modulo each factor, which is cheaper than modulo f
+            if p == 2:
+                h = _poly_gcd(g, b % g)
+            else:
+                h = _poly_gcd(g, powmod(norm, (q - 1) // 2, g) - one)
+            if 0 < h.degree < g.degree:
+                parts = (h, g // h)
+            else:
+                parts = (g,)
+            for part in parts:
+                if part.degree == d:
+                    result.append(part)
+                else:
+                    split.append(part)
+        pending = split
+
+    return result
+
+
+def factor(f):
+    """Factor a polynomial over a finite field into monic irreducible polynomials.
+
+    Returns a list of pairs (g, k), sorted by degree, such that f is its leading
+    coefficient times the product of every g^k.
+    """
+
+    result = []
+    for g, multiplicity in square_free_decomposition(f):
+        for h, d in distinct_degree_factorization(g):
+            for irreducible in equal_degree_factorization(h, d):
+                result.append((irreducible, multiplicity))
+
+    return sorted(result, key=lambda pair: (pair[0].degree, str(pair[0]), pair[1]))
+
+
+# Number of primes and fields whose primitive roots are kept for reuse.
+ORDER_CACHE_SIZE = 128
+
+
+def _unit_group(x, p):
+    # the order of the multiplicative group of F_p, or of the field of x if p is None,
+    # whether x is zero, and a test for x^k == 1
+    if p is not None:
+        x %= p
+        return p - 1, x == 0, lambda k: pow(x, k, p) == 1
+
+    F_q = type(x)
+    one = F_q(1)
+    return F_q.characteristic**F_q.degree - 1, x == F_q(0), lambda k: x**k == one
+
+
+def multiplicative_order(x, p=None):
+    """The smallest k > 0 with x^k = 1, for x modulo the prime p, or for an element x
+    of a finite field if p is None.
+
+    The order divides the group order q - 1, and is found by removing the prime factors
+    of q - 1 one at a time while x^k stays 1.
+    """
+
+    order, zero, is_one = _unit_group(x, p)
+    if zero:
+        raise ValueError("zero has no multiplicative order")
+
+    for factor in factorint(order):
+        while order % factor == 0 and is_one(order // factor):
+            order //= factor
+    return order
+
+
+def is_primitive_root(x, p=None):
+    """Whether x generates the multiplicative group modulo the prime p, or of the
+    finite field of x if p is None."""
+
+    order, zero, is_one = _unit_group(x, p)
+    if zero:
+        return False
+
+    # x generates the multiplicative group unless its order is a proper divisor of q - 1
+    return not any(is_one(order // factor) for factor in factorint(order))
+
+
+@lru_cache(maxsize=ORDER_CACHE_SIZE)
 def find_primitive_root(p):
-    for i in range(2, p - 1):
-        if is_primitive_root(i, p):
-            return i
+    """The smallest primitive root modulo the prime p, or a primitive element of the
+    finite field p if it is a field class. Raises ValueError if p is an int that is not
+    prime."""
+
+    if isinstance(p, int):
+        if not is_prime(p):
+            raise ValueError(f"{p} is not prime")
+        if p == 2:
+            return 1
+        for i in range(2, p):
+            if is_primitive_root(i, p):
+                return i
+
+    F_q = p
+    q = F_q.characteristic
+    for i in range(2, q**F_q.degree):
+        if F_q.degree == 1:
+            candidate = F_q(i)
+        else:
+            # the polynomial whose coefficients are the base q digits of i
+            candidate = F_q([i // q**k % q for k in range(F_q.degree)])
+        if is_primitive_root(candidate):
+            return candidate
+
+
+def primitive_root_of_unity(n, p):
+    """A primitive n-th root of unity modulo the prime p, or in the finite field p if
+    it is a field class, such as the root a number-theoretic transform of size n
+    needs."""
+
+    if isinstance(p, int):
+        order = p - 1
+    else:
+        order = p.characteristic**p.degree - 1
+    if n <= 0 or order % n:
+        raise ValueError(f"there is no primitive {n}-th root of unity")
+
+    g = find_primitive_root(p)
+    if isinstance(p, int):
+        return pow(g, order // n, p)
+    return g ** (order // n)
+
+
+# Number of (p, n, w) combinations whose twiddle factors are kept for reuse by ntt.
+TWIDDLE_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=TWIDDLE_CACHE_SIZE)
+def _bit_reversal(n):
+    bits = n.bit_length() - 1
+    return tuple(int(format(i, f"0{bits}b")[::-1], 2) if bits else 0 for i in range(n))
+
+
+@lru_cache(maxsize=TWIDDLE_CACHE_SIZE)
+def _twiddles(p, n, w):
+    """Twiddle factors for every stage of a transform of length n.
+
+    The factors for the stage that combines blocks of length 2h are w^(n/2h * k) for
+    k from 0 to h - 1.
+    """
+
+    powers = [1] * max(n // 2, 1)
+    for i in range(1, n // 2):
+        powers[i] = powers[i - 1] * w % p
+
+    stages = []
+    half = 1
+    while half < n:
+        stages.append(powers[:: n // (2 * half)][:half])
+        half *= 2
+    return tuple(stages)
+
+
+def _transform(vec, stages, p):
+    n = len(vec)
+    vec[:] = [vec[i] for i in _bit_reversal(n)]
+
+    half = 1
+    for twiddles in stages:
+        length = 2 * half
+        if half < n // length:
+            # short blocks: do the same butterfly in every block at once
+            for k, w in enumerate(twiddles):
+                even = vec[k::length]
+                odd = [x * w % p for x in vec[k + half :: length]]
+                vec[k::length] = [(x + y) % p for x, y in zip(even, odd)]
+                vec[k + half :: length] = [(x - y) % p for x, y in zip(even, odd)]
+        else:
+            for start in range(0, n, length):
+                middle = start + half
+                end = start + length
+                even = vec[start:middle]
+                odd = [x * w % p for x, w in zip(vec[middle:end], twiddles)]
+                vec[start:middle] = [(x + y) % p for x, y in zip(even, odd)]
+                vec[middle:end] = [(x - y) % p for x, y in zip(even, odd)]
+        half = length
+
+    return vec
+
+
+def ntt(vec, w, p):
+    """Number-theoretic transform of vec modulo p, in place.
+
+    The length of vec must be a power of two, and w must be a primitive root of unity
+    of that order modulo p.
+    """
+
+    return _transform(vec, _twiddles(p, len(vec), w), p)
+
+
+def inverse_ntt(vec, w, p):
+    """Inverse of ntt, in place."""
+
+    n = len(vec)
+    _transform(vec, _twiddles(p, n, pow(w, -1, p)), p)
+    scale = pow(n, -1, p)
+    vec[:] = [x * scale % p for x in vec]
+    return vec
+
+
+def ntt_batch(vecs, w, p, inverse=False):
+    """Transform vectors of the same length in place, sharing twiddle factors."""
+
+    if not vecs:
+        return vecs
+
+    n = len(vecs[0])
+    if inverse:
+        stages = _twiddles(p, n, pow(w, -1, p))
+        scale = pow(n, -1, p)
+    else:
+        stages = _twiddles(p, n, w)
+
+    for vec in vecs:
+        if len(vec) != n:
+            raise ValueError("vectors must all have the same length")
+        _transform(vec, stages, p)
+        if inverse:
+            vec[:] = [x * scale % p for x in vec]
+
+    return vecs
 
 
 def fft(vec, w, p):
-    k = len(vec)
-    if k == 1:
-        return vec
+    return ntt(list(vec), w, p)
 
-    even = fft(vec[::2], pow(w, 2, p), p)
-    odd = fft(vec[1::2], pow(w, 2, p), p)
 
-    bottom = [(even[i] + pow(w, i, p) * odd[i]) % p for i in range(k // 2)]
-    top = [(even[i] + pow(w, i + k // 2, p) * odd[i]) % p for i in range(k // 2)]
+# Miller-Rabin with the prime bases up to 37 is deterministic below this bound. Larger
+# numbers get the Baillie-PSW test: Miller-Rabin to base 2 and a strong Lucas test.
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+MILLER_RABIN_LIMIT = 318665857834031151167461
 
-    return bottom + top
+# Number of integers whose factorisations factorint keeps, for repeated queries such as
+# the order q^n - 1 of a field's multiplicative group.
+FACTOR_CACHE_SIZE = 1024
 
+# factorint divides by 2, 3, 5 and the numbers coprime to 30 below this before it
+# switches to Pollard's rho.
+TRIAL_DIVISION_LIMIT = 2**12
 
-def prime_factors(n):
-    i = 2
-    factors = []
-    while i * i <= n:
-        if n % i:
-            i += 1
+# Pollard's rho multiplies this many differences together before taking a gcd with n.
+POLLARD_BATCH = 128
+
+# Steps from one number coprime to 30 to the next, starting from 7.
+_WHEEL = (4, 2, 4, 2, 4, 6, 2, 6)
+
+
+def _is_strong_probable_prime(n, base):
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _jacobi(a, n):
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _is_strong_lucas_probable_prime(n):
+    # Selfridge's parameters: the first D of 5, -7, 9, -11, ... with (D / n) = -1,
+    # P = 1 and Q = (1 - D) / 4. A square n has no such D.
+    if math.isqrt(n) ** 2 == n:
+        return False
+    D = 5
+    while _jacobi(D, n) != -1:
+        D = -D - 2 if D > 0 else -D + 2
+    Q = (1 - D) // 4
+
+    d, s = n + 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    def half(x):
+        # x / 2 mod n
+        x %= n
+        return (x + n if x % 2 else x) // 2
+
+    # U_k, V_k and Q^k from k = 1, following the bits of d
+    U, V, Q_k = 1, 1, Q % n
+    for bit in bin(d)[3:]:
+        U, V = U * V % n, (V * V - 2 * Q_k) % n
+        Q_k = Q_k * Q_k % n
+        if bit == "1":
+            U, V = half(U + V), half(D * U + V)
+            Q_k = Q_k * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Q_k) % n
+        Q_k = Q_k * Q_k % n
+        if V == 0:
+            return True
+    return False
+
+
+def is_prime(n):
+    if n < 2:
+        return False
+    for base in MILLER_RABIN_BASES:
+        if n % base == 0:
+            return n == base
+
+    if n < MILLER_RABIN_LIMIT:
+        return all(_is_strong_probable_prime(n, base) for base in MILLER_RABIN_BASES)
+    return _is_strong_probable_prime(n, 2) and _is_strong_lucas_probable_prime(n)
+
+
+def _pollard_brent(n):
+    """A non-trivial factor of the odd composite n, with Pollard's rho and Brent's
+    cycle detection.
+
+    x -> x^2 + c mod n is iterated from y, comparing against the value at the last
+    power of two. The differences are multiplied together POLLARD_BATCH at a time, and
+    when a gcd is n the last batch is retraced one step at a time.
+    """
+
+    while True:
+        y, c = random.randrange(1, n), random.randrange(1, n)
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(POLLARD_BATCH, r - k)):
+                    y = (y * y + c) % n
+                    q = q * (x - y) % n
+                g = math.gcd(q, n)
+                k += POLLARD_BATCH
+            r *= 2
+
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(x - ys, n)
+        if g != n:
+            return g
+
+
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def _factorint(n):
+    factors = {}
+    for p in (2, 3, 5):
+        while n % p == 0:
+            n //= p
+            factors[p] = factors.get(p, 0) + 1
+
+    p = 7
+    i = 0
+    while p < TRIAL_DIVISION_LIMIT and p * p <= n:
+        while n % p == 0:
+            n //= p
+            factors[p] = factors.get(p, 0) + 1
+        p += _WHEEL[i]
+        i = (i + 1) % len(_WHEEL)
+
+    pending = [n] if n > 1 else []
+    while pending:
+        m = pending.pop()
+        if p * p > m or is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
         else:
-            n //= i
-            factors.append(i)
-    if n > 1:
-        factors.append(n)
-    return factors
+            d = _pollard_brent(m)
+            pending += [d, m // d]
+
+    return tuple(sorted(factors.items()))
+
+
+def factorint(n):
+    """The prime factorisation of n > 0, as a dict from primes to exponents in
+    increasing order of the primes.
+
+    Small factors are found by trial division, the rest by Pollard's rho, splitting
+    until every part is prime. Results are cached.
+    """
+
+    if n < 1:
+        raise ValueError("only positive integers can be factored")
+    return dict(_factorint(n))
+
+
+def prime_factors(n):
+    return [p for p, exponent in factorint(n).items() for _ in range(exponent)]
@@ -1,11 +1,80 @@
+from helga.algos import batch_inverse
 from helga.projective_geometry import ProjectivePoint
 from helga.ring import get_base_ring, is_field, get_characteristic, Q
 
+SCALAR_MULTIPLICATION_STRATEGIES = ("wnaf", "ladder", "fixed_base")
+
+# Largest number of points in a table built by EllipticCurvePoint.precompute.
+FIXED_BASE_TABLE_SIZE = 1024
+
+# multi_scalar_mul uses Pippenger's bucket method from this many points on, and
+# Straus's interleaved wNAF below it.
+PIPPENGER_THRESHOLD = 128
+
+
+def wnaf(n, width):
+    """Width-w non-adjacent form of a non-negative integer n, least significant first.
+
+    Every non-zero digit is odd with absolute value below 2^(width - 1), and any width
+    consecutive digits contain at most one non-zero digit.
+    """
+
+    digits = []
+    while n:
+        if n & 1:
+            digit = n & ((1 << width) - 1)
+            if digit >> (width - 1):
+                digit -= 1 << width
+            n -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        n >>= 1
+    return digits
+
+
+def fixed_base_window(bits, max_points):
+    # the widest window whose table, one row of 2^window - 1 points for every window of
+    # the scalar, fits in max_points
+    if bits > max_points:
+        raise ValueError(
+            f"a table for {bits}-bit scalars needs over {max_points} points"
+        )
+    window = 1
+    while -(-bits // (window + 1)) * ((1 << (window + 1)) - 1) <= max_points:
+        window += 1
+    return window
+
+
+def pippenger_window(count, bits):
+    # every window of the scalars costs one addition per point, plus two per bucket
+    # to sum the buckets
+    return min(
+        range(1, 24),
+        key=lambda window: -(-bits // window) * (count + (2 << window)),
+    )
+
+
+def wnaf_width(bits):
+    # the width minimising the additions for a scalar of this many bits, counting the
+    # 2^(width - 2) additions spent on precomputation
+    if bits <= 16:
+        return 2
+    if bits <= 64:
+        return 3
+    if bits <= 192:
+        return 4
+    return 5
+
 
 def make_elliptic_curve(a, b, generator=None, field=None):
     """Create an elliptic curve of the form y^2=x^3+ax+b.
-    
+
     The field characteristic must not be 2 or 3.
+
+    Points are kept in Jacobian coordinates (X, Y, Z), standing for the affine point
+    (X/Z^2, Y/Z^3), so that adding and doubling need no field inversions. The
+    normalised ProjectivePoint is only computed when point is read.
     """
 
     if field is None:
@@ -15,44 +84,121 @@ def make_elliptic_curve(a, b, generator=None, field=None):
     assert get_characteristic(field) not in (2, 3)
 
     point_at_infinity = ProjectivePoint((0, 1, 0), field)
+    zero = field(0)
+    one = field(1)
+    curve_a = field(a)
 
     class EllipticCurvePoint:
-        def __init__(self, point):
-            self.a = field(a)
-            self.b = field(b)
+        # _table is (window, bits, rows) with rows[i][j - 1] = j * 2^(window * i) * self
+        __slots__ = ("_x", "_y", "_z", "_point", "_table")
+        _generator = None
 
+        def __init__(self, point):
             if isinstance(point, self.__class__):
-                self.point = point.point
-            elif isinstance(point, ProjectivePoint):
-                self.point = point
-            elif isinstance(point, (tuple, list)):
-                self.point = ProjectivePoint(point, field)
-            else:
+                self._x, self._y, self._z = point._x, point._y, point._z
+                self._point = point._point
+                self._table = point._table
+                return
+
+            if isinstance(point, (tuple, list)):
+                point = ProjectivePoint(point, field)
+            elif not isinstance(point, ProjectivePoint):
                 raise ValueError("no known conversions")
 
+            # (x : y : z) is the affine point (x/z, y/z), which is (xz, yz^2, z) in
+            # Jacobian coordinates
+            x, y, z = point.raw_coords
+            if not z:
+                x, y = one, one
+            self._x, self._y, self._z = x * z, y * z * z, z
+            self._point = point
+            self._table = None
+
+        @classmethod
+        def _from_jacobian(cls, x, y, z):
+            result = cls.__new__(cls)
+            result._x, result._y, result._z = x, y, z
+            result._point = None
+            result._table = None
+            return result
+
         @classmethod
         def identity(cls):
             return cls(point_at_infinity)
-        
+
         @classmethod
         def generator(cls):
-            return cls(generator)
+            # the generator is shared so that its table is only built once
+            if cls._generator is None:
+                cls._generator = cls(generator)
+            return cls._generator
+
+        @property
+        def point(self):
+            if self._point is None:
+                if not self._z:
+                    self._point = point_at_infinity
+                else:
+                    z_inverse = one / self._z
+                    z_inverse_squared = z_inverse * z_inverse
+                    self._point = ProjectivePoint._from_normalized(
+                        (
+                            self._x * z_inverse_squared,
+                            self._y * z_inverse_squared * z_inverse,
+                            one,
+                        ),
+                        field,
+                    )
+            return self._point
 
         def is_inf(self):
             # Return if this point is the point at infinity
-            return self.point == point_at_infinity
+            return not self._z
 
         def __eq__(self, rhs):
             if not isinstance(rhs, self.__class__):
                 return NotImplemented
-            
-            return self.point == rhs.point
+
+            if self.is_inf() or rhs.is_inf():
+                return self.is_inf() and rhs.is_inf()
+
+            # compare X1/Z1^2 with X2/Z2^2 and Y1/Z1^3 with Y2/Z2^3 without dividing
+            lhs_zz = self._z * self._z
+            rhs_zz = rhs._z * rhs._z
+            return (
+                self._x * rhs_zz == rhs._x * lhs_zz
+                and self._y * rhs_zz * rhs._z == rhs._y * lhs_zz * self._z
+            )
 
         def __neg__(self):
             if self.is_inf():
                 return self
 
-            return self.__class__(ProjectivePoint((self.point[0], -self.point[1], self.point[2]), field))
+            return self._from_jacobian(self._x, -self._y, self._z)
+
+        def _double(self):
+            x, y, z = self._x, self._y, self._z
+            if not z:
+                return self
+            if not y:
+                return self.__class__(point_at_infinity)
+
+            yy = y * y
+            s = x * yy
+            s += s
+            s += s
+            xx = x * x
+            m = xx + xx + xx
+            if curve_a:
+                zz = z * z
+                m += curve_a * zz * zz
+            x3 = m * m - s - s
+            yyyy = yy * yy
+            yyyy += yyyy
+            yyyy += yyyy
+            yyyy += yyyy
+            z3 = y * z
+            return self._from_jacobian(x3, m * (s - x3) - yyyy, z3 + z3)
 
         def __add__(self, rhs):
             if not isinstance(rhs, self.__class__):
@@ -64,32 +210,324 @@ def make_elliptic_curve(a, b, generator=None, field=None):
             if rhs.is_inf():
                 return self
 
-            if self.point[0] == rhs.point[0]:
-                if self.point[1] == -rhs.point[1]:
-                    return self.__class__(point_at_infinity)
+            if rhs is self:
+                return self._double()
 
-                # tangent line
-                m = (field(3)*self.point[0]**2 + self.a) / (field(2) * self.point[1])
+            x1, y1, z1 = self._x, self._y, self._z
+            x2, y2, z2 = rhs._x, rhs._y, rhs._z
+
+            z1z1 = z1 * z1
+            u2 = x2 * z1z1
+            s2 = y2 * z1 * z1z1
+            if z2 == one:
+                # mixed addition with an affine point
+                u1, s1 = x1, y1
             else:
-                # secant line
-                m = (self.point[1] - rhs.point[1]) / (self.point[0] - rhs.point[0])
+                z2z2 = z2 * z2
+                u1 = x1 * z2z2
+                s1 = y1 * z2 * z2z2
 
-            x = m**2 - self.point[0] - rhs.point[0]
-            y = -self.point[1] + m*(self.point[0] - x)
+            h = u2 - u1
+            r = s2 - s1
+            if not h:
+                if not r:
+                    # tangent line
+                    return self._double()
+                return self.__class__(point_at_infinity)
 
-            return self.__class__(ProjectivePoint((x, y, field(1)), field))
+            # secant line
+            hh = h * h
+            hhh = h * hh
+            v = u1 * hh
+            x3 = r * r - hhh - v - v
+            y3 = r * (v - x3) - s1 * hhh
+            z3 = z1 * h if z2 == one else z1 * z2 * h
+            return self._from_jacobian(x3, y3, z3)
 
         def __mul__(self, n):
-            n = int(n)
+            return self.multiply(n)
+
+        def multiply(self, n, strategy=None):
+            """Compute n * self.
+
+            The strategy is one of SCALAR_MULTIPLICATION_STRATEGIES:
+            - "wnaf": double for every digit of the width-w NAF of n, adding a
+              precomputed odd multiple of self for every non-zero digit.
+            - "ladder": the Montgomery ladder, which does one addition and one doubling
+              for every bit of n whatever its value.
+            - "fixed_base": add one entry of the table built by precompute for every
+              window of n, with no doublings.
+            By default, fixed_base is used if self has a table covering n, and wnaf
+            otherwise. The table of the generator is built the first time it is used.
+            """
+
+            strategies = SCALAR_MULTIPLICATION_STRATEGIES
+            if strategy is not None and strategy not in strategies:
+                raise ValueError(f"unknown strategy: {strategy}")
 
+            n = int(n)
             if n < 0:
-                return -self * -n
-            elif n == 0:
+                return -self.multiply(-n, strategy)
+            if n == 0 or self.is_inf():
                 return self.__class__.identity()
-            elif n % 2 == 0:
-                return (self + self) * (n / 2)
-            else:
-                return self + self * (n - 1)
+
+            if strategy in (None, "fixed_base"):
+                # the generator's table is skipped over the rationals, which have no
+                # default size, and if even 1-bit windows of that size would not fit
+                characteristic = get_characteristic(field)
+                if (
+                    self._table is None
+                    and self is self.__class__._generator
+                    and characteristic
+                    and characteristic.bit_length() + 1 <= FIXED_BASE_TABLE_SIZE
+                ):
+                    self.precompute()
+                if self._table is not None and n.bit_length() <= self._table[1]:
+                    return self._fixed_base_multiply(n)
+                if strategy == "fixed_base":
+                    raise ValueError("no precomputed table covers the scalar")
+
+            if strategy == "ladder":
+                return self._ladder(n)
+            return self._wnaf_multiply(n)
+
+        def precompute(self, bits=None, max_points=None):
+            """Build a table for multiplying self by scalars of up to bits bits.
+
+            bits defaults to one more than the size of the field characteristic, which
+            covers the order of the curve. The table holds at most max_points points,
+            FIXED_BASE_TABLE_SIZE by default, and the window is chosen as wide as that
+            allows. Raises ValueError if even a 1-bit window needs more points. Returns
+            self.
+            """
+
+            if bits is None:
+                characteristic = get_characteristic(field)
+                if not characteristic:
+                    raise ValueError("bits is needed for curves over the rationals")
+                bits = characteristic.bit_length() + 1
+            if max_points is None:
+                max_points = FIXED_BASE_TABLE_SIZE
+
+            window = fixed_base_window(bits, max_points)
+            length = (1 << window) - 1
+            entries = []
+            base = self
+            for _ in range(-(-bits // window)):
+                entries.append(base)
+                for _ in range(length - 1):
+                    entries.append(entries[-1] + base)
+                for _ in range(window):
+                    base = base._double()
+
+            # normalised entries have Z = 1 and take the cheaper mixed addition
+            entries = self.normalize_all(entries)
+            rows = [entries[i : i + length] for i in range(0, len(entries), length)]
+            self._table = (window, bits, rows)
+            return self
+
+        def _fixed_base_multiply(self, n):
+            window, _, rows = self._table
+            mask = (1 << window) - 1
+            result = self.__class__.identity()
+            for row in rows:
+                if not n:
+                    break
+                digit = n & mask
+                if digit:
+                    result = result + row[digit - 1]
+                n >>= window
+            return result
+
+        @classmethod
+        def normalize_all(cls, points):
+            """Return the points with Z = 1, using a single inversion for all of them.
+
+            Their normalised ProjectivePoints are filled in as well.
+            """
+
+            points = list(points)
+            pending = [point for point in points if point._z and point._z != one]
+            inverses = batch_inverse([point._z for point in pending])
+            normalized = {}
+            for point, z_inverse in zip(pending, inverses):
+                z_inverse_squared = z_inverse * z_inverse
+                x = point._x * z_inverse_squared
+                y = point._y * z_inverse_squared * z_inverse
+                normalized[id(point)] = cls._from_affine(x, y)
+            return [normalized.get(id(point), point) for point in points]
+
+        @classmethod
+        def _from_affine(cls, x, y):
+            result = cls._from_jacobian(x, y, one)
+            result._point = ProjectivePoint._from_normalized((x, y, one), field)
+            return result
+
+        @classmethod
+        def batch_add(cls, lhs_points, rhs_points):
+            """Add two lists of points pairwise in affine coordinates.
+
+            The points are normalised, and the slopes of all the sums are found, with
+            one inversion each. The sums are returned with Z = 1.
+            """
+
+            lhs_points = list(lhs_points)
+            rhs_points = list(rhs_points)
+            if len(lhs_points) != len(rhs_points):
+                raise ValueError("lhs_points and rhs_points must have the same length")
+
+            points = cls.normalize_all(lhs_points + rhs_points)
+            pairs = list(zip(points[: len(lhs_points)], points[len(lhs_points) :]))
+
+            # the numerator and denominator of the slope of every sum that is finite
+            # and does not involve the point at infinity
+            slopes = {}
+            for i, (lhs, rhs) in enumerate(pairs):
+                if lhs.is_inf() or rhs.is_inf():
+                    continue
+                if lhs._x != rhs._x:
+                    # secant line
+                    slopes[i] = (rhs._y - lhs._y, rhs._x - lhs._x)
+                elif lhs._y == rhs._y and lhs._y:
+                    # tangent line
+                    xx = lhs._x * lhs._x
+                    slopes[i] = (xx + xx + xx + curve_a, lhs._y + lhs._y)
+
+            inverses = batch_inverse([slope[1] for slope in slopes.values()])
+            sums = []
+            for i, (lhs, rhs) in enumerate(pairs):
+                if lhs.is_inf():
+                    sums.append(rhs)
+                elif rhs.is_inf():
+                    sums.append(lhs)
+                elif i not in slopes:
+                    sums.append(cls.identity())
+                else:
+                    sums.append(None)
+            for (i, (numerator, _)), inverse in zip(slopes.items(), inverses):
+                lhs, rhs = pairs[i]
+                m = numerator * inverse
+                x = m * m - lhs._x - rhs._x
+                sums[i] = cls._from_affine(x, m * (lhs._x - x) - lhs._y)
+            return sums
+
+        @classmethod
+        def multi_scalar_mul(cls, points, scalars):
+            """Compute the sum of n * point over pairs of points and scalars.
+
+            Small batches use Straus's method, which shares the doublings of the
+            width-w NAF multiplications between all the points. From
+            PIPPENGER_THRESHOLD points on, Pippenger's method sorts the points into
+            buckets by each window of their scalars instead, so that the cost per
+            point falls as the batch grows.
+            """
+
+            points = list(points)
+            scalars = [int(n) for n in scalars]
+            if len(points) != len(scalars):
+                raise ValueError("points and scalars must have the same length")
+
+            pairs = []
+            for point, n in zip(points, scalars):
+                if n < 0:
+                    point, n = -point, -n
+                if n and not point.is_inf():
+                    pairs.append((point, n))
+
+            if not pairs:
+                return cls.identity()
+            if len(pairs) < PIPPENGER_THRESHOLD:
+                return cls._straus(pairs)
+            return cls._pippenger(pairs)
+
+        @classmethod
+        def _straus(cls, pairs):
+            bits = max(n.bit_length() for _, n in pairs)
+            width = wnaf_width(bits)
+            count = 1 << (width - 2)
+            multiples = []
+            for point, _ in pairs:
+                multiples.extend(point._odd_multiples(count))
+            multiples = cls.normalize_all(multiples)
+
+            expansions = []
+            for i, (_, n) in enumerate(pairs):
+                odd = multiples[i * count : (i + 1) * count]
+                expansions.append((wnaf(n, width), odd, [-point for point in odd]))
+
+            result = cls.identity()
+            for i in reversed(range(bits + 1)):
+                result = result._double()
+                for digits, multiples, negatives in expansions:
+                    if i < len(digits):
+                        digit = digits[i]
+                        if digit > 0:
+                            result = result + multiples[digit >> 1]
+                        elif digit < 0:
+                            result = result + negatives[-digit >> 1]
+            return result
+
+        @classmethod
+        def _pippenger(cls, pairs):
+            bits = max(n.bit_length() for _, n in pairs)
+            window = pippenger_window(len(pairs), bits)
+            mask = (1 << window) - 1
+            identity = cls.identity()
+
+            result = identity
+            for shift in reversed(range(0, bits, window)):
+                for _ in range(window):
+                    result = result._double()
+
+                # buckets[j - 1] is the sum of the points whose digit is j
+                buckets = [identity] * mask
+                for point, n in pairs:
+                    digit = n >> shift & mask
+                    if digit:
+                        buckets[digit - 1] = buckets[digit - 1] + point
+
+                # sum(j * buckets[j - 1]) as a sum of suffix sums
+                running = identity
+                total = identity
+                for bucket in reversed(buckets):
+                    running = running + bucket
+                    total = total + running
+                result = result + total
+            return result
+
+        def _odd_multiples(self, count):
+            # self, 3 * self, ..., (2 * count - 1) * self
+            multiples = [self]
+            if count > 1:
+                doubled = self._double()
+                for _ in range(count - 1):
+                    multiples.append(multiples[-1] + doubled)
+            return multiples
+
+        def _wnaf_multiply(self, n):
+            width = wnaf_width(n.bit_length())
+            multiples = self.normalize_all(self._odd_multiples(1 << (width - 2)))
+            negatives = [-multiple for multiple in multiples]
+
+            result = self.__class__.identity()
+            for digit in reversed(wnaf(n, width)):
+                result = result._double()
+                if digit > 0:
+                    result = result + multiples[digit >> 1]
+                elif digit < 0:
+                    result = result + negatives[-digit >> 1]
+            return result
+
+        def _ladder(self, n):
+            # invariant: high - low = self
+            low = self.__class__.identity()
+            high = self
+            for bit in bin(n)[2:]:
+                if bit == "1":
+                    low, high = low + high, high._double()
+                else:
+                    low, high = low._double(), low + high
+            return low
 
         def __rmul__(self, n):
             return self * n
@@ -97,4 +535,7 @@ def make_elliptic_curve(a, b, generator=None, field=None):
         def __repr__(self):
             return f"{self.__class__.__name__}({self.point})"
 
+    EllipticCurvePoint.a = curve_a
+    EllipticCurvePoint.b = field(b)
+
     return EllipticCurvePoint
@@ -0,0 +1,188 @@
+"""Vectorised prime-field arithmetic on NumPy arrays.
+
+numpy is an optional dependency of helga, needed only by this module. The rest of the
+package works without it, and importing this module does too.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Prime fields below this size keep their elements in int64 arrays, where the product
+# of two elements cannot overflow. Larger ones use object arrays of Python ints.
+INT64_LIMIT = 2**31
+
+
+class FieldArray:
+    """An array of elements of a prime field, backed by a NumPy array.
+
+    Arithmetic is elementwise and vectorised. The other operand can be a FieldArray
+    of the same field and length, or a single element or integer.
+    """
+
+    def __init__(self, field, values):
+        if np is None:
+            raise ImportError("FieldArray needs numpy, which is an optional dependency")
+        if getattr(field, "degree", None) != 1:
+            raise ValueError("FieldArray needs a prime field")
+
+        self.field = field
+        self.p = field.characteristic
+        dtype = np.int64 if self.p < INT64_LIMIT else object
+        if isinstance(values, np.ndarray):
+            self.array = values.astype(dtype) % self.p
+        else:
+            values = [int(value) % self.p for value in values]
+            self.array = np.array(values, dtype=dtype)
+
+    @classmethod
+    def _wrap(cls, field, array):
+        result = cls.__new__(cls)
+        result.field = field
+        result.p = field.characteristic
+        result.array = array
+        return result
+
+    @classmethod
+    def from_elements(cls, field, elements):
+        return cls(field, elements)
+
+    def to_elements(self):
+        return [self.field(int(value)) for value in self.array]
+
+    def _operand(self, rhs):
+        if isinstance(rhs, FieldArray):
+            if rhs.field is not self.field:
+                return None
+            if len(rhs) != len(self):
+                raise ValueError("arrays must have the same length")
+            return rhs.array
+        if isinstance(rhs, int):
+            return rhs % self.p
+        if type(rhs) is self.field:
+            return int(rhs)
+        return None
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.to_elements())
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return self._wrap(self.field, self.array[k])
+        return self.field(int(self.array[k]))
+
+    def __eq__(self, rhs):
+        if not isinstance(rhs, FieldArray):
+            return NotImplemented
+
+        return (
+            rhs.field is self.field
+            and len(rhs) == len(self)
+            and bool(np.all(self.array == rhs.array))
+        )
+
+    def __neg__(self):
+        return self._wrap(self.field, (self.p - self.array) % self.p)
+
+    def __add__(self, rhs):
+        rhs = self._operand(rhs)
+        if rhs is None:
+            return NotImplemented
+
+        return self._wrap(self.field, (self.array + rhs) % self.p)
+
+    __radd__ = __add__
+
+    def __sub__(self, rhs):
+        rhs = self._operand(rhs)
+        if rhs is None:
+            return NotImplemented
+
+        return self._wrap(self.field, (self.array - rhs) % self.p)
+
+    def __rsub__(self, lhs):
+        lhs = self._operand(lhs)
+        if lhs is None:
+            return NotImplemented
+
+        return self._wrap(self.field, (lhs - self.array) % self.p)
+
+    def __mul__(self, rhs):
+        rhs = self._operand(rhs)
+        if rhs is None:
+            return NotImplemented
+
+        return self._wrap(self.field, self.array * rhs % self.p)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, rhs):
+        if isinstance(rhs, FieldArray):
+            if rhs.field is not self.field:
+                return NotImplemented
+            return self * rhs.inverse()
+
+        rhs = self._operand(rhs)
+        if rhs is None:
+            return NotImplemented
+        return self * pow(rhs, -1, self.p)
+
+    def __pow__(self, power):
+        if power < 0:
+            return self.inverse() ** -power
+
+        # square-and-multiply on every element at once
+        result = np.ones_like(self.array)
+        base = self.array
+        while power:
+            if power & 1:
+                result = result * base % self.p
+            base = base * base % self.p
+            power >>= 1
+        return self._wrap(self.field, result)
+
+    def inverse(self):
+        """Invert every element.
+
+        int64 arrays compute a^(p - 2) with vectorised square-and-multiply. Object
+        arrays, whose arithmetic is not vectorised, use Montgomery's trick instead.
+        """
+
+        if not np.all(self.array):
+            raise ZeroDivisionError("zero has no inverse")
+
+        if self.array.dtype != object:
+            return self ** (self.p - 2)
+
+        p = self.p
+        values = self.array.tolist()
+        prefix = [1] * len(values)
+        product = 1
+        for i, value in enumerate(values):
+            prefix[i] = product
+            product = product * value % p
+        inverse = pow(product, -1, p)
+        inverses = [0] * len(values)
+        for i in reversed(range(len(values))):
+            inverses[i] = inverse * prefix[i] % p
+            inverse = inverse * values[i] % p
+        return self._wrap(self.field, np.array(inverses, dtype=object))
+
+    def dot(self, rhs):
+        """The sum of the elementwise products, as a field element."""
+
+        products = (self * rhs).array
+        # in an int64 array every product is reduced below p < 2^31, so a sum of fewer
+        # than 2^32 of them cannot overflow
+        return self.field(int(products.sum()) % self.p)
+
+    def sum(self):
+        return self.field(int(self.array.sum()) % self.p)
+
+    def __repr__(self):
+        values = self.array.tolist()
+        return f"{self.__class__.__name__}({self.field.__name__}, {values})"
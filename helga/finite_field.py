@@ -1,5 +1,5 @@
-from helga.polynomial import polynomial
-from helga.algos import is_irreducible
+from helga.polynomial import make_polynomial_ring, polynomial
+from helga.algos import is_irreducible, poly_xgcd, powmod, prime_factors
 
 FIELDS = {}
 
@@ -27,6 +27,16 @@ def pick_irreducible_polynomial(p, n):
                 poly = polynomial({n: 1, 1: a, 0: b}, F_p)
                 if is_irreducible(poly):
                     return poly
+        # not every degree has an irreducible trinomial of that form, so try the other
+        # monic polynomials, whose lower coefficients are the base-p digits of index
+        for index in range(p**2, p**n):
+            coefficients = {n: 1}
+            digits = index
+            for degree in range(n):
+                digits, coefficients[degree] = divmod(digits, p)
+            poly = polynomial(coefficients, F_p)
+            if is_irreducible(poly):
+                return poly
 
     raise RuntimeError("Could not find irreducible polynomial")
 
@@ -35,9 +45,51 @@ def make_prime_field(p):
     return make_finite_field(p, 1)
 
 
-def make_finite_field(p, n, irreducible_polynomial=None):
+# Largest field order for which make_finite_field builds log tables.
+TABLE_FIELD_LIMIT = 2**16
+
+REPRESENTATIONS = ("residue", "table", "binary", "montgomery")
+
+
+def make_finite_field(p, n, irreducible_polynomial=None, representation=None):
+    """Create the finite field with p^n elements.
+
+    The representation decides how elements are stored:
+    - "residue" (the default): an integer mod p, or a polynomial over F_p mod the
+      irreducible polynomial.
+    - "table": the discrete logarithm of the element with respect to a primitive
+      element, so that multiplication, division, powers and inverses are integer
+      arithmetic on logarithms. Addition goes through a table of Zech logarithms. The
+      tables are built when the field is created, so this is only available for
+      extension fields with at most TABLE_FIELD_LIMIT elements.
+    - "binary" (the default for extension fields of characteristic 2): an int whose
+      bits are the coefficients of the residue, so that addition is XOR and
+      multiplication is a carry-less product reduced by the irreducible polynomial.
+    - "montgomery": for prime fields with odd p, the integer aR mod p with R = 2^k > p,
+      so that products are reduced with shifts and masks instead of a division by p,
+      and sums with a comparison. value and int() still give a itself. CPython's own
+      big-integer division is fast, so this only pays off for sums, differences and
+      dot products. Chains of products alone are slightly slower.
+
+    In every representation, int() of an element is the integer whose base-p digits
+    are its coefficients, so that it is the element itself in a prime field.
+    """
+
+    if representation is None:
+        representation = "binary" if p == 2 and n > 1 else "residue"
+    if representation not in REPRESENTATIONS:
+        raise ValueError(f"unknown representation: {representation}")
+    if representation == "binary" and (p != 2 or n == 1):
+        raise ValueError("bit-packed elements need an extension field of order 2^n")
+    if representation == "montgomery" and (p == 2 or n != 1):
+        raise ValueError("Montgomery form needs a prime field of odd characteristic")
+    if representation == "table" and (n == 1 or p**n > TABLE_FIELD_LIMIT):
+        raise ValueError(
+            f"log tables need an extension field of order at most {TABLE_FIELD_LIMIT}"
+        )
+
     name = f"F_{p ** n}"
-    key = (p, n, str(irreducible_polynomial))
+    key = (p, n, str(irreducible_polynomial), representation)
     if key in FIELDS:
         return FIELDS[key]
 
@@ -50,121 +102,693 @@ def make_finite_field(p, n, irreducible_polynomial=None):
             irreducible_polynomial = pick_irreducible_polynomial(p, n)
         divisor = irreducible_polynomial
 
+    if representation == "table":
+        FiniteFieldElement = _make_table_field(p, n, divisor, base_field)
+    elif representation == "binary":
+        FiniteFieldElement = _make_binary_field(n, divisor, base_field)
+    elif representation == "montgomery":
+        FiniteFieldElement = _make_montgomery_field(p)
+    else:
+        FiniteFieldElement = _make_residue_field(p, n, divisor, base_field)
+
+    FiniteFieldElement.__name__ = name
+    FiniteFieldElement.characteristic = p
+    FiniteFieldElement.degree = n
+    FiniteFieldElement.representation = representation
+    FIELDS[key] = FiniteFieldElement
+
+    return FiniteFieldElement
+
+
+def _make_residue_field(p, n, divisor, base_field):
+    if n == 1:
+        return _make_prime_residue_field(p)
+
+    polynomial_ring = make_polynomial_ring(base_field)
+
+    def wrap(value):
+        element = object.__new__(FiniteFieldElement)
+        element.value = value
+        return element
+
     class FiniteFieldElement:
+        __slots__ = ("value",)
+        field_characteristic = p
+
         def __init__(self, value):
-            self.divisor = divisor
-            if n == 1:
-                self.base_field = self.__class__
-            else:
-                self.base_field = base_field
-            self.field_characteristic = p
+            if type(value) is not polynomial_ring:
+                value = polynomial(value, base_field)
 
-            # TODO: clean up this type check
-            if n != 1 and not type(value).__name__.endswith("[x]"):
-                value = polynomial(value, self.base_field)
+            self.value = value % divisor
 
-            value = value % divisor
-            if n == 1 and value < 0:
-                value += self.divisor
+        def __int__(self):
+            return sum(
+                int(coefficient) * p**degree
+                for degree, coefficient in self.value.coefficients.items()
+            )
 
-            self.value = value
+        def __eq__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
 
-        def __int__(self):
-            if n == 1:
-                return self.value
+            return self.value == rhs.value
+
+        def __hash__(self):
+            return hash(tuple(self.value.coefficients.items()))
+
+        def __bool__(self):
+            return bool(self.value)
 
-            return NotImpelemented
+        def __neg__(self):
+            return wrap(-self.value)
+
+        def __add__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
+            return wrap(self.value + rhs.value)
+
+        def __sub__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
+            return wrap(self.value - rhs.value)
+
+        def __mul__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
+            return wrap(self.value * rhs.value % divisor)
+
+        def __truediv__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
+            return self * rhs.inverse()
+
+        def __pow__(self, power):
+            if power < 0:
+                return self.inverse() ** -power
+
+            return wrap(powmod(self.value, power, divisor))
+
+        def inverse(self):
+            g, s, _ = poly_xgcd(self.value, divisor)
+            if g.degree != 0:
+                raise ZeroDivisionError("zero has no inverse")
+
+            return wrap(s)
+
+        def __repr__(self):
+            return f"{self.__class__.__name__}({self.value})"
+
+        def __str__(self):
+            return str(self.value)
+
+    FiniteFieldElement.divisor = divisor
+    FiniteFieldElement.base_field = base_field
+
+    return FiniteFieldElement
+
+
+def _make_prime_residue_field(p):
+    def wrap(value):
+        element = object.__new__(FiniteFieldElement)
+        element.value = value
+        return element
+
+    class FiniteFieldElement:
+        __slots__ = ("value",)
+        field_characteristic = p
+
+        def __init__(self, value):
+            if type(value) is FiniteFieldElement:
+                value = value.value
+            self.value = value % p
+
+        def __int__(self):
+            return self.value
 
         def __eq__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
             return self.value == rhs.value
 
+        def __hash__(self):
+            return hash(self.value)
+
         def __bool__(self):
             return self.value != 0
 
         def __neg__(self):
-            return self.__class__(-self.value)
+            return wrap(p - self.value if self.value else 0)
 
         def __add__(self, rhs):
-            if self.__class__.__name__ != type(rhs).__name__:
+            if type(rhs) is not FiniteFieldElement:
                 return NotImplemented
 
-            return self.__class__(self.value + rhs.value)
+            value = self.value + rhs.value
+            return wrap(value - p if value >= p else value)
 
-        def __iadd(self, rhs):
-            if self.__class__.__name__ != type(rhs).__name__:
+        def __sub__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
                 return NotImplemented
 
-            self.value = (self + rhs).value
-            return self
+            value = self.value - rhs.value
+            return wrap(value + p if value < 0 else value)
 
-        def __sub__(self, rhs):
-            if self.__class__.__name__ != type(rhs).__name__:
+        def __mul__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
                 return NotImplemented
 
-            return self.__class__(self.value - rhs.value)
+            return wrap(self.value * rhs.value % p)
 
-        def __isub__(self, rhs):
-            if self.__class__.__name__ != type(rhs).__name__:
+        def __truediv__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
                 return NotImplemented
 
-            self.value = (self - rhs).value
-            return self
+            if not rhs.value:
+                raise ZeroDivisionError("zero has no inverse")
 
-        def __mul__(self, rhs):
-            if self.__class__.__name__ != type(rhs).__name__:
+            return wrap(self.value * pow(rhs.value, -1, p) % p)
+
+        def __pow__(self, power):
+            return wrap(pow(self.value, power, p))
+
+        def inverse(self):
+            if not self.value:
+                raise ZeroDivisionError("zero has no inverse")
+
+            return wrap(pow(self.value, -1, p))
+
+        def __repr__(self):
+            return f"{self.__class__.__name__}({self.value})"
+
+        def __str__(self):
+            return str(self.value)
+
+    FiniteFieldElement.divisor = p
+    FiniteFieldElement.base_field = FiniteFieldElement
+
+    return FiniteFieldElement
+
+
+def _log_tables(p, n, divisor):
+    """Build discrete logarithm tables for F_p[x] / divisor.
+
+    Elements are encoded as integers whose base-p digits are their coefficients. The
+    generator is the primitive element with the smallest encoding other than the
+    constants, which is usually of the form ax + c.
+
+    Returns the exponential table, mapping k to the encoding of g^k, and the logarithm
+    table, mapping each non-zero encoding back to k.
+    """
+
+    q = p**n
+    coefficients = divisor.coefficients
+    lc_inverse = pow(int(coefficients[n]), -1, p)
+    # x^n = sum(reduction[i] * x^i) mod divisor
+    reduction = [
+        -int(coefficients[i]) * lc_inverse % p if i in coefficients else 0
+        for i in range(n)
+    ]
+    powers = [p**i for i in range(n)]
+    one = [1] + [0] * (n - 1)
+
+    def times_linear(a, c, digits):
+        # multiply by ax + c
+        top = digits[-1]
+        return [
+            (a * (shifted + top * r) + c * d) % p
+            for shifted, r, d in zip([0] + digits[:-1], reduction, digits)
+        ]
+
+    def times(lhs, rhs):
+        product = [0] * (2 * n - 1)
+        for i, a in enumerate(lhs):
+            for j, b in enumerate(rhs):
+                product[i + j] += a * b
+        for k in reversed(range(n, 2 * n - 1)):
+            top = product[k] % p
+            for i, r in enumerate(reduction):
+                product[k - n + i] += top * r
+        return [c % p for c in product[:n]]
+
+    def raise_to(g, k):
+        result = one
+        for bit in bin(k)[2:]:
+            result = times(result, result)
+            if bit == "1":
+                result = times(result, g)
+        return result
+
+    # g is primitive if g^((q - 1) / r) != 1 for every prime r dividing q - 1
+    factors = set(prime_factors(q - 1))
+    for candidate in range(p, q):
+        g = [candidate // power % p for power in powers]
+        if all(raise_to(g, (q - 1) // r) != one for r in factors):
+            break
+
+    # multiplication by g is linear, with columns g * x^i
+    columns = [g]
+    for _ in range(n - 1):
+        columns.append(times_linear(1, 0, columns[-1]))
+    rows = list(zip(*columns))
+
+    exp = []
+    digits = one
+    for _ in range(q - 1):
+        exp.append(sum(d * power for d, power in zip(digits, powers)))
+        if candidate < p * p:
+            digits = times_linear(g[1], g[0], digits)
+        else:
+            digits = [sum(r * d for r, d in zip(row, digits)) % p for row in rows]
+
+    log = [None] * q
+    for k, index in enumerate(exp):
+        log[index] = k
+
+    return exp, log
+
+
+def _make_table_field(p, n, divisor, base_field):
+    q = p**n
+    order = q - 1
+    exp, log = _log_tables(p, n, divisor)
+    polynomial_ring = make_polynomial_ring(base_field)
+
+    # zech[k] = log(1 + g^k), or None if 1 + g^k = 0
+    zech = []
+    for k in range(order):
+        index = exp[k]
+        constant = index % p
+        zech.append(log[index - constant + (constant + 1) % p])
+
+    # -1 = g^minus_one
+    minus_one = 0 if p == 2 else order // 2
+
+    def encode(value):
+        return sum(
+            int(coefficient) * p**degree
+            for degree, coefficient in value.coefficients.items()
+        )
+
+    def decode(index):
+        digits = []
+        while index:
+            index, digit = divmod(index, p)
+            digits.append(digit)
+        return polynomial(digits, base_field)
+
+    class FiniteFieldElement:
+        __slots__ = ("log",)
+        field_characteristic = p
+
+        def __init__(self, value):
+            if type(value) is not polynomial_ring:
+                value = polynomial(value, base_field)
+
+            # None stands for the logarithm of zero
+            self.log = log[encode(value % divisor)]
+
+        @classmethod
+        def _from_log(cls, k):
+            element = cls.__new__(cls)
+            element.log = k
+            return element
+
+        @property
+        def value(self):
+            if self.log is None:
+                return polynomial(0, base_field)
+            return decode(exp[self.log])
+
+        def __int__(self):
+            return 0 if self.log is None else exp[self.log]
+
+        def __eq__(self, rhs):
+            if type(rhs) is not self.__class__:
                 return NotImplemented
 
-            return self.__class__(self.value * rhs.value)
+            return self.log == rhs.log
+
+        def __hash__(self):
+            return hash(self.log)
+
+        def __bool__(self):
+            return self.log is not None
+
+        def __neg__(self):
+            if self.log is None:
+                return self
+            return self._from_log((self.log + minus_one) % order)
 
-        def __imul__(self, rhs):
-            if self.__class__.__name__ != type(rhs).__name__:
+        def __add__(self, rhs):
+            if type(rhs) is not self.__class__:
                 return NotImplemented
 
-            self.value = (self * rhs).value
-            return self
+            if self.log is None:
+                return rhs
+            if rhs.log is None:
+                return self
+
+            # g^a + g^b = g^a (1 + g^(b - a))
+            k = zech[(rhs.log - self.log) % order]
+            if k is None:
+                return self._from_log(None)
+            return self._from_log((self.log + k) % order)
+
+        def __sub__(self, rhs):
+            if type(rhs) is not self.__class__:
+                return NotImplemented
+
+            return self + -rhs
+
+        def __mul__(self, rhs):
+            if type(rhs) is not self.__class__:
+                return NotImplemented
+
+            if self.log is None or rhs.log is None:
+                return self._from_log(None)
+            return self._from_log((self.log + rhs.log) % order)
 
         def __truediv__(self, rhs):
-            if self.__class__.__name__ != type(rhs).__name__:
+            if type(rhs) is not self.__class__:
                 return NotImplemented
 
             return self * rhs.inverse()
 
-        def __itruediv__(self, rhs):
-            if self.__class__.__name__ != type(rhs).__name__:
+        def __pow__(self, power):
+            if self.log is None:
+                if power < 0:
+                    raise ZeroDivisionError("zero has no inverse")
+                return self._from_log(0 if power == 0 else None)
+
+            return self._from_log(self.log * power % order)
+
+        def inverse(self):
+            if self.log is None:
+                raise ZeroDivisionError("zero has no inverse")
+
+            return self._from_log(-self.log % order)
+
+        def __repr__(self):
+            return f"{self.__class__.__name__}({self.value})"
+
+        def __str__(self):
+            return str(self.value)
+
+    FiniteFieldElement.divisor = divisor
+    FiniteFieldElement.base_field = base_field
+    FiniteFieldElement.primitive_element = FiniteFieldElement._from_log(1)
+
+    return FiniteFieldElement
+
+
+# Operands with at most this many bits are multiplied by shifting and adding, larger
+# ones by a single integer product through _clmul_kronecker.
+CLMUL_KRONECKER_THRESHOLD = 32
+
+# maps a byte to the character 0 or 1 for the parity of its low bit
+_LOW_BIT = bytes(b"01" * 128)
+
+
+def _clmul_kronecker(lhs, rhs):
+    """Carry-less product of two bitmasks via one integer multiplication.
+
+    Every bit is spread to the low bit of its own slot of `width` bytes. The integer
+    product then holds, in each slot, the number of pairs of bits contributing to that
+    coefficient, and the slots are wide enough that they never carry into each other,
+    so the carry-less product is the parity of every slot.
+    """
+
+    width = 1
+    while 1 << (8 * width) <= min(lhs.bit_length(), rhs.bit_length()):
+        width += 1
+    slot = {ord("0"): "\0" * width, ord("1"): "\0" * (width - 1) + "\1"}
+    spread_lhs = bin(lhs)[2:].translate(slot).encode("latin-1")
+    spread_rhs = bin(rhs)[2:].translate(slot).encode("latin-1")
+    product = int.from_bytes(spread_lhs, "big") * int.from_bytes(spread_rhs, "big")
+    if not product:
+        return 0
+
+    slots = (product.bit_length() + 8 * width - 1) // (8 * width)
+    low_bytes = product.to_bytes(slots * width, "big")[width - 1 :: width]
+    return int(low_bytes.translate(_LOW_BIT), 2)
+
+
+def clmul(lhs, rhs):
+    """Carry-less product of two bitmasks, i.e. the product in F_2[x]."""
+
+    if lhs.bit_length() < rhs.bit_length():
+        lhs, rhs = rhs, lhs
+    if rhs.bit_length() > CLMUL_KRONECKER_THRESHOLD:
+        return _clmul_kronecker(lhs, rhs)
+
+    result = 0
+    while rhs:
+        low = rhs & -rhs
+        result ^= lhs * low
+        rhs ^= low
+    return result
+
+
+def _make_binary_field(n, divisor, base_field):
+    modulus = sum(1 << degree for degree in divisor.coefficients)
+    mask = (1 << n) - 1
+    polynomial_ring = make_polynomial_ring(base_field)
+    order = mask
+    low_terms = [degree for degree in divisor.coefficients if degree < n]
+
+    if max(low_terms) <= n // 2:
+        # x^n = sum(x^t for t in low_terms), and each fold at least halves the excess
+        def reduce(bits):
+            while bits >> n:
+                high = bits >> n
+                bits &= mask
+                for t in low_terms:
+                    bits ^= high << t
+            return bits
+
+    else:
+
+        def reduce(bits):
+            for degree in range(bits.bit_length() - 1, n - 1, -1):
+                if bits >> degree & 1:
+                    bits ^= modulus << (degree - n)
+            return bits
+
+    def square(bits):
+        # squaring in characteristic 2 spreads the bits apart
+        return reduce(int("0".join(bin(bits)[2:]), 2))
+
+    def encode(value):
+        return sum(1 << degree for degree, c in value.coefficients.items() if int(c))
+
+    class FiniteFieldElement:
+        __slots__ = ("bits",)
+        field_characteristic = 2
+
+        def __init__(self, value):
+            if type(value) is not polynomial_ring:
+                value = polynomial(value, base_field)
+
+            self.bits = reduce(encode(value))
+
+        @classmethod
+        def from_int(cls, bits):
+            """The element whose coefficients are the bits of an integer."""
+
+            element = cls.__new__(cls)
+            element.bits = reduce(bits)
+            return element
+
+        @classmethod
+        def _from_bits(cls, bits):
+            element = cls.__new__(cls)
+            element.bits = bits
+            return element
+
+        @property
+        def value(self):
+            digits = [int(bit) for bit in reversed(bin(self.bits)[2:])]
+            return polynomial(digits, base_field)
+
+        def __int__(self):
+            return self.bits
+
+        def __eq__(self, rhs):
+            if type(rhs) is not self.__class__:
                 return NotImplemented
 
-            self.value = (self / rhs).value
+            return self.bits == rhs.bits
+
+        def __hash__(self):
+            return hash(self.bits)
+
+        def __bool__(self):
+            return self.bits != 0
+
+        def __neg__(self):
             return self
 
-        def __pow__(self, power):
-            if n == 1:
-                return self.__class__(pow(self.value, power, self.field_characteristic))
+        def __add__(self, rhs):
+            if type(rhs) is not self.__class__:
+                return NotImplemented
+
+            return self._from_bits(self.bits ^ rhs.bits)
 
+        __sub__ = __add__
+
+        def __mul__(self, rhs):
+            if type(rhs) is not self.__class__:
+                return NotImplemented
+
+            return self._from_bits(reduce(clmul(self.bits, rhs.bits)))
+
+        def __truediv__(self, rhs):
+            if type(rhs) is not self.__class__:
+                return NotImplemented
+
+            return self * rhs.inverse()
+
+        def __pow__(self, power):
             if power < 0:
                 return self.inverse() ** -power
-            elif power == 0:
-                return self.__class__(1)
-            elif power % 2 == 0:
-                return (self * self) ** (power / 2)
-            else:
-                return self * (self * self) ** ((power - 1) / 2)
+            if not self.bits:
+                return self._from_bits(0 if power else 1)
+
+            result = 1
+            for bit in bin(power % order)[2:]:
+                result = square(result)
+                if bit == "1":
+                    result = reduce(clmul(result, self.bits))
+            return self._from_bits(result)
 
         def inverse(self):
-            if n == 1:
-                return self.__class__(pow(self.value, -1, self.field_characteristic))
+            if not self.bits:
+                raise ZeroDivisionError("zero has no inverse")
+
+            # extended Euclid in F_2[x], keeping u = t * self mod divisor
+            u, v = self.bits, modulus
+            t, new_t = 1, 0
+            while u != 1:
+                shift = u.bit_length() - v.bit_length()
+                if shift < 0:
+                    u, v = v, u
+                    t, new_t = new_t, t
+                    shift = -shift
+                u ^= v << shift
+                t ^= new_t << shift
+            return self._from_bits(t)
+
+        def __repr__(self):
+            return f"{self.__class__.__name__}({self.value})"
+
+        def __str__(self):
+            return str(self.value)
+
+    FiniteFieldElement.divisor = divisor
+    FiniteFieldElement.base_field = base_field
+
+    return FiniteFieldElement
+
+
+def _make_montgomery_field(p):
+    bits = p.bit_length()
+    mask = (1 << bits) - 1
+    # R = 2^bits, and p * p_inverse = -1 mod R
+    p_inverse = -pow(p, -1, 1 << bits) & mask
+
+    def redc(t):
+        # t R^-1 mod p, for 0 <= t < pR
+        t = (t + ((t & mask) * p_inverse & mask) * p) >> bits
+        return t - p if t >= p else t
+
+    def wrap(mont):
+        element = object.__new__(FiniteFieldElement)
+        element.mont = mont
+        return element
+
+    class FiniteFieldElement:
+        __slots__ = ("mont",)
+        field_characteristic = p
+
+        def __init__(self, value):
+            if type(value) is FiniteFieldElement:
+                self.mont = value.mont
+            else:
+                self.mont = (int(value) << bits) % p
+
+        @property
+        def value(self):
+            return redc(self.mont)
+
+        def __int__(self):
+            return redc(self.mont)
 
-            t = polynomial(0, self.base_field)
-            new_t = polynomial(1, self.base_field)
-            r = self.divisor
-            new_r = self.value
-            while new_r != polynomial(0, self.base_field):
-                quotient = (r / new_r)[0]
-                r, new_r = new_r, r - quotient * new_r
-                t, new_t = new_t, t - quotient * new_t
+        def __eq__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
+            return self.mont == rhs.mont
+
+        def __hash__(self):
+            return hash(redc(self.mont))
+
+        def __bool__(self):
+            return self.mont != 0
+
+        def __neg__(self):
+            return wrap(p - self.mont if self.mont else 0)
 
-            assert r.degree == 0
+        def __add__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
+            mont = self.mont + rhs.mont
+            return wrap(mont - p if mont >= p else mont)
+
+        def __sub__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
 
-            return self.__class__(r.coefficients[0].inverse() * t)
+            mont = self.mont - rhs.mont
+            return wrap(mont + p if mont < 0 else mont)
+
+        def __mul__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
+            return wrap(redc(self.mont * rhs.mont))
+
+        def __truediv__(self, rhs):
+            if type(rhs) is not FiniteFieldElement:
+                return NotImplemented
+
+            return self * rhs.inverse()
+
+        def __pow__(self, power):
+            if power == 2:
+                return wrap(redc(self.mont * self.mont))
+            if 0 < power < 16:
+                # small powers, like the squares in curve arithmetic, stay in form
+                result = self.mont
+                for bit in bin(power)[3:]:
+                    result = redc(result * result)
+                    if bit == "1":
+                        result = redc(result * self.mont)
+                return wrap(result)
+
+            return wrap((pow(redc(self.mont), power, p) << bits) % p)
+
+        def inverse(self):
+            if not self.mont:
+                raise ZeroDivisionError("zero has no inverse")
+
+            # invert a rather than aR, which is cheap for small a such as 1
+            return wrap((pow(redc(self.mont), -1, p) << bits) % p)
 
         def __repr__(self):
             return f"{self.__class__.__name__}({self.value})"
@@ -172,8 +796,7 @@ def make_finite_field(p, n, irreducible_polynomial=None):
         def __str__(self):
             return str(self.value)
 
-    FiniteFieldElement.__name__ = name
-    FiniteFieldElement.characteristic = p
-    FIELDS[key] = FiniteFieldElement
+    FiniteFieldElement.divisor = p
+    FiniteFieldElement.base_field = FiniteFieldElement
 
     return FiniteFieldElement
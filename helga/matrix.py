@@ -0,0 +1,505 @@
+from helga.ring import infer_ring, is_field, is_prime_field
+
+# Rows over a prime field are reduced after this many pending row operations, rather
+# than after every one.
+DELAYED_REDUCTIONS = 16
+
+# Largest number of pivot rows combined into one table by the method of the four
+# Russians over F_2.
+M4RI_BLOCK = 8
+
+
+def _rref_gf2(rows, ncols):
+    """Reduce rows of bits to reduced row echelon form in place, over F_2.
+
+    Pivots are found a block of up to M4RI_BLOCK columns at a time. The pivot rows of a
+    block are kept reduced against each other, so that every sum of them is one entry
+    of a table, and each other row is then cleared in all the block's columns with a
+    single XOR.
+
+    Returns the pivot columns.
+    """
+
+    nrows = len(rows)
+    block_size = max(1, min(M4RI_BLOCK, nrows.bit_length() - 2))
+    pivots = []
+    rank = 0
+    col = 0
+    while col < ncols and rank < nrows:
+        block = []
+        block_rows = []
+        while len(block) < block_size and col < ncols:
+            start = rank + len(block)
+            found = None
+            for r in range(start, nrows):
+                row = rows[r]
+                for pivot_col, pivot_row in zip(block, block_rows):
+                    if row >> pivot_col & 1:
+                        row ^= pivot_row
+                rows[r] = row
+                if row >> col & 1:
+                    found = r
+                    break
+            if found is not None:
+                rows[start], rows[found] = rows[found], rows[start]
+                pivot_row = rows[start]
+                for i, other in enumerate(block_rows):
+                    if other >> col & 1:
+                        block_rows[i] = other ^ pivot_row
+                block.append(col)
+                block_rows.append(pivot_row)
+            col += 1
+
+        if not block:
+            break
+
+        # table[mask] is the sum of the block rows selected by the bits of mask
+        table = [0]
+        for pivot_row in block_rows:
+            table += [entry ^ pivot_row for entry in table]
+
+        end = rank + len(block)
+        rows[rank:end] = block_rows
+        contiguous = block[-1] - block[0] == len(block) - 1
+        low = block[0]
+        mask = (1 << len(block)) - 1
+        for r in range(nrows):
+            if rank <= r < end:
+                continue
+            row = rows[r]
+            if contiguous:
+                index = row >> low & mask
+            else:
+                index = 0
+                for i, pivot_col in enumerate(block):
+                    index |= (row >> pivot_col & 1) << i
+            if index:
+                rows[r] = row ^ table[index]
+
+        pivots.extend(block)
+        rank = end
+
+    return pivots
+
+
+def _rref_mod_p(rows, ncols, p):
+    """Reduce rows of integers to reduced row echelon form in place, modulo p.
+
+    Row operations are applied without reducing modulo p, which is only done once a
+    row has DELAYED_REDUCTIONS operations pending, or when one of its entries is
+    needed.
+
+    Returns the pivot columns and the determinant factor, the product of the pivots
+    and of -1 for every row swap.
+    """
+
+    nrows = len(rows)
+    pending = [0] * nrows
+    pivots = []
+    factor = 1
+    rank = 0
+    for col in range(ncols):
+        if rank == nrows:
+            break
+
+        found = None
+        for r in range(rank, nrows):
+            value = rows[r][col] % p
+            rows[r][col] = value
+            if value:
+                found = r
+                break
+        if found is None:
+            continue
+
+        if found != rank:
+            rows[rank], rows[found] = rows[found], rows[rank]
+            pending[rank], pending[found] = pending[found], pending[rank]
+            factor = -factor
+        pivot_value = rows[rank][col]
+        factor = factor * pivot_value % p
+        scale = pow(pivot_value, -1, p)
+        # the entries left of col are zero mod p, but delayed updates may have left
+        # them as nonzero multiples of p
+        rows[rank][:col] = [0] * col
+        pivot_row = [x * scale % p for x in rows[rank][col:]]
+        rows[rank][col:] = pivot_row
+        pending[rank] = 0
+
+        for r in range(nrows):
+            if r == rank:
+                continue
+            row = rows[r]
+            value = row[col] % p
+            if not value:
+                row[col] = 0
+                continue
+            if pending[r] >= DELAYED_REDUCTIONS:
+                row[col:] = [x - value * y for x, y in zip(row[col:], pivot_row)]
+                row[:] = [x % p for x in row]
+                pending[r] = 0
+            else:
+                row[col:] = [x - value * y for x, y in zip(row[col:], pivot_row)]
+                pending[r] += 1
+
+        pivots.append(col)
+        rank += 1
+
+    for r in range(nrows):
+        if pending[r]:
+            rows[r][:] = [x % p for x in rows[r]]
+
+    return pivots, factor % p
+
+
+def _rref_generic(rows, ncols, zero, one):
+    """Reduce rows of field elements to reduced row echelon form in place.
+
+    Returns the pivot columns and the determinant factor.
+    """
+
+    nrows = len(rows)
+    pivots = []
+    factor = one
+    rank = 0
+    for col in range(ncols):
+        if rank == nrows:
+            break
+
+        for r in range(rank, nrows):
+            if rows[r][col] != zero:
+                break
+        else:
+            continue
+
+        if r != rank:
+            rows[rank], rows[r] = rows[r], rows[rank]
+            factor = -factor
+        pivot_value = rows[rank][col]
+        factor = factor * pivot_value
+        scale = one / pivot_value
+        pivot_row = [x * scale for x in rows[rank][col:]]
+        rows[rank][col:] = pivot_row
+
+        for r in range(nrows):
+            if r == rank:
+                continue
+            row = rows[r]
+            value = row[col]
+            if value != zero:
+                row[col:] = [x - value * y for x, y in zip(row[col:], pivot_row)]
+
+        pivots.append(col)
+        rank += 1
+
+    return pivots, factor
+
+
+class Matrix:
+    """A matrix over a helga field.
+
+    The entries are stored according to the field: over F_2 every row is an integer
+    whose bits are its entries, over other prime fields a list of integers, and over
+    any other field a list of elements.
+    """
+
+    def __init__(self, rows, field=None):
+        rows = [list(row) for row in rows]
+        if field is None:
+            field = infer_ring([entry for row in rows for entry in row])
+        assert is_field(field)
+        if len({len(row) for row in rows}) > 1:
+            raise ValueError("rows must all have the same length")
+
+        self.field = field
+        self.nrows = len(rows)
+        self.ncols = len(rows[0]) if rows else 0
+        self._set_kind()
+        self._rows = [self._row_to_raw(row) for row in rows]
+
+    def _set_kind(self):
+        if is_prime_field(self.field):
+            self._p = self.field.characteristic
+            self._kind = "gf2" if self._p == 2 else "prime"
+        else:
+            self._p = None
+            self._kind = "generic"
+
+    @classmethod
+    def _from_raw(cls, raw_rows, nrows, ncols, field):
+        result = cls.__new__(cls)
+        result.field = field
+        result.nrows = nrows
+        result.ncols = ncols
+        result._set_kind()
+        result._rows = raw_rows
+        return result
+
+    @classmethod
+    def zeros(cls, nrows, ncols, field):
+        return cls([[field(0)] * ncols for _ in range(nrows)], field)
+
+    @classmethod
+    def identity(cls, n, field):
+        return cls([[field(int(i == j)) for j in range(n)] for i in range(n)], field)
+
+    def _to_raw(self, entry):
+        if not isinstance(entry, self.field):
+            entry = self.field(entry)
+        if self._kind == "generic":
+            return entry
+        return int(entry)
+
+    def _row_to_raw(self, row):
+        raw = [self._to_raw(entry) for entry in row]
+        if self._kind == "gf2":
+            return sum(1 << j for j, bit in enumerate(raw) if bit)
+        return raw
+
+    def _raw_entry(self, i, j):
+        if self._kind == "gf2":
+            return self._rows[i] >> j & 1
+        return self._rows[i][j]
+
+    def _copy_rows(self):
+        if self._kind == "gf2":
+            return list(self._rows)
+        return [list(row) for row in self._rows]
+
+    def _wrap(self, raw_rows, nrows=None, ncols=None):
+        nrows = self.nrows if nrows is None else nrows
+        ncols = self.ncols if ncols is None else ncols
+        return self._from_raw(raw_rows, nrows, ncols, self.field)
+
+    @property
+    def shape(self):
+        return (self.nrows, self.ncols)
+
+    def __getitem__(self, index):
+        i, j = index
+        entry = self._raw_entry(i, j)
+        if self._kind == "generic":
+            return entry
+        return self.field(entry)
+
+    def to_lists(self):
+        return [[self[i, j] for j in range(self.ncols)] for i in range(self.nrows)]
+
+    def __eq__(self, rhs):
+        if not isinstance(rhs, Matrix):
+            return NotImplemented
+
+        return (
+            self.field is rhs.field
+            and self.shape == rhs.shape
+            and self._rows == rhs._rows
+        )
+
+    def _check_same_shape(self, rhs):
+        if rhs.field is not self.field or rhs.shape != self.shape:
+            raise ValueError("matrices must have the same field and shape")
+
+    def __add__(self, rhs):
+        if not isinstance(rhs, Matrix):
+            return NotImplemented
+
+        self._check_same_shape(rhs)
+        if self._kind == "gf2":
+            return self._wrap([a ^ b for a, b in zip(self._rows, rhs._rows)])
+        if self._kind == "prime":
+            p = self._p
+            return self._wrap(
+                [
+                    [(x + y) % p for x, y in zip(a, b)]
+                    for a, b in zip(self._rows, rhs._rows)
+                ]
+            )
+        return self._wrap(
+            [[x + y for x, y in zip(a, b)] for a, b in zip(self._rows, rhs._rows)]
+        )
+
+    def __neg__(self):
+        if self._kind == "gf2":
+            return self
+        if self._kind == "prime":
+            p = self._p
+            return self._wrap([[-x % p for x in row] for row in self._rows])
+        return self._wrap([[-x for x in row] for row in self._rows])
+
+    def __sub__(self, rhs):
+        if not isinstance(rhs, Matrix):
+            return NotImplemented
+
+        return self + -rhs
+
+    def transpose(self):
+        if self._kind == "gf2":
+            columns = [0] * self.ncols
+            for i, row in enumerate(self._rows):
+                j = 0
+                while row:
+                    if row & 1:
+                        columns[j] |= 1 << i
+                    row >>= 1
+                    j += 1
+            return self._wrap(columns, self.ncols, self.nrows)
+
+        columns = [list(column) for column in zip(*self._rows)]
+        if not columns:
+            columns = [[] for _ in range(self.ncols)]
+        return self._wrap(columns, self.ncols, self.nrows)
+
+    def __mul__(self, rhs):
+        if not isinstance(rhs, Matrix):
+            return NotImplemented
+        if rhs.field is not self.field or self.ncols != rhs.nrows:
+            raise ValueError("matrix shapes do not match")
+
+        if self._kind == "gf2":
+            return self._wrap(self._mul_gf2(rhs), self.nrows, rhs.ncols)
+
+        columns = rhs.transpose()._rows
+        if self._kind == "prime":
+            # a single reduction for every entry
+            p = self._p
+            rows = [
+                [sum(x * y for x, y in zip(row, column)) % p for column in columns]
+                for row in self._rows
+            ]
+        else:
+            zero = self.field(0)
+            rows = [
+                [sum((x * y for x, y in zip(row, column)), zero) for column in columns]
+                for row in self._rows
+            ]
+        return self._wrap(rows, self.nrows, rhs.ncols)
+
+    def _mul_gf2(self, rhs):
+        # method of the four Russians: for every group of M4RI_BLOCK rows of rhs, a
+        # table of all their sums, indexed by the matching bits of a row of self
+        tables = []
+        for start in range(0, rhs.nrows, M4RI_BLOCK):
+            table = [0]
+            for row in rhs._rows[start : start + M4RI_BLOCK]:
+                table += [entry ^ row for entry in table]
+            tables.append(table)
+
+        mask = (1 << M4RI_BLOCK) - 1
+        product = []
+        for row in self._rows:
+            total = 0
+            for table in tables:
+                if row & mask:
+                    total ^= table[row & mask]
+                row >>= M4RI_BLOCK
+                if not row:
+                    break
+            product.append(total)
+        return product
+
+    def _rref(self, rows, ncols):
+        # returns the pivot columns and the determinant factor
+        if self._kind == "gf2":
+            return _rref_gf2(rows, ncols), 1
+        if self._kind == "prime":
+            return _rref_mod_p(rows, ncols, self._p)
+        return _rref_generic(rows, ncols, self.field(0), self.field(1))
+
+    def rref(self):
+        """The reduced row echelon form of the matrix, and its pivot columns."""
+
+        rows = self._copy_rows()
+        pivots, _ = self._rref(rows, self.ncols)
+        return self._wrap(rows), pivots
+
+    def rank(self):
+        return len(self.rref()[1])
+
+    def determinant(self):
+        if self.nrows != self.ncols:
+            raise ValueError("only square matrices have a determinant")
+
+        rows = self._copy_rows()
+        pivots, factor = self._rref(rows, self.ncols)
+        if len(pivots) < self.nrows:
+            return self.field(0)
+        # the generic elimination already tracks factor as a field element
+        if self._kind == "generic":
+            return factor
+        return self.field(factor)
+
+    def _augment(self, rhs):
+        # the rows of self followed by those of rhs, as raw rows
+        if self._kind == "gf2":
+            return [a | b << self.ncols for a, b in zip(self._rows, rhs._rows)]
+        return [list(a) + list(b) for a, b in zip(self._rows, rhs._rows)]
+
+    def _split(self, rows, rank, ncols):
+        # the columns of rows after the first self.ncols, in the first rank rows
+        if self._kind == "gf2":
+            return [row >> self.ncols for row in rows[:rank]]
+        return [row[self.ncols : self.ncols + ncols] for row in rows[:rank]]
+
+    def inverse(self):
+        if self.nrows != self.ncols:
+            raise ValueError("only square matrices have an inverse")
+
+        n = self.nrows
+        rows = self._augment(Matrix.identity(n, self.field))
+        pivots, _ = self._rref(rows, n)
+        if len(pivots) < n:
+            raise ValueError("matrix is singular")
+        return self._wrap(self._split(rows, n, n))
+
+    def solve(self, rhs):
+        """Find x with self * x = rhs.
+
+        rhs is a Matrix, or a list standing for a column vector, in which case so is
+        the result. Free variables are set to zero, and a ValueError is raised if there
+        is no solution.
+        """
+
+        vector = not isinstance(rhs, Matrix)
+        if vector:
+            rhs = Matrix([[entry] for entry in rhs], self.field)
+        if rhs.field is not self.field or rhs.nrows != self.nrows:
+            raise ValueError("matrix shapes do not match")
+
+        rows = self._augment(rhs)
+        pivots, _ = self._rref(rows, self.ncols + rhs.ncols)
+        if pivots and pivots[-1] >= self.ncols:
+            raise ValueError("system has no solution")
+
+        solution = self._wrap(self._split(rows, len(pivots), rhs.ncols))
+        # row i of the reduced system gives the variable of pivot column i
+        raw = Matrix.zeros(self.ncols, rhs.ncols, self.field)._rows
+        for i, col in enumerate(pivots):
+            raw[col] = solution._rows[i]
+        result = self._wrap(raw, self.ncols, rhs.ncols)
+
+        if vector:
+            return [result[i, 0] for i in range(self.ncols)]
+        return result
+
+    def kernel(self):
+        """A matrix whose rows are a basis of the vectors x with self * x = 0."""
+
+        reduced, pivots = self.rref()
+        pivot_set = set(pivots)
+        free = [col for col in range(self.ncols) if col not in pivot_set]
+
+        one = self.field(1)
+        basis = []
+        for f in free:
+            vector = [self.field(0)] * self.ncols
+            vector[f] = one
+            for i, col in enumerate(pivots):
+                vector[col] = -reduced[i, f]
+            basis.append(vector)
+
+        if not basis:
+            return self._wrap([], 0, self.ncols)
+        return Matrix(basis, self.field)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_lists()}, {self.field.__name__})"
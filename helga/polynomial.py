@@ -1,7 +1,10 @@
 from fractions import Fraction
+from itertools import repeat
 import math
 import re
 
+from helga.ring import is_field, is_prime_field
+
 
 def parse_polynomial_string(s, var="x"):
     """Parse string representation of polynomial into coefficients.
@@ -61,12 +64,15 @@ def parse_polynomial_string(s, var="x"):
     return coefficients
 
 
-def polynomial(coefficients=None, ring=None):
+def polynomial(coefficients=None, ring=None, representation=None):
     """Create a polynomial.
 
     Coefficients can be a string, list, or dictionary mapping degree to value.
 
     If the ring is not provided, it is inferred. If it is provided, all terms are cast to it.
+
+    The representation can be "dense" or "sparse". If it is not provided, it is chosen
+    from the number of non-zero terms relative to the degree.
     """
 
     if coefficients is None:
@@ -74,54 +80,780 @@ def polynomial(coefficients=None, ring=None):
 
     if isinstance(coefficients, str):
         coefficients = parse_polynomial_string(coefficients)
-    elif isinstance(coefficients, (list, tuple)):
-        coefficients = {i: value for i, value in enumerate(coefficients)}
-    elif not isinstance(coefficients, dict):
+    elif isinstance(coefficients, tuple):
+        coefficients = list(coefficients)
+    elif not isinstance(coefficients, (dict, list)):
         coefficients = {0: coefficients}
 
     if ring is None and not coefficients:
         ring = int
 
     if ring is None and coefficients:
-        types = [type(coefficient) for coefficient in coefficients.values()]
+        if isinstance(coefficients, dict):
+            values = coefficients.values()
+        else:
+            values = coefficients
+        types = [type(coefficient) for coefficient in values]
         if Fraction in types:
             ring = Fraction
         else:
             ring = types[0]
 
-    return make_polynomial_ring(ring)(coefficients)
+    return make_polynomial_ring(ring)(coefficients, representation)
 
 
 RINGS = {}
 
+# Polynomials whose degree is more than this many times their number of non-zero terms
+# are stored sparsely, as a dictionary mapping degree to coefficient. All others are
+# stored densely, as a list of coefficients in order of increasing degree.
+SPARSITY_THRESHOLD = 8
+
+REPRESENTATIONS = ("dense", "sparse")
+
+# Dense products fall back to the schoolbook method when the shorter operand has fewer
+# than KARATSUBA_THRESHOLD coefficients. Toom-3 is used for integer coefficients when
+# the shorter operand has at least TOOM3_THRESHOLD coefficients.
+KARATSUBA_THRESHOLD = 32
+TOOM3_THRESHOLD = 100
+
+# Products over a prime field p use a number-theoretic transform mod p when the shorter
+# operand has at least NTT_THRESHOLD coefficients and p - 1 is divisible by the
+# transform size. Below that Kronecker substitution is faster: over 998244353 it takes
+# 3.7ms against 13ms for the transform at 1024 coefficients, and they break even at
+# about 32768. Products with integer or rational coefficients (and over other prime
+# fields) use transforms over up to MAX_NTT_PRIMES of the NTT_PRIMES, recombined with
+# the Chinese remainder theorem, when the shorter operand has at least
+# MULTI_NTT_THRESHOLD coefficients.
+NTT_THRESHOLD = 32768
+MULTI_NTT_THRESHOLD = 512
+MAX_NTT_PRIMES = 4
+
+# Products over a prime field use Kronecker substitution when the shorter operand has
+# at least KRONECKER_THRESHOLD coefficients. This packs each operand into one large
+# integer, so that the product is a single multiplication of Python integers.
+KRONECKER_THRESHOLD = 16
+
+# Pairs of a prime of the form c * 2^32 + 1 and a primitive root modulo it.
+NTT_PRIMES = (
+    (4611685941117976577, 3),
+    (4611685692009873409, 19),
+    (4611685606110527489, 3),
+    (4611685318347718657, 5),
+    (4611685232448372737, 3),
+    (4611685219563470849, 3),
+    (4611685125074190337, 5),
+    (4611685090714451969, 3),
+    (4611685039174844417, 3),
+    (4611685021994975233, 5),
+    (4611684738527133697, 7),
+    (4611684691282493441, 3),
+    (4611684674102624257, 5),
+    (4611684609678114817, 5),
+    (4611684588203278337, 3),
+    (4611684274670665729, 7),
+)
+
+# Division switches from long division to multiplication by a power series inverse of
+# the reversed divisor, computed by Newton iteration, when both the divisor degree and
+# the quotient length are at least this large.
+NEWTON_DIVISION_THRESHOLD = 512
+
+# Over prime fields, whose products are much faster, division switches at this size
+# instead, if it is smaller.
+PRIME_FIELD_NEWTON_DIVISION_THRESHOLD = 64
+
+# RingElement.evaluate_many uses a subproduct tree when both the number of points and
+# the number of coefficients are at least SUBPRODUCT_TREE_THRESHOLD, and Horner's rule
+# at every point otherwise. Remainders are only taken down the tree until they are
+# smaller than SUBPRODUCT_TREE_LEAF_SIZE, and then evaluated with Horner's rule.
+SUBPRODUCT_TREE_THRESHOLD = 256
+SUBPRODUCT_TREE_LEAF_SIZE = 16
+
+MULTIPLICATION_STRATEGIES = (
+    "sparse",
+    "schoolbook",
+    "karatsuba",
+    "kronecker",
+    "ntt",
+    "multi_ntt",
+)
+
+# primitive roots of the prime fields whose products have gone through an NTT
+_PRIMITIVE_ROOTS = {}
+
+
+def _strip(vec, zero):
+    """Remove trailing zeros from a list of coefficients in place."""
+
+    while vec and vec[-1] == zero:
+        vec.pop()
+    return vec
+
+
+def _dense_add(lhs, rhs):
+    if len(lhs) < len(rhs):
+        lhs, rhs = rhs, lhs
+
+    result = [x + y for x, y in zip(lhs, rhs)]
+    result.extend(lhs[len(rhs) :])
+    return result
+
+
+def _dense_sub(lhs, rhs):
+    result = [x - y for x, y in zip(lhs, rhs)]
+    if len(lhs) > len(rhs):
+        result.extend(lhs[len(rhs) :])
+    else:
+        result.extend(-y for y in rhs[len(lhs) :])
+    return result
+
+
+def _schoolbook_mul(lhs, rhs, zero):
+    """Multiply two lists of coefficients.
+
+    The result is neither reduced nor stripped of trailing zeros.
+    """
+
+    if not lhs or not rhs:
+        return []
+
+    if len(lhs) < len(rhs):
+        lhs, rhs = rhs, lhs
+
+    n = len(lhs)
+    result = [zero] * (n + len(rhs) - 1)
+    for i, y in enumerate(rhs):
+        if y == zero:
+            continue
+        result[i : i + n] = [r + x * y for r, x in zip(result[i : i + n], lhs)]
+
+    return result
+
+
+def _accumulate(result, vec, offset):
+    """Add vec into result starting at the given offset."""
+
+    end = offset + len(vec)
+    result[offset:end] = [r + x for r, x in zip(result[offset:end], vec)]
+
+
+def _karatsuba_mul(lhs, rhs, zero, integral=False):
+    """Multiply two lists of coefficients.
+
+    Toom-3 is only used if integral is set, as its interpolation step relies on exact
+    division of integers by 2 and 3. The result is not reduced.
+    """
+
+    if len(lhs) < len(rhs):
+        lhs, rhs = rhs, lhs
+
+    n = len(lhs)
+    m = len(rhs)
+    if m < KARATSUBA_THRESHOLD:
+        return _schoolbook_mul(lhs, rhs, zero)
+
+    if 2 * m <= n:
+        # unbalanced operands: multiply rhs by slices of lhs of the same length
+        result = [zero] * (n + m - 1)
+        for i in range(0, n, m):
+            _accumulate(result, _karatsuba_mul(lhs[i : i + m], rhs, zero, integral), i)
+        return result
+
+    if integral and m >= TOOM3_THRESHOLD and 3 * m > 2 * n:
+        return _toom3_mul(lhs, rhs)
+
+    k = (n + 1) // 2
+    lhs0, lhs1 = lhs[:k], lhs[k:]
+    rhs0, rhs1 = rhs[:k], rhs[k:]
+
+    low = _karatsuba_mul(lhs0, rhs0, zero, integral)
+    high = _karatsuba_mul(lhs1, rhs1, zero, integral)
+    middle = _karatsuba_mul(
+        _dense_add(lhs0, lhs1), _dense_add(rhs0, rhs1), zero, integral
+    )
+    middle = _dense_sub(_dense_sub(middle, low), high)
+
+    result = [zero] * max(n + m - 1, k + len(middle))
+    _accumulate(result, low, 0)
+    _accumulate(result, middle, k)
+    _accumulate(result, high, 2 * k)
+    # the middle product can carry zero coefficients past the end of the result
+    del result[n + m - 1 :]
+    return result
+
+
+def _toom3_mul(lhs, rhs):
+    """Multiply two lists of integers with Toom-3, using Bodrato's sequence."""
+
+    n = len(lhs)
+    m = len(rhs)
+    k = (n + 2) // 3
+
+    def evaluate(a0, a1, a2):
+        p = _dense_add(a0, a2)
+        at_one = _dense_add(p, a1)
+        at_minus_one = _dense_sub(p, a1)
+        at_minus_two = _dense_sub([2 * x for x in _dense_add(at_minus_one, a2)], a0)
+        return a0, at_one, at_minus_one, at_minus_two, a2
+
+    lhs_values = evaluate(lhs[:k], lhs[k : 2 * k], lhs[2 * k :])
+    rhs_values = evaluate(rhs[:k], rhs[k : 2 * k], rhs[2 * k :])
+    r0, r1, r_minus_1, r_minus_2, r_inf = (
+        _karatsuba_mul(x, y, 0, True) for x, y in zip(lhs_values, rhs_values)
+    )
+
+    # interpolation
+    c3 = [x // 3 for x in _dense_sub(r_minus_2, r1)]
+    c1 = [x // 2 for x in _dense_sub(r1, r_minus_1)]
+    c2 = _dense_sub(r_minus_1, r0)
+    c3 = _dense_add([x // 2 for x in _dense_sub(c2, c3)], [2 * x for x in r_inf])
+    c2 = _dense_sub(_dense_add(c2, c1), r_inf)
+    c1 = _dense_sub(c1, c3)
+
+    result = [0] * max(n + m - 1, 4 * k + len(r_inf), 3 * k + len(c3))
+    for i, part in enumerate((r0, c1, c2, c3, r_inf)):
+        _accumulate(result, part, i * k)
+    del result[n + m - 1 :]
+    return result
+
+
+def _kronecker_mul(lhs, rhs, bound):
+    """Multiply two lists of non-negative integers below bound by Kronecker
+    substitution.
+
+    Each list is packed into one integer, with every coefficient in a slot of whole
+    bytes wide enough to hold a coefficient of the product. The coefficients of the
+    product are the slots of the product of the two integers.
+    """
+
+    if not lhs or not rhs:
+        return []
+
+    bits = 2 * (bound - 1).bit_length() + min(len(lhs), len(rhs)).bit_length()
+    slot = bits // 8 + 1
+
+    def pack(vec):
+        data = b"".join(map(int.to_bytes, vec, repeat(slot), repeat("little")))
+        return int.from_bytes(data, "little")
+
+    packed = pack(lhs)
+    # squares only need one operand packed
+    product = packed * packed if rhs is lhs else packed * pack(rhs)
+    size = slot * (len(lhs) + len(rhs) - 1)
+    data = product.to_bytes(size, "little")
+    return [int.from_bytes(data[i : i + slot], "little") for i in range(0, size, slot)]
+
+
+def _ntt_size(length):
+    return 1 << (length - 1).bit_length()
+
+
+def _ntt_mul(lhs, rhs, p, root):
+    """Multiply two lists of integers modulo p with a number-theoretic transform.
+
+    The root must be a primitive root modulo p, and p - 1 must be divisible by the
+    smallest power of two that can hold the product.
+    """
+
+    # algos depends on this module, so it cannot be imported at the top
+    from helga.algos import inverse_ntt, ntt
+
+    if not lhs or not rhs:
+        return []
+
+    length = len(lhs) + len(rhs) - 1
+    size = _ntt_size(length)
+    w = pow(root, (p - 1) // size, p)
+
+    lhs = ntt([x % p for x in lhs] + [0] * (size - len(lhs)), w, p)
+    rhs = ntt([x % p for x in rhs] + [0] * (size - len(rhs)), w, p)
+    product = inverse_ntt([x * y % p for x, y in zip(lhs, rhs)], w, p)
+    del product[length:]
+    return product
+
+
+def _ntt_prime_count(bits, length):
+    """Number of NTT_PRIMES needed for a product of integers with at most the given
+    number of bits, where the shorter operand has the given length."""
+
+    # the primes are all larger than 2^61, and the sign takes up one more bit
+    return (2 * bits + length.bit_length() + 1) // 61 + 1
+
+
+def _multi_ntt_mul(lhs, rhs):
+    """Multiply two lists of integers exactly with number-theoretic transforms over
+    several primes, recombined with the Chinese remainder theorem."""
+
+    if not lhs or not rhs:
+        return []
+
+    bits = max(abs(x) for x in lhs + rhs).bit_length()
+    count = _ntt_prime_count(bits, min(len(lhs), len(rhs)))
+    if count > len(NTT_PRIMES):
+        return _karatsuba_mul(lhs, rhs, 0, True)
+
+    primes = NTT_PRIMES[:count]
+    residues = [_ntt_mul(lhs, rhs, p, root) for p, root in primes]
+
+    modulus = math.prod(p for p, root in primes)
+    weights = []
+    for p, root in primes:
+        cofactor = modulus // p
+        weights.append(cofactor * pow(cofactor, -1, p))
+
+    half = modulus // 2
+    product = []
+    for values in zip(*residues):
+        x = sum(value * weight for value, weight in zip(values, weights)) % modulus
+        if x > half:
+            x -= modulus
+        product.append(x)
+    return product
+
+
+def _is_ntt_friendly(p, length):
+    return (p - 1) % _ntt_size(length) == 0
+
+
+def multiplication_strategy(lhs, rhs):
+    """Pick the algorithm used to multiply two polynomials from the same ring.
+
+    The strategies are:
+    - "sparse": schoolbook multiplication of the term dictionaries, used whenever one
+      of the polynomials is stored sparsely.
+    - "schoolbook": schoolbook multiplication of the coefficient lists.
+    - "karatsuba": Karatsuba multiplication, switching to Toom-3 for integer, rational
+      and prime field coefficients.
+    - "kronecker": Kronecker substitution, for prime field coefficients.
+    - "ntt": a number-theoretic transform over the prime field itself.
+    - "multi_ntt": number-theoretic transforms over several primes, for integer,
+      rational and prime field coefficients.
+
+    The choice is driven by KARATSUBA_THRESHOLD, KRONECKER_THRESHOLD, NTT_THRESHOLD,
+    MULTI_NTT_THRESHOLD and MAX_NTT_PRIMES, which can be tuned by measuring
+    RingElement.multiply with each strategy.
+    """
+
+    if lhs.representation == "sparse" or rhs.representation == "sparse":
+        return "sparse"
+
+    length = min(lhs.degree, rhs.degree) + 1
+    ring = lhs.ring
+    if is_prime_field(ring):
+        p = ring.characteristic
+        if length >= NTT_THRESHOLD and _is_ntt_friendly(p, lhs.degree + rhs.degree + 1):
+            return "ntt"
+        if length >= KRONECKER_THRESHOLD:
+            return "kronecker"
+
+    if length < KARATSUBA_THRESHOLD:
+        return "schoolbook"
+
+    if is_prime_field(ring):
+        bits = p.bit_length()
+    elif ring is int:
+        bits = max(abs(x) for x in lhs._get_dense() + rhs._get_dense()).bit_length()
+    elif ring is Fraction:
+        values = lhs._get_dense() + rhs._get_dense()
+        bits = max(abs(x.numerator) for x in values).bit_length()
+        bits += math.lcm(*(x.denominator for x in values)).bit_length()
+    else:
+        return "karatsuba"
+
+    if (
+        length >= MULTI_NTT_THRESHOLD
+        and _ntt_prime_count(bits, length) <= MAX_NTT_PRIMES
+    ):
+        return "multi_ntt"
+
+    return "karatsuba"
+
+
+class SubproductTree:
+    """The products of x - a over ranges of a fixed list of points a, as a binary tree.
+
+    The leaves are x - a for every point, every other node is the product of its two
+    children, and the root is the product over all points. Evaluation at every point
+    takes remainders modulo the nodes from the root down. Interpolation combines the
+    values from the leaves up. A tree can be reused for any number of polynomials
+    with the same points, and keeps what division by its nodes has precomputed.
+    """
+
+    def __init__(self, points, ring):
+        base_ring = ring.base_ring
+        self.ring = ring
+        self.points = [
+            point if isinstance(point, base_ring) else base_ring(point)
+            for point in points
+        ]
+
+        one = base_ring(1)
+        level = [ring({0: -point, 1: one}) for point in self.points]
+        self.levels = [level]
+        while len(level) > 1:
+            level = [
+                level[i] * level[i + 1] if i + 1 < len(level) else level[i]
+                for i in range(0, len(level), 2)
+            ]
+            self.levels.append(level)
+        self._weights = None
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def root(self):
+        if not self.points:
+            return self.ring(1)
+        return self.levels[-1][0]
+
+    def evaluate(self, f):
+        if not self.points:
+            return []
+
+        # nodes on level k are the products over 2^k points
+        stop = min((SUBPRODUCT_TREE_LEAF_SIZE - 1).bit_length(), len(self.levels) - 1)
+        remainders = [f % self.root]
+        for level in reversed(self.levels[stop:-1]):
+            remainders = [remainders[i // 2] % node for i, node in enumerate(level)]
+
+        size = 1 << stop
+        return [
+            remainders[i // size].evaluate(point) for i, point in enumerate(self.points)
+        ]
+
+    def _get_weights(self):
+        # 1 / M'(a) for every point a, where M is the root
+        if self._weights is None:
+            # algos depends on this module, so it cannot be imported at the top
+            from helga.algos import batch_inverse
+
+            derivatives = self.evaluate(self.root.derivative())
+            if not all(derivatives):
+                raise ValueError("points must be distinct")
+            self._weights = batch_inverse(derivatives)
+        return self._weights
+
+    def interpolate(self, values):
+        if not is_field(self.ring.base_ring):
+            raise ValueError("interpolation needs coefficients in a field")
+
+        values = list(values)
+        if len(values) != len(self.points):
+            raise ValueError("there must be as many values as points")
+        if not values:
+            return self.ring()
+
+        # Lagrange's formula: f is the sum of v * M / (M'(a) (x - a)) over the points
+        # a and values v. Each node combines the sums of its children as
+        # left * right node + right * left node.
+        base_ring = self.ring.base_ring
+        values = [
+            value if isinstance(value, base_ring) else base_ring(value)
+            for value in values
+        ]
+        sums = [
+            self.ring({0: value * weight})
+            for value, weight in zip(values, self._get_weights())
+        ]
+        for level in self.levels[:-1]:
+            sums = [
+                (
+                    sums[i] * level[i + 1] + sums[i + 1] * level[i]
+                    if i + 1 < len(sums)
+                    else sums[i]
+                )
+                for i in range(0, len(sums), 2)
+            ]
+        return sums[0]
+
 
 def make_polynomial_ring(base_ring):
     name = f"{base_ring.__name__}[x]"
-    if name in RINGS:
-        return RINGS[name]
+    if base_ring in RINGS:
+        return RINGS[base_ring]
+
+    # Coefficients are stored in a raw form. Over a prime field this is the integer
+    # value of the element, so that arithmetic can be done on plain integers with a
+    # single reduction at the end. Over any other ring it is the element itself.
+    if is_prime_field(base_ring):
+        modulus = base_ring.characteristic
+        zero = 0
+        one = 1
+    else:
+        modulus = None
+        zero = base_ring(0)
+        one = base_ring(1)
+    integral = modulus is not None or base_ring is int or base_ring is Fraction
+
+    def to_raw(value):
+        if not isinstance(value, base_ring):
+            value = base_ring(value)
+        if modulus is not None:
+            return value.value
+        return value
+
+    def from_raw(value):
+        if modulus is not None:
+            return base_ring(value)
+        return value
+
+    def power(value, exponent):
+        if modulus is not None:
+            return pow(value, exponent, modulus)
+        return value**exponent
+
+    def cast_point(point):
+        if not isinstance(point, base_ring):
+            point = base_ring(point)
+        return point
+
+    def inverse(value):
+        if modulus is not None:
+            return pow(value, -1, modulus)
+        if base_ring is int:
+            # the only invertible integers are their own inverses
+            return value
+        return one / value
+
+    def reduce(vec):
+        if modulus is not None:
+            vec = [coefficient % modulus for coefficient in vec]
+        return _strip(vec, zero)
+
+    def reduce_terms(terms):
+        if modulus is not None:
+            terms = {
+                degree: coefficient % modulus for degree, coefficient in terms.items()
+            }
+        return {
+            degree: coefficient
+            for degree, coefficient in terms.items()
+            if coefficient != zero
+        }
+
+    def terms_to_dense(terms):
+        vec = [zero] * (max(terms) + 1 if terms else 0)
+        for degree, coefficient in terms.items():
+            vec[degree] = coefficient
+        return vec
+
+    def multiply_integral(lhs, rhs, kernel):
+        # kernel multiplies two lists of integers
+        if base_ring is not Fraction:
+            return kernel(lhs, rhs)
+
+        # clear denominators so that the product can be taken over the integers
+        lhs_denominator = math.lcm(*(x.denominator for x in lhs))
+        rhs_denominator = math.lcm(*(x.denominator for x in rhs))
+        product = kernel(
+            [x.numerator * (lhs_denominator // x.denominator) for x in lhs],
+            [x.numerator * (rhs_denominator // x.denominator) for x in rhs],
+        )
+        denominator = lhs_denominator * rhs_denominator
+        return [Fraction(x, denominator) for x in product]
+
+    def divmod_dense(dividend, divisor):
+        degree = len(divisor) - 1
+        if len(dividend) <= degree:
+            return [], list(dividend)
+
+        lc_inverse = inverse(divisor[-1])
+        remainder = list(dividend)
+        quotient = [zero] * (len(dividend) - degree)
+        for i in reversed(range(len(quotient))):
+            coefficient = remainder[i + degree] * lc_inverse
+            if modulus is not None:
+                coefficient %= modulus
+            if coefficient == zero:
+                continue
+
+            quotient[i] = coefficient
+            remainder[i : i + degree] = [
+                r - coefficient * d for r, d in zip(remainder[i : i + degree], divisor)
+            ]
+
+        return reduce(quotient), reduce(remainder[:degree])
+
+    def multiply_dense(lhs, rhs):
+        # lhs and rhs must be reduced
+        lhs = RingElement._from_dense(lhs)
+        return lhs.multiply(RingElement._from_dense(rhs))._dense
+
+    def series_inverse(series, precision, start=None):
+        """Inverse of a power series modulo x^precision, by Newton iteration.
+
+        Returns the precision and the inverse. Iteration resumes from start, a previous
+        result for the same series, if given.
+        """
+
+        if start is None:
+            known, inverse_series = 1, [inverse(series[0])]
+        else:
+            known, inverse_series = start
+
+        while known < precision:
+            known = min(2 * known, precision)
+            # g <- g + g * (1 - f * g), which doubles the number of correct terms
+            error = multiply_dense(reduce(series[:known]), inverse_series)[:known]
+            error = [-coefficient for coefficient in error]
+            error += [zero] * (known - len(error))
+            error[0] = error[0] + one
+            correction = multiply_dense(inverse_series, reduce(error))[:known]
+            inverse_series = reduce(_dense_add(inverse_series, correction))
+
+        return known, inverse_series
+
+    def divmod_newton(dividend, divisor, inverse_series):
+        # inverse_series is the reversed divisor's inverse modulo x^(quotient length)
+        degree = len(divisor) - 1
+        quotient_length = len(dividend) - degree
+
+        # the reversed quotient is the reversed dividend times the inverse series
+        reversed_quotient = multiply_dense(
+            reduce(dividend[degree:][::-1]), inverse_series
+        )[:quotient_length]
+        reversed_quotient += [zero] * (quotient_length - len(reversed_quotient))
+        quotient = reduce(reversed_quotient[::-1])
+
+        product = multiply_dense(divisor, quotient)
+        remainder = reduce(_dense_sub(dividend[:degree], product[:degree]))
+        return quotient, remainder
 
     class RingElement:
-        def __init__(self, coefficients=None):
+        ring = base_ring
+        indeterminate = "x"
+
+        def __init__(self, coefficients=None, representation=None):
             if coefficients is None:
                 coefficients = {}
-   
+
+            if representation not in (None,) + REPRESENTATIONS:
+                raise ValueError(f"unknown representation: {representation}")
+
             # TODO: consolidate this with polynomial()
-            if not isinstance(coefficients, dict):
-                coefficients = {0: coefficients}
+            if isinstance(coefficients, (list, tuple)):
+                vec = reduce([to_raw(coefficient) for coefficient in coefficients])
+                terms = None
+            else:
+                if not isinstance(coefficients, dict):
+                    coefficients = {0: coefficients}
+                vec = None
+                terms = reduce_terms(
+                    {
+                        int(degree): to_raw(coefficient)
+                        for degree, coefficient in coefficients.items()
+                    }
+                )
 
-            for key, value in coefficients.items():
-                if not isinstance(value, base_ring):
-                    coefficients[key] = base_ring(value)
+            if representation is None:
+                if vec is not None:
+                    representation = "dense"
+                elif len(terms) * SPARSITY_THRESHOLD > max(terms, default=-1):
+                    representation = "dense"
+                else:
+                    representation = "sparse"
+
+            if representation == "dense":
+                self._dense = vec if vec is not None else terms_to_dense(terms)
+                self._terms = None
+            else:
+                self._dense = None
+                self._terms = terms if terms is not None else self._get_terms(vec)
+            self._reversed_inverse = None
+
+        @classmethod
+        def _new(cls, vec, terms):
+            element = cls.__new__(cls)
+            element._dense = vec
+            element._terms = terms
+            element._reversed_inverse = None
+            return element
+
+        @classmethod
+        def _from_dense(cls, vec):
+            # vec must already be reduced and stripped of trailing zeros
+            return cls._new(vec, None)
+
+        @classmethod
+        def _from_terms(cls, terms):
+            # terms must already be reduced and free of zero coefficients
+            if len(terms) * SPARSITY_THRESHOLD > max(terms, default=-1):
+                return cls._from_dense(terms_to_dense(terms))
+
+            return cls._new(None, terms)
+
+        def _assign(self, rhs):
+            self._dense = rhs._dense
+            self._terms = rhs._terms
+            self._reversed_inverse = rhs._reversed_inverse
+            return self
 
-            coefficients = {
+        def _get_dense(self):
+            if self._dense is not None:
+                return self._dense
+            return terms_to_dense(self._terms)
+
+        def _get_terms(self, vec=None):
+            if vec is None:
+                if self._terms is not None:
+                    return self._terms
+                vec = self._dense
+            return {
                 degree: coefficient
-                for degree, coefficient in coefficients.items()
-                if coefficient != base_ring(0)
+                for degree, coefficient in enumerate(vec)
+                if coefficient != zero
             }
 
-            self.coefficients = coefficients
-            self.ring = base_ring
-            self.indeterminate = "x"
+        def _get_reversed_inverse(self, precision):
+            if self._reversed_inverse is None or self._reversed_inverse[0] < precision:
+                reversed_dense = self._get_dense()[::-1]
+                if self._reversed_inverse is None:
+                    start = None
+                else:
+                    start = self._reversed_inverse
+                self._reversed_inverse = series_inverse(
+                    reversed_dense, precision, start
+                )
+
+            return self._reversed_inverse[1]
+
+        def reversed_inverse(self, precision):
+            """Inverse of the polynomial with the coefficients of this one in reverse
+            order, as a power series modulo x^precision.
+
+            This is what division by this polynomial uses when the divisor and
+            quotient are large. It is computed by Newton iteration and cached, so that
+            repeated division by the same polynomial only costs two multiplications.
+            """
+
+            if self.degree < 0:
+                raise ZeroDivisionError("the zero polynomial has no inverse")
+
+            return self._from_dense(reduce(list(self._get_reversed_inverse(precision))))
+
+        @property
+        def representation(self):
+            if self._dense is None:
+                return "sparse"
+            return "dense"
+
+        def with_representation(self, representation):
+            if representation not in REPRESENTATIONS:
+                raise ValueError(f"unknown representation: {representation}")
+
+            if representation == "dense":
+                return self._from_dense(list(self._get_dense()))
+
+            return self._new(None, dict(self._get_terms()))
+
+        @property
+        def coefficients(self):
+            return {
+                degree: from_raw(coefficient)
+                for degree, coefficient in sorted(self._get_terms().items())
+            }
 
         def cast(self, new_ring):
             return polynomial(self.coefficients, ring=new_ring)
@@ -134,75 +866,149 @@ def make_polynomial_ring(base_ring):
             if not isinstance(rhs, self.__class__):
                 return NotImplemented
 
-            return self.coefficients == rhs.coefficients
+            if self._dense is not None and rhs._dense is not None:
+                return self._dense == rhs._dense
+
+            return self._get_terms() == rhs._get_terms()
+
+        def __bool__(self):
+            return self.degree >= 0
 
         def __add__(self, rhs):
             if not isinstance(rhs, self.__class__):
                 return NotImplemented
 
-            coefficients = self.coefficients.copy()
-            for degree, coefficient in rhs.coefficients.items():
-                coefficients[degree] = (
-                    coefficients.setdefault(degree, self.ring(0)) + coefficient
-                )
+            if self._dense is not None and rhs._dense is not None:
+                return self._from_dense(reduce(_dense_add(self._dense, rhs._dense)))
+
+            terms = dict(self._get_terms())
+            for degree, coefficient in rhs._get_terms().items():
+                if degree in terms:
+                    terms[degree] = terms[degree] + coefficient
+                else:
+                    terms[degree] = coefficient
 
-            return self.__class__(coefficients)
+            return self._from_terms(reduce_terms(terms))
 
         def __iadd__(self, rhs):
             if not isinstance(rhs, self.__class__):
                 return NotImplemented
 
-            self.coefficients = (self + rhs).coefficients
-            return self
+            return self._assign(self + rhs)
 
         def __neg__(self):
-            coefficients = {
-                degree: -coefficient
-                for degree, coefficient in self.coefficients.items()
-            }
-            return self.__class__(coefficients)
+            if self._dense is not None:
+                return self._from_dense(
+                    reduce([-coefficient for coefficient in self._dense])
+                )
+
+            return self._from_terms(
+                reduce_terms(
+                    {
+                        degree: -coefficient
+                        for degree, coefficient in self._terms.items()
+                    }
+                )
+            )
 
         def __sub__(self, rhs):
             if not isinstance(rhs, self.__class__):
                 return NotImplemented
 
+            if self._dense is not None and rhs._dense is not None:
+                return self._from_dense(reduce(_dense_sub(self._dense, rhs._dense)))
+
             return self + -rhs
 
         def __isub__(self, rhs):
             if not isinstance(rhs, self.__class__):
                 return NotImplemented
 
-            self.coefficients = (self - rhs).coefficients
-            return self
+            return self._assign(self - rhs)
 
         def __mul__(self, rhs):
             if type(rhs).__name__ == self.ring.__name__:
-                coefficients = {
-                    degree: coefficient * rhs
-                    for degree, coefficient in self.coefficients.items()
-                }
-                return self.__class__(coefficients)
+                scalar = to_raw(rhs)
+                if self._dense is not None:
+                    return self._from_dense(
+                        reduce([coefficient * scalar for coefficient in self._dense])
+                    )
+
+                return self._from_terms(
+                    reduce_terms(
+                        {
+                            degree: coefficient * scalar
+                            for degree, coefficient in self._terms.items()
+                        }
+                    )
+                )
             elif isinstance(rhs, self.__class__):
-                coefficients = {}
-                for degree1, coefficient1 in self.coefficients.items():
-                    for degree2, coefficient2 in rhs.coefficients.items():
+                return self.multiply(rhs)
+
+            return NotImplemented
+
+        def multiply(self, rhs, strategy=None):
+            """Multiply by another polynomial from this ring.
+
+            If no strategy is given, it is picked by multiplication_strategy.
+            """
+
+            if not isinstance(rhs, self.__class__):
+                raise TypeError(f"cannot multiply {self.__class__.__name__} by {rhs}")
+
+            if strategy is None:
+                strategy = multiplication_strategy(self, rhs)
+
+            if strategy == "sparse":
+                terms = {}
+                for degree1, coefficient1 in self._get_terms().items():
+                    for degree2, coefficient2 in rhs._get_terms().items():
                         degree = degree1 + degree2
                         coefficient = coefficient1 * coefficient2
-                        coefficients[degree] = (
-                            coefficients.setdefault(degree, self.ring(0)) + coefficient
-                        )
-
-                return self.__class__(coefficients)
+                        if degree in terms:
+                            terms[degree] = terms[degree] + coefficient
+                        else:
+                            terms[degree] = coefficient
+
+                return self._from_terms(reduce_terms(terms))
+
+            lhs = self._get_dense()
+            rhs = rhs._get_dense()
+            if strategy == "schoolbook":
+                product = _schoolbook_mul(lhs, rhs, zero)
+            elif strategy == "karatsuba" and integral:
+                product = multiply_integral(
+                    lhs, rhs, lambda x, y: _karatsuba_mul(x, y, 0, True)
+                )
+            elif strategy == "karatsuba":
+                product = _karatsuba_mul(lhs, rhs, zero)
+            elif strategy == "kronecker" and modulus is not None:
+                product = _kronecker_mul(lhs, rhs, modulus)
+            elif (
+                strategy == "ntt"
+                and modulus is not None
+                and _is_ntt_friendly(modulus, len(lhs) + len(rhs) - 1)
+            ):
+                if modulus not in _PRIMITIVE_ROOTS:
+                    from helga.algos import find_primitive_root
+
+                    _PRIMITIVE_ROOTS[modulus] = find_primitive_root(modulus)
+                product = _ntt_mul(lhs, rhs, modulus, _PRIMITIVE_ROOTS[modulus])
+            elif strategy == "multi_ntt" and integral:
+                product = multiply_integral(lhs, rhs, _multi_ntt_mul)
+            else:
+                raise ValueError(
+                    f"cannot multiply {self.__class__.__name__} with {strategy}"
+                )
 
-            return NotImplemented
+            return self._from_dense(reduce(product))
 
         def __imul__(self, rhs):
             if (
                 isinstance(rhs, self.__class__)
                 or type(rhs).__name__ == self.ring.__name__
             ):
-                self.coefficients = (self * rhs).coefficients
-                return self
+                return self._assign(self * rhs)
 
             return NotImplemented
 
@@ -218,23 +1024,22 @@ def make_polynomial_ring(base_ring):
 
             assert rhs.degree >= 0
 
-            if self.ring is int and rhs.coefficients[rhs.degree] != self.ring(1):
+            divisor = rhs._get_dense()
+            if self.ring is int and divisor[-1] != self.ring(1):
                 raise ValueError("divisor is not monic")
 
-            quotient = self.__class__({})
-            remainder = self.__class__(self.coefficients.copy())
-
-            while remainder.degree >= rhs.degree:
-                s = self.__class__(
-                    {
-                        remainder.degree
-                        - rhs.degree: remainder.coefficients[remainder.degree]
-                        / rhs.coefficients[rhs.degree]
-                    }
-                )
-                quotient += s
-                remainder -= s * rhs
-            return quotient, remainder
+            dividend = self._get_dense()
+            degree = len(divisor) - 1
+            quotient_length = len(dividend) - degree
+            threshold = NEWTON_DIVISION_THRESHOLD
+            if modulus is not None:
+                threshold = min(threshold, PRIME_FIELD_NEWTON_DIVISION_THRESHOLD)
+            if min(degree, quotient_length) >= threshold:
+                inverse_series = rhs._get_reversed_inverse(quotient_length)
+                quotient, remainder = divmod_newton(dividend, divisor, inverse_series)
+            else:
+                quotient, remainder = divmod_dense(dividend, divisor)
+            return self._from_dense(quotient), self._from_dense(remainder)
 
         def __floordiv__(self, rhs):
             if not isinstance(rhs, self.__class__):
@@ -247,8 +1052,7 @@ def make_polynomial_ring(base_ring):
             if not isinstance(rhs, self.__class__):
                 return NotImplemented
 
-            self.coefficients = (self // rhs).coefficients
-            return self
+            return self._assign(self // rhs)
 
         def __mod__(self, rhs):
             if not isinstance(rhs, self.__class__):
@@ -260,37 +1064,105 @@ def make_polynomial_ring(base_ring):
             if not isinstance(rhs, self.__class__):
                 return NotImplemented
 
-            self.coefficients = (self % rhs).coefficients
-            return self
+            return self._assign(self % rhs)
 
         def evaluate(self, point):
             assert type(point).__name__ == self.ring.__name__
 
-            accum = self.ring(0)
-            for degree, coefficient in self.coefficients.items():
-                accum += coefficient * point**degree
-
-            return accum
+            if self._dense is None:
+                # Horner's rule over the terms, multiplying by the point raised to the
+                # gap between consecutive degrees
+                value = to_raw(point)
+                accum = zero
+                previous = None
+                for degree in sorted(self._terms, reverse=True):
+                    if previous is not None:
+                        accum = accum * power(value, previous - degree)
+                    accum = accum + self._terms[degree]
+                    if modulus is not None:
+                        accum %= modulus
+                    previous = degree
+                if previous:
+                    accum = accum * power(value, previous)
+                    if modulus is not None:
+                        accum %= modulus
+
+                return from_raw(accum)
+
+            # Horner's rule
+            value = to_raw(point)
+            accum = zero
+            for coefficient in reversed(self._dense):
+                accum = accum * value + coefficient
+                if modulus is not None:
+                    accum %= modulus
+
+            return from_raw(accum)
+
+        def evaluate_many(self, points):
+            """Evaluate at every point of a list, or of a SubproductTree.
+
+            Large lists of points go through a subproduct tree, which can be built
+            once with subproduct_tree and passed instead of the points to evaluate
+            many polynomials at the same points.
+            """
+
+            if isinstance(points, SubproductTree):
+                return points.evaluate(self)
+
+            points = [cast_point(point) for point in points]
+            if min(len(points), self.degree + 1) < SUBPRODUCT_TREE_THRESHOLD:
+                return [self.evaluate(point) for point in points]
+            return SubproductTree(points, self.__class__).evaluate(self)
+
+        @classmethod
+        def interpolate(cls, points, values):
+            """The polynomial of degree less than the number of points which takes
+            the given values at the points.
+
+            The points can be a list of distinct points, or a SubproductTree.
+            """
+
+            if not isinstance(points, SubproductTree):
+                points = SubproductTree(points, cls)
+            return points.interpolate(values)
+
+        @classmethod
+        def subproduct_tree(cls, points):
+            return SubproductTree(points, cls)
+
+        def derivative(self):
+            return self._from_terms(
+                reduce_terms(
+                    {
+                        degree - 1: coefficient * to_raw(degree)
+                        for degree, coefficient in self._get_terms().items()
+                        if degree
+                    }
+                )
+            )
 
         @property
         def degree(self):
-            if len(self.coefficients) == 0:
-                return -1
-            return max(self.coefficients.keys())
+            if self._dense is not None:
+                return len(self._dense) - 1
+            return max(self._terms, default=-1)
 
         def content(self):
             if self.ring is int:
                 return math.gcd(*self.coefficients.values())
             elif self.ring is Fraction:
-                max_denom = max(x.denominator for x in self.coefficients.values())
+                denominator = math.lcm(
+                    *(x.denominator for x in self.coefficients.values())
+                )
                 int_poly = polynomial(
                     {
-                        degree: (coefficient * max_denom).numerator
+                        degree: (coefficient * denominator).numerator
                         for degree, coefficient in self.coefficients.items()
                     },
                     ring=int,
                 )
-                return Fraction(int_poly.content()) / Fraction(max_denom)
+                return Fraction(int_poly.content(), denominator)
 
             return self.ring(1)
 
@@ -298,11 +1170,21 @@ def make_polynomial_ring(base_ring):
             if self.ring is not int and self.ring is not Fraction:
                 return self
 
+            if not self:
+                return polynomial({}, int)
+
+            # exact division, as a float quotient loses digits of large coefficients
             content = self.content()
-            coefficients = {
-                degree: coefficient / content
-                for degree, coefficient in self.coefficients.items()
-            }
+            if self.ring is int:
+                coefficients = {
+                    degree: coefficient // content
+                    for degree, coefficient in self.coefficients.items()
+                }
+            else:
+                coefficients = {
+                    degree: (coefficient / content).numerator
+                    for degree, coefficient in self.coefficients.items()
+                }
             return polynomial(coefficients, int)
 
         def __repr__(self):
@@ -349,6 +1231,6 @@ def make_polynomial_ring(base_ring):
 
     RingElement.__name__ = name
     RingElement.base_ring = base_ring
-    RINGS[name] = RingElement
+    RINGS[base_ring] = RingElement
 
     return RingElement
@@ -1,7 +1,16 @@
+from helga.algos import batch_inverse
 from helga.ring import infer_ring, is_field
 
 
 class ProjectivePoint:
+    """A point of projective space, given by homogeneous coordinates.
+
+    The coordinates are kept as given in raw_coords, and only divided by their last
+    non-zero coordinate when coords (or an item, str or hash) is first read.
+    """
+
+    __slots__ = ("field", "raw_coords", "_coords", "_hash")
+
     def __init__(self, coords, field=None):
         if field is None:
             field = infer_ring(coords)
@@ -13,19 +22,58 @@ class ProjectivePoint:
             if not isinstance(coord, field):
                 coord = field(coord)
             cast.append(coord)
-        coords = tuple(cast)
-
-        for i in reversed(range(len(coords))):
-            factor = coords[i]
-            if factor != field(0):
-                self.coords = tuple(coord / factor for coord in coords)
-                break
-        else:
+        self.raw_coords = tuple(cast)
+
+        if not any(self.raw_coords):
             raise ValueError("all coordinates are zero")
+        self._coords = None
+        self._hash = None
+
+    @classmethod
+    def batch(cls, coords_list, field=None):
+        """Create many points at once, normalising them with a single inversion."""
+
+        coords_list = [tuple(coords) for coords in coords_list]
+        if field is None:
+            field = infer_ring([coord for coords in coords_list for coord in coords])
+
+        points = [cls(coords, field) for coords in coords_list]
+        cls.normalize_all(points)
+        return points
+
+    @staticmethod
+    def normalize_all(points):
+        """Normalise the coordinates of many points with a single inversion."""
+
+        pending = [point for point in points if point._coords is None]
+        factors = [point._last_nonzero() for point in pending]
+        for point, inverse in zip(pending, batch_inverse(factors)):
+            point._coords = tuple(coord * inverse for coord in point.raw_coords)
+
+    @classmethod
+    def _from_normalized(cls, coords, field):
+        point = cls.__new__(cls)
+        point.field = field
+        point.raw_coords = coords
+        point._coords = coords
+        point._hash = None
+        return point
+
+    def _last_nonzero(self):
+        for coord in reversed(self.raw_coords):
+            if coord:
+                return coord
+
+    @property
+    def coords(self):
+        if self._coords is None:
+            inverse = self.field(1) / self._last_nonzero()
+            self._coords = tuple(coord * inverse for coord in self.raw_coords)
+        return self._coords
 
     @property
     def dim(self):
-        return len(self.coords)
+        return len(self.raw_coords)
 
     def __getitem__(self, k):
         return self.coords[k]
@@ -34,13 +82,34 @@ class ProjectivePoint:
         if not isinstance(rhs, ProjectivePoint):
             return NotImplemented
 
-        return self.coords == rhs.coords
+        if self._coords is not None and rhs._coords is not None:
+            return self._coords == rhs._coords
+
+        lhs_coords = self.raw_coords
+        rhs_coords = rhs.raw_coords
+        if len(lhs_coords) != len(rhs_coords):
+            return False
+
+        # the coordinates are proportional if lhs[i] * rhs[k] = rhs[i] * lhs[k] for
+        # every i, where lhs[k] is non-zero
+        k = max(i for i, coord in enumerate(lhs_coords) if coord)
+        lhs_factor = lhs_coords[k]
+        rhs_factor = rhs_coords[k]
+        if not rhs_factor:
+            return False
+
+        return all(
+            lhs * rhs_factor == rhs * lhs_factor
+            for lhs, rhs in zip(lhs_coords, rhs_coords)
+        )
 
     def __hash__(self):
-        return hash(self.coords)
+        if self._hash is None:
+            self._hash = hash(self.coords)
+        return self._hash
 
     def __str__(self):
-        return "[" + " : ".join(str(coord) for coord in self.coords) +  "]"
+        return "[" + " : ".join(str(coord) for coord in self.coords) + "]"
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.coords}, {self.field.__name__})"
@@ -2,6 +2,7 @@ from fractions import Fraction
 
 Q = Fraction
 
+
 def infer_ring(values):
     if not len(values):
         return int
@@ -27,12 +28,20 @@ def is_field(ring):
     return ring is Fraction or ring.__name__.startswith("F")
 
 
+def is_prime_field(ring):
+    if ring is Fraction or not is_field(ring):
+        return False
+
+    return getattr(ring, "degree", None) == 1
+
+
 def get_characteristic(field):
     if field is Fraction:
         return 0
 
     return field.characteristic
 
+
 def field_of_fractions(ring):
     if ring is not int:
         raise NotImplementedError
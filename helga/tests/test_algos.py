@@ -1,9 +1,543 @@
+import math
+import random
 import unittest
+from fractions import Fraction
+from unittest.mock import patch
 
-from helga.algos import gcd
+from helga import algos
+from helga.algos import (
+    CRTBasis,
+    batch_inverse,
+    crt,
+    distinct_degree_factorization,
+    extended_ea,
+    factor,
+    factorint,
+    fft,
+    find_primitive_root,
+    gcd,
+    half_gcd,
+    int_poly_gcd,
+    inverse_ntt,
+    is_irreducible,
+    is_prime,
+    is_primitive_root,
+    multiplicative_order,
+    ntt,
+    ntt_batch,
+    poly_xgcd,
+    prime_factors,
+    primitive_root_of_unity,
+    powmod,
+    rational_reconstruction,
+    square_free_decomposition,
+)
+from helga.finite_field import make_finite_field, make_prime_field
+from helga.polynomial import make_polynomial_ring, polynomial
 
 
 class TestGCD(unittest.TestCase):
     def test_int(self):
         self.assertEqual(gcd(12, 18), 6)
         self.assertEqual(gcd(5, 7), 1)
+
+
+class TestBatchInverse(unittest.TestCase):
+    def test_matches_inverse(self):
+        F_2 = make_prime_field(2)
+        for field in (
+            make_prime_field(101),
+            make_finite_field(101, 1, representation="montgomery"),
+            make_finite_field(2, 8, polynomial("x^8 + x^4 + x^3 + x + 1", F_2)),
+            make_finite_field(2, 4, representation="table"),
+            make_finite_field(3, 3, representation="residue"),
+        ):
+            if field.degree == 1:
+                elements = [field(i) for i in range(1, 40)]
+            else:
+                elements = [field(value) for value in (1, "x", "x + 1", "x^2 + x")]
+            inverses = batch_inverse(elements)
+            self.assertEqual(inverses, [element.inverse() for element in elements])
+
+    def test_rationals(self):
+        elements = [Fraction(2, 3), Fraction(-5), Fraction(7, 11)]
+        self.assertEqual(batch_inverse(elements), [1 / x for x in elements])
+        self.assertEqual(batch_inverse([]), [])
+
+    def test_zero(self):
+        F_7 = make_prime_field(7)
+        with self.assertRaises(ZeroDivisionError):
+            batch_inverse([F_7(3), F_7(0), F_7(2)])
+
+
+class TestIntPolyGCD(unittest.TestCase):
+    def random_polynomial(self, degree, digits, rng):
+        coefficients = [rng.randrange(-(10**digits), 10**digits) for _ in range(degree)]
+        return polynomial(coefficients + [rng.randrange(1, 10**digits)], int)
+
+    def test_small(self):
+        a = polynomial("2x^3 + 4x^2 - 2x - 4")  # 2 (x + 2) (x - 1) (x + 1)
+        b = polynomial("-6x^2 - 6x + 12")  # -6 (x + 2) (x - 1)
+        self.assertEqual(int_poly_gcd(a, b), polynomial("2x^2 + 2x - 4"))
+        self.assertEqual(gcd(a, b, ring=make_polynomial_ring(int)), int_poly_gcd(a, b))
+        self.assertEqual(int_poly_gcd(a, polynomial("x + 3")), polynomial(1))
+        self.assertEqual(int_poly_gcd(polynomial({}), b), -b)
+        self.assertEqual(int_poly_gcd(a, polynomial(6)), polynomial(2))
+
+    def test_large(self):
+        rng = random.Random(8)
+        common = self.random_polynomial(60, 30, rng)
+        a = self.random_polynomial(140, 70, rng) * common
+        b = self.random_polynomial(140, 70, rng) * common
+        expected = common.primitive_part()
+        self.assertEqual(int_poly_gcd(a, b), expected)
+        self.assertEqual(int_poly_gcd(a * 6, b * 4), expected * 2)
+
+        # leading coefficients sharing a factor with the gcd's
+        a = polynomial("3x + 1") * polynomial("5x^2 + 2")
+        b = polynomial("3x + 1") * polynomial("5x^3 + 7")
+        self.assertEqual(int_poly_gcd(a, b), polynomial("3x + 1"))
+
+    def test_unlucky_primes(self):
+        # the inputs are coprime, but share the factor x + 1 modulo the first prime
+        p = 2**62 - 57
+        a = polynomial("x^2 + 1")
+        b = polynomial([1 + p, 1])
+        self.assertEqual(next(algos._descending_primes(2**62)), p)
+        self.assertEqual(int_poly_gcd(a * b, a * a * polynomial("x + 1")), a)
+
+    def test_processes(self):
+        rng = random.Random(9)
+        common = self.random_polynomial(10, 20, rng)
+        a = self.random_polynomial(10, 20, rng) * common
+        b = self.random_polynomial(10, 20, rng) * common
+        self.assertEqual(int_poly_gcd(a, b, processes=2), common.primitive_part())
+
+
+class TestPolynomialGCD(unittest.TestCase):
+    def random_polynomial(self, field, degree, rng):
+        p = field.characteristic
+        return polynomial([rng.randrange(p) for _ in range(degree)] + [1], field)
+
+    def test_small(self):
+        F_7 = make_prime_field(7)
+        a = polynomial("x^3 + 2x + 1", F_7) * polynomial("x + 3", F_7)
+        b = polynomial("x^2 + 1", F_7) * polynomial("3x + 2", F_7)
+        g, s, t, quotients = poly_xgcd(a, b, quotients=True)
+        # 3x + 2 = 3 (x + 3)
+        self.assertEqual(g, polynomial("x + 3", F_7))
+        self.assertEqual(s * a + t * b, g)
+        self.assertEqual(len(quotients), 3)
+        self.assertEqual(gcd(a, b, ring=make_polynomial_ring(F_7)), g)
+        s, t = extended_ea(a, b, ring=make_polynomial_ring(F_7))
+        self.assertEqual(s * a + t * b, g)
+
+        zero = polynomial({}, F_7)
+        self.assertEqual(poly_xgcd(zero, zero), (zero, polynomial(1, F_7), zero))
+        self.assertEqual(poly_xgcd(zero, b)[0] * b.coefficients[b.degree], b)
+
+    def test_half_gcd(self):
+        rng = random.Random(6)
+        F_p = make_prime_field(2**61 - 1)
+        a = self.random_polynomial(F_p, 301, rng)
+        b = self.random_polynomial(F_p, 300, rng)
+        (m00, m01, m10, m11), quotients = half_gcd(a, b)
+        r, s = m00 * a + m01 * b, m10 * a + m11 * b
+        self.assertGreaterEqual(r.degree, 151)
+        self.assertLess(s.degree, 151)
+
+        # the quotients are the first ones of the Euclidean algorithm
+        x, y = a, b
+        for quotient in quotients:
+            self.assertEqual(x // y, quotient)
+            x, y = y, x % y
+        self.assertEqual((x, y), (r, s))
+
+    def test_large(self):
+        rng = random.Random(7)
+        for field in (make_prime_field(2), make_prime_field(2**64 - 59)):
+            common = self.random_polynomial(field, 50, rng)
+            a = self.random_polynomial(field, 250, rng) * common
+            b = self.random_polynomial(field, 240, rng) * common
+            g, s, t, quotients = poly_xgcd(a, b, quotients=True)
+            self.assertEqual(s * a + t * b, g)
+            self.assertEqual(a % g, polynomial({}, field))
+            self.assertEqual(b % g, polynomial({}, field))
+            self.assertGreaterEqual(g.degree, 50)
+            self.assertLess(s.degree, b.degree - g.degree)
+            self.assertLess(t.degree, a.degree - g.degree)
+
+            with patch("helga.algos.HALF_GCD_THRESHOLD", 10**9):
+                expected = poly_xgcd(a, b, quotients=True)
+            self.assertEqual((g, s, t, quotients), expected)
+
+
+class TestCRT(unittest.TestCase):
+    def test_int(self):
+        self.assertEqual(crt([2, 3, 2], [3, 5, 7]), 23)
+        self.assertEqual(crt([1], [4]), 1)
+
+        rng = random.Random(10)
+        moduli = [10**9 + 7, 998244353, 65537, 2**61 - 1, 4, 9, 25, 7, 11]
+        basis = CRTBasis(moduli)
+        self.assertEqual(len(basis), len(moduli))
+        values = [rng.randrange(basis.modulus) for _ in range(20)]
+        residues = list(basis.reduce_many(values))
+        self.assertEqual(residues[0], [values[0] % m for m in moduli])
+        self.assertEqual(list(basis.reconstruct_many(residues)), values)
+        self.assertEqual(crt(residues[1], basis), values[1])
+        self.assertEqual(basis.reconstruct(basis.reduce(-5), symmetric=True), -5)
+
+        with self.assertRaises(ValueError):
+            crt([1, 2], [6, 4])
+        with self.assertRaises(ValueError):
+            basis.reconstruct([1, 2])
+        with self.assertRaises(ValueError):
+            CRTBasis([])
+
+    def test_polynomial(self):
+        F_p = make_prime_field(10007)
+        ring = make_polynomial_ring(F_p)
+        moduli = [polynomial("x^2 + 1", F_p), polynomial("x^3 + 2", F_p)]
+        moduli += [polynomial([-a, 1], F_p) for a in range(1, 40)]
+        basis = CRTBasis(moduli, ring)
+        rng = random.Random(11)
+        f = polynomial([rng.randrange(10007) for _ in range(44)], F_p)
+        self.assertEqual(basis.reconstruct(basis.reduce(f)), f)
+
+        # residues modulo x - a are values at a
+        points = list(range(1, 40))
+        values = [rng.randrange(10007) for _ in points]
+        basis = CRTBasis(moduli[2:], ring)
+        self.assertEqual(
+            basis.reconstruct([polynomial(v, F_p) for v in values]),
+            ring.interpolate(points, values),
+        )
+
+        with self.assertRaises(ValueError):
+            crt([ring(1), ring(2)], [moduli[0], moduli[0] * moduli[1]], ring)
+
+    def test_rational_reconstruction(self):
+        p = 2**61 - 1
+        for fraction in (Fraction(-22, 7), Fraction(0), Fraction(12345, 678)):
+            a = fraction.numerator * pow(fraction.denominator, -1, p) % p
+            self.assertEqual(rational_reconstruction(a, p), fraction)
+        a = 3 * pow(4, -1, 1009) % 1009
+        self.assertEqual(
+            rational_reconstruction(a, 1009, numerator_bound=3, denominator_bound=4),
+            Fraction(3, 4),
+        )
+        a = 5 * pow(7, -1, 1009) % 1009
+        with self.assertRaises(ValueError):
+            rational_reconstruction(a, 1009, denominator_bound=2)
+
+    def test_rational_function_reconstruction(self):
+        F_p = make_prime_field(10007)
+        ring = make_polynomial_ring(F_p)
+        rng = random.Random(12)
+        for degree in (5, 100):
+            n = polynomial([rng.randrange(10007) for _ in range(degree)], F_p)
+            d = polynomial([rng.randrange(10007) for _ in range(degree)] + [1], F_p)
+            m = polynomial({2 * degree + 1: 1}, F_p)
+            _, inverse, _ = poly_xgcd(d, m)
+            self.assertEqual(rational_reconstruction(n * inverse % m, m, ring), (n, d))
+
+        m = polynomial({10: 1}, F_p)
+        with self.assertRaises(ValueError):
+            # x^9 is no n / d with deg n <= 3 and deg d <= 6
+            rational_reconstruction(polynomial({9: 1}, F_p), m, ring, numerator_bound=3)
+
+
+class TestPowmod(unittest.TestCase):
+    def test_int(self):
+        self.assertEqual(powmod(3, 200, 7), pow(3, 200, 7))
+
+    def test_polynomial(self):
+        F_2 = make_prime_field(2)
+        modulus = polynomial("x^3 + x + 1", F_2)
+        x = polynomial("x", F_2)
+        self.assertEqual(powmod(x, 7, modulus), polynomial(1, F_2))
+        self.assertEqual(powmod(x, 2**100, modulus), powmod(x, 2**100 % 7, modulus))
+        self.assertEqual(powmod(x, 0, modulus), polynomial(1, F_2))
+
+    def test_windows(self):
+        rng = random.Random(1)
+        F_p = make_prime_field(1000003)
+        modulus = polynomial([rng.randrange(1000003) for _ in range(40)] + [1], F_p)
+        base = polynomial([rng.randrange(1000003) for _ in range(40)], F_p)
+        for exponent in (1, 2, 3, 31, 32, 1000, 2**64 - 59, 3**200):
+            expected = polynomial(1, F_p)
+            power = base
+            for bit in reversed(bin(exponent)[2:]):
+                if bit == "1":
+                    expected = expected * power % modulus
+                power = power * power % modulus
+            self.assertEqual(powmod(base, exponent, modulus), expected)
+
+
+class TestIrreducible(unittest.TestCase):
+    def test_prime_field(self):
+        F_2 = make_prime_field(2)
+        self.assertTrue(is_irreducible(polynomial("x^2 + x + 1", F_2)))
+        self.assertFalse(is_irreducible(polynomial("x^2 + 1", F_2)))
+        self.assertTrue(is_irreducible(polynomial("x^64 + x^4 + x^3 + x + 1", F_2)))
+        self.assertFalse(is_irreducible(polynomial("x^64 + x^4 + x^3 + 1", F_2)))
+
+    def test_product_of_irreducibles(self):
+        F_3 = make_prime_field(3)
+        lhs = polynomial("x^2 + 1", F_3)
+        rhs = polynomial("x^2 + x + 2", F_3)
+        self.assertTrue(is_irreducible(lhs))
+        self.assertTrue(is_irreducible(rhs))
+        self.assertFalse(is_irreducible(lhs * rhs))
+
+
+class TestFactor(unittest.TestCase):
+    def random_monic(self, field, degree, rng):
+        p = field.characteristic
+        if field.degree == 1:
+            coefficients = [field(rng.randrange(p)) for _ in range(degree)]
+        else:
+            coefficients = [
+                field([rng.randrange(p) for _ in range(field.degree)])
+                for _ in range(degree)
+            ]
+        return polynomial(coefficients + [field(1)], field)
+
+    def assertFactorization(self, f, factors):
+        product = polynomial(f.coefficients[f.degree], f.ring)
+        for g, multiplicity in factors:
+            self.assertEqual(g.coefficients[g.degree], f.ring(1))
+            self.assertTrue(is_irreducible(g))
+            for _ in range(multiplicity):
+                product = product * g
+        self.assertEqual(product, f)
+
+    def test_small(self):
+        F_3 = make_prime_field(3)
+        f = polynomial("2x^5 + x^3 + 2x^2 + 2", F_3)
+        self.assertFactorization(f, factor(f))
+
+        F_2 = make_prime_field(2)
+        lhs = polynomial("x^2 + x + 1", F_2)
+        rhs = polynomial("x + 1", F_2)
+        f = lhs * lhs * lhs * rhs * rhs
+        self.assertEqual(factor(f), [(rhs, 2), (lhs, 3)])
+        self.assertEqual(factor(polynomial(1, F_2)), [])
+
+    def test_square_free_decomposition(self):
+        F_3 = make_prime_field(3)
+        lhs = polynomial("x^2 + 1", F_3)
+        rhs = polynomial("x + 2", F_3)
+        # the multiplicity of lhs is the characteristic, so lhs^3 = lhs(x^3)
+        f = lhs * lhs * lhs * rhs * rhs * rhs * rhs
+        self.assertEqual(square_free_decomposition(f), [(rhs, 4), (lhs, 3)])
+
+    def test_distinct_degree_factorization(self):
+        F_5 = make_prime_field(5)
+        linear = polynomial("x^2 + 4", F_5)  # (x - 2) (x + 2)
+        quadratic = polynomial("x^2 + 2", F_5)
+        cubic = polynomial("x^3 + x + 1", F_5)
+        self.assertEqual(
+            distinct_degree_factorization(linear * quadratic * cubic),
+            [(linear, 1), (quadratic, 2), (cubic, 3)],
+        )
+
+    def test_random(self):
+        rng = random.Random(2)
+        random.seed(2)
+        for field in (
+            make_prime_field(2),
+            make_prime_field(7),
+            make_prime_field(2**61 - 1),
+            make_finite_field(2, 4),
+            make_finite_field(3, 2, representation="residue"),
+        ):
+            for _ in range(4):
+                lhs, middle, rhs = (
+                    self.random_monic(field, rng.randrange(1, 6), rng) for _ in range(3)
+                )
+                f = lhs * middle * middle * rhs * field(field.characteristic - 1)
+                self.assertFactorization(f, factor(f))
+
+    def test_equal_degree(self):
+        random.seed(3)
+        rng = random.Random(3)
+        F_p = make_prime_field(2**64 - 59)
+        irreducibles = []
+        while len(irreducibles) < 4:
+            g = self.random_monic(F_p, 6, rng)
+            if is_irreducible(g):
+                irreducibles.append(g)
+        f = irreducibles[0] * irreducibles[1] * irreducibles[2] * irreducibles[3]
+        self.assertEqual(
+            sorted(str(g) for g, multiplicity in factor(f)),
+            sorted(str(g) for g in irreducibles),
+        )
+
+    def test_large(self):
+        random.seed(4)
+        rng = random.Random(4)
+        F_p = make_prime_field(2**64 - 59)
+        f = self.random_monic(F_p, 120, rng)
+        self.assertFactorization(f, factor(f))
+
+
+class TestPrimitiveRoot(unittest.TestCase):
+    def test_is_primitive_root(self):
+        self.assertTrue(is_primitive_root(3, 7))
+        self.assertFalse(is_primitive_root(2, 7))
+        self.assertFalse(is_primitive_root(7, 7))
+
+    def test_find_primitive_root(self):
+        self.assertEqual(find_primitive_root(7), 3)
+        self.assertEqual(find_primitive_root(998244353), 3)
+        self.assertEqual(find_primitive_root(2), 1)
+        self.assertEqual(find_primitive_root(3), 2)
+        # p - 1 = 2 * 3^2 * 1289 * 198762435067123
+        self.assertEqual(find_primitive_root(2**62 - 57), 6)
+        for n in (1, 15, 2**61 + 1):
+            with self.assertRaises(ValueError):
+                find_primitive_root(n)
+
+    def test_multiplicative_order(self):
+        self.assertEqual(multiplicative_order(2, 7), 3)
+        self.assertEqual(multiplicative_order(6, 7), 2)
+        self.assertEqual(multiplicative_order(1, 7), 1)
+        self.assertEqual(multiplicative_order(3, 998244353), 998244352)
+        with self.assertRaises(ValueError):
+            multiplicative_order(0, 7)
+
+        p = 2**61 - 1
+        for x in (2, 3, 12345):
+            order = multiplicative_order(x, p)
+            self.assertEqual(pow(x, order, p), 1)
+            for factor in set(prime_factors(order)):
+                self.assertNotEqual(pow(x, order // factor, p), 1)
+
+    def test_extension_field(self):
+        for field in (
+            make_finite_field(2, 8),
+            make_finite_field(3, 4, representation="table"),
+            make_finite_field(7, 3, representation="residue"),
+            make_finite_field(2, 61),
+            make_prime_field(101),
+        ):
+            q = field.characteristic**field.degree
+            g = find_primitive_root(field)
+            self.assertIs(find_primitive_root(field), g)
+            self.assertTrue(is_primitive_root(g))
+            self.assertEqual(multiplicative_order(g), q - 1)
+            self.assertFalse(is_primitive_root(g ** prime_factors(q - 1)[0]))
+            self.assertFalse(is_primitive_root(field(0)))
+            self.assertEqual(multiplicative_order(g**3), (q - 1) // math.gcd(q - 1, 3))
+
+        F_16 = make_finite_field(2, 4)
+        elements = [F_16([i >> k & 1 for k in range(4)]) for i in range(1, 16)]
+        orders = [multiplicative_order(x) for x in elements]
+        self.assertEqual(sorted(set(orders)), [1, 3, 5, 15])
+        self.assertEqual(orders.count(15), 8)
+
+    def test_root_of_unity(self):
+        p = 998244353
+        w = primitive_root_of_unity(2**20, p)
+        self.assertEqual(multiplicative_order(w, p), 2**20)
+        self.assertEqual(primitive_root_of_unity(1, p), 1)
+        with self.assertRaises(ValueError):
+            primitive_root_of_unity(3, 17)
+
+        F_64 = make_finite_field(2, 6)
+        w = primitive_root_of_unity(9, F_64)
+        self.assertEqual(multiplicative_order(w), 9)
+        with self.assertRaises(ValueError):
+            primitive_root_of_unity(5, F_64)
+
+    def test_prime_factors(self):
+        self.assertEqual(prime_factors(360), [2, 2, 2, 3, 3, 5])
+        self.assertEqual(prime_factors(1), [])
+        self.assertEqual(prime_factors(97), [97])
+        self.assertEqual(prime_factors(2**64 - 60), [2, 2, 11, 137, 547, 5594472617641])
+
+
+class TestFactorint(unittest.TestCase):
+    def test_is_prime(self):
+        limit = 20000
+        sieve = [True] * limit
+        sieve[0] = sieve[1] = False
+        for i in range(2, math.isqrt(limit) + 1):
+            if sieve[i]:
+                for j in range(i * i, limit, i):
+                    sieve[j] = False
+        self.assertEqual([is_prime(n) for n in range(limit)], sieve)
+
+        # Carmichael numbers and strong pseudoprimes to many bases
+        for n in (561, 41041, 825265, 3215031751, 3825123056546413051):
+            self.assertFalse(is_prime(n))
+        # a strong pseudoprime to every prime base up to 37, left to the Lucas test
+        self.assertFalse(is_prime(318665857834031151167461))
+        for n in (2**61 - 1, 2**64 - 59, 2**89 - 1, 2**127 - 1):
+            self.assertTrue(is_prime(n))
+        self.assertFalse(is_prime((2**61 - 1) * (2**89 - 1)))
+        self.assertFalse(is_prime((2**89 - 1) ** 2))
+
+    def test_factorint(self):
+        self.assertEqual(factorint(1), {})
+        self.assertEqual(factorint(360), {2: 3, 3: 2, 5: 1})
+        self.assertEqual(list(factorint(7 * 5 * 3 * 2)), [2, 3, 5, 7])
+        with self.assertRaises(ValueError):
+            factorint(0)
+
+        p, q = 4294967291, 4294967279
+        self.assertEqual(factorint(p * q), {q: 1, p: 1})
+        self.assertEqual(factorint(p**2 * 3), {3: 1, p: 2})
+        self.assertEqual(
+            factorint(1000000007 * 998244353 * 65537 * 8191),
+            {8191: 1, 65537: 1, 998244353: 1, 1000000007: 1},
+        )
+
+        random.seed(13)
+        rng = random.Random(13)
+        for _ in range(50):
+            n = rng.randrange(1, 2**64)
+            factors = factorint(n)
+            self.assertEqual(math.prod(p**e for p, e in factors.items()), n)
+            self.assertTrue(all(is_prime(p) for p in factors))
+            self.assertEqual(list(factors), sorted(factors))
+
+        # the result is a fresh dict, not the cached one
+        factorint(360)[2] = 0
+        self.assertEqual(factorint(360), {2: 3, 3: 2, 5: 1})
+
+
+class TestNTT(unittest.TestCase):
+    def test_fft(self):
+        # w = 4 has order 4 modulo 17
+        self.assertEqual(fft([1, 2, 3, 4], 4, 17), [10, 7, 15, 6])
+        self.assertEqual(fft([5], 4, 17), [5])
+
+    def test_inverse(self):
+        p = 998244353
+        w = pow(3, (p - 1) // 64, p)
+        vec = list(range(64))
+        self.assertEqual(inverse_ntt(ntt(list(vec), w, p), w, p), vec)
+
+    def test_convolution(self):
+        p = 998244353
+        w = pow(3, (p - 1) // 8, p)
+        lhs = ntt([1, 2, 3, 0, 0, 0, 0, 0], w, p)
+        rhs = ntt([4, 5, 0, 0, 0, 0, 0, 0], w, p)
+        product = inverse_ntt([x * y % p for x, y in zip(lhs, rhs)], w, p)
+        self.assertEqual(product, [4, 13, 22, 15, 0, 0, 0, 0])
+
+    def test_batch(self):
+        p = 998244353
+        w = pow(3, (p - 1) // 16, p)
+        vecs = [list(range(i, i + 16)) for i in range(5)]
+        expected = [fft(vec, w, p) for vec in vecs]
+        self.assertEqual(ntt_batch(vecs, w, p), expected)
+        self.assertEqual(
+            ntt_batch(vecs, w, p, inverse=True),
+            [list(range(i, i + 16)) for i in range(5)],
+        )
+        with self.assertRaises(ValueError):
+            ntt_batch([[1, 2], [1, 2, 3, 4]], w, p)
@@ -1,8 +1,10 @@
 from helga.finite_field import make_finite_field
 from helga.projective_geometry import ProjectivePoint
-from helga.elliptic_curve import make_elliptic_curve
+from helga.elliptic_curve import make_elliptic_curve, wnaf
 
+from fractions import Fraction
 from unittest import TestCase
+from unittest.mock import patch
 
 
 class TestEllipticCurve(TestCase):
@@ -11,21 +13,21 @@ class TestEllipticCurve(TestCase):
         EC = make_elliptic_curve(2, 3, field=F_101)
         point = EC((13, 2, 1))
         self.assertEqual(point + EC.identity(), point)
-    
+
     def test_addition_negative(self):
         F_101 = make_finite_field(101, 1)
         EC = make_elliptic_curve(2, 3, field=F_101)
         point1 = EC((13, 2, 1))
         point2 = EC((13, -2, 1))
         self.assertEqual(point1 + point2, EC.identity())
-    
+
     def test_addition_secant(self):
         F_101 = make_finite_field(101, 1)
         EC = make_elliptic_curve(2, 3, field=F_101)
         point1 = EC((13, 2, 1))
         point2 = EC((3, 95, 1))
         self.assertEqual(point1 + point2, EC((21, 32, 1)))
-    
+
     def test_addition_tangent(self):
         F_101 = make_finite_field(101, 1)
         EC = make_elliptic_curve(2, 3, field=F_101)
@@ -48,3 +50,165 @@ class TestEllipticCurve(TestCase):
         self.assertEqual(point * 1, point)
         self.assertEqual(point * 5, EC((81, 89, 1)))
 
+    def test_montgomery_field(self):
+        F_101 = make_finite_field(101, 1, representation="montgomery")
+        EC = make_elliptic_curve(2, 3, field=F_101)
+        point = EC((13, 2, 1))
+        self.assertEqual(point + point, EC((76, 36, 1)))
+        self.assertEqual(point * 5, EC((81, 89, 1)))
+
+    def test_jacobian_coordinates(self):
+        F_101 = make_finite_field(101, 1)
+        EC = make_elliptic_curve(2, 3, field=F_101)
+        point = EC((13, 2, 1))
+        multiples = [EC.identity()]
+        for _ in range(12):
+            multiples.append(multiples[-1] + point)
+        for i, lhs in enumerate(multiples):
+            for j, rhs in enumerate(multiples):
+                self.assertEqual(lhs + rhs, point * (i + j))
+        # the sum is only normalised when its coordinates are read
+        total = multiples[3] + multiples[4]
+        self.assertEqual(total.point, (point * 7).point)
+        self.assertEqual(total.point[2], F_101(1))
+        self.assertEqual(total, EC(total.point))
+        self.assertNotEqual(total, point * 8)
+
+    def test_slots(self):
+        F_101 = make_finite_field(101, 1)
+        EC = make_elliptic_curve(2, 3, field=F_101)
+        point = EC((13, 2, 1))
+        self.assertFalse(hasattr(point, "__dict__"))
+        self.assertEqual(point.a, F_101(2))
+        self.assertEqual(point.b, F_101(3))
+
+    def test_rational_points(self):
+        EC = make_elliptic_curve(0, 17)
+        point = EC((Fraction(-2), Fraction(3), Fraction(1)))
+        doubled = point + point
+        self.assertEqual(doubled, EC((Fraction(8), Fraction(-23), Fraction(1))))
+        self.assertEqual(doubled + point + point, point * 4)
+
+    def test_multiplication_strategies(self):
+        F_101 = make_finite_field(101, 1)
+        EC = make_elliptic_curve(2, 3, field=F_101)
+        point = EC((13, 2, 1))
+        expected = EC.identity()
+        for n in range(120):
+            for strategy in ("wnaf", "ladder"):
+                self.assertEqual(point.multiply(n, strategy), expected)
+                self.assertEqual(point.multiply(-n, strategy), -expected)
+            expected += point
+        self.assertEqual(EC.identity() * 5, EC.identity())
+        with self.assertRaises(ValueError):
+            point.multiply(3, "foo")
+
+    def test_large_scalar(self):
+        p = 2**256 - 2**32 - 977
+        order = 2**256 - 0x14551231950B75FC4402DA1732FC9BEBF
+        F_p = make_finite_field(p, 1)
+        generator = ProjectivePoint(
+            (
+                0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+                0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+                1,
+            ),
+            F_p,
+        )
+        EC = make_elliptic_curve(0, 7, generator, field=F_p)
+        G = EC.generator()
+        self.assertEqual(G * order, EC.identity())
+        self.assertEqual(G * (order - 1), -G)
+        self.assertEqual(G.multiply(order + 2, "ladder"), G + G)
+
+    def test_fixed_base(self):
+        F_101 = make_finite_field(101, 1)
+        generator = ProjectivePoint((52, 74, 1), F_101)
+        EC = make_elliptic_curve(2, 3, generator, field=F_101)
+        G = EC.generator()
+        self.assertIs(EC.generator(), G)
+        expected = [G.multiply(n, "wnaf") for n in range(-130, 130)]
+        self.assertEqual([G * n for n in range(-130, 130)], expected)
+        self.assertIsNotNone(G._table)
+
+        point = EC((13, 2, 1))
+        with self.assertRaises(ValueError):
+            point.multiply(5, "fixed_base")
+        self.assertIs(point.precompute(bits=6, max_points=10), point)
+        window, bits, rows = point._table
+        self.assertLessEqual(sum(len(row) for row in rows), 10)
+        for n in range(100):
+            self.assertEqual(point * n, point.multiply(n, "wnaf"))
+        self.assertEqual(point.multiply(63, "fixed_base"), point.multiply(63, "wnaf"))
+        with self.assertRaises(ValueError):
+            point.multiply(64, "fixed_base")
+        with self.assertRaises(ValueError):
+            point.precompute(bits=20, max_points=10)
+
+        # a generator whose table would not fit falls back to wNAF
+        EC = make_elliptic_curve(2, 3, generator, field=F_101)
+        with patch("helga.elliptic_curve.FIXED_BASE_TABLE_SIZE", 5):
+            G = EC.generator()
+            self.assertEqual(G * 77, G.multiply(77, "wnaf"))
+            self.assertIsNone(G._table)
+
+        # as does a generator over the rationals
+        G = make_elliptic_curve(-2, 4, generator=(2, 2, 1)).generator()
+        self.assertEqual(G * 3, G.multiply(3, "wnaf"))
+        self.assertIsNone(G._table)
+
+    def test_multi_scalar_mul(self):
+        F_101 = make_finite_field(101, 1)
+        EC = make_elliptic_curve(2, 3, field=F_101)
+        point = EC((13, 2, 1))
+        points = [point * i for i in range(20)]
+        scalars = [(i * 37) % 101 - 50 for i in range(20)]
+        expected = EC.identity()
+        for P, n in zip(points, scalars):
+            expected += P * n
+        for threshold in (1000, 1):
+            with patch("helga.elliptic_curve.PIPPENGER_THRESHOLD", threshold):
+                self.assertEqual(EC.multi_scalar_mul(points, scalars), expected)
+                self.assertEqual(
+                    EC.multi_scalar_mul(points[:3], [0, 5, 0]), points[1] * 5
+                )
+                self.assertEqual(EC.multi_scalar_mul([], []), EC.identity())
+        with self.assertRaises(ValueError):
+            EC.multi_scalar_mul(points, scalars[:3])
+
+    def test_normalize_all(self):
+        F_101 = make_finite_field(101, 1)
+        EC = make_elliptic_curve(2, 3, field=F_101)
+        point = EC((13, 2, 1))
+        points = [point * i for i in range(8)]
+        normalized = EC.normalize_all(points)
+        self.assertEqual(normalized, points)
+        for lhs, rhs in zip(normalized[1:], points[1:]):
+            self.assertEqual(lhs._z, F_101(1))
+            self.assertEqual(lhs.point, rhs.point)
+        self.assertTrue(normalized[0].is_inf())
+
+    def test_batch_add(self):
+        F_101 = make_finite_field(101, 1)
+        EC = make_elliptic_curve(2, 3, field=F_101)
+        point = EC((13, 2, 1))
+        lhs = [point * i for i in range(6)] + [point * 3]
+        rhs = [point * (5 - i) for i in range(6)] + [-point * 3]
+        sums = EC.batch_add(lhs, rhs)
+        self.assertEqual(sums, [a + b for a, b in zip(lhs, rhs)])
+        self.assertEqual(sums[1], point * 5)
+        self.assertEqual(sums[1].point, (point * 5).point)
+        self.assertTrue(sums[-1].is_inf())
+        with self.assertRaises(ValueError):
+            EC.batch_add(lhs, rhs[:2])
+
+    def test_wnaf(self):
+        for n in range(1, 300):
+            for width in (2, 3, 4, 5):
+                digits = wnaf(n, width)
+                self.assertEqual(sum(d << i for i, d in enumerate(digits)), n)
+                for i, digit in enumerate(digits):
+                    if digit:
+                        self.assertEqual(digit % 2, 1)
+                        self.assertLess(abs(digit), 1 << (width - 1))
+                        self.assertFalse(any(digits[i + 1 : i + width]))
@@ -0,0 +1,61 @@
+import unittest
+
+from helga.field_array import FieldArray
+from helga.finite_field import make_finite_field, make_prime_field
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestFieldArray(unittest.TestCase):
+    def test_conversion(self):
+        F_7 = make_prime_field(7)
+        array = FieldArray(F_7, [1, 9, -1, F_7(3)])
+        self.assertEqual(array.to_elements(), [F_7(1), F_7(2), F_7(6), F_7(3)])
+        self.assertEqual(FieldArray.from_elements(F_7, array.to_elements()), array)
+        self.assertEqual(array[1], F_7(2))
+        self.assertEqual(array[1:3], FieldArray(F_7, [2, 6]))
+        self.assertEqual(list(array), array.to_elements())
+        with self.assertRaises(ValueError):
+            FieldArray(make_finite_field(2, 3), [1])
+
+    def test_arithmetic(self):
+        for p in (101, 2**31 - 1, 2**61 - 1):
+            F_p = make_prime_field(p)
+            for field in (F_p, make_finite_field(p, 1, representation="montgomery")):
+                lhs = [field(i * 7919 + 3) or field(1) for i in range(50)]
+                rhs = [field(i * 104729 + 1) or field(1) for i in range(50)]
+                lhs_array = FieldArray(field, lhs)
+                rhs_array = FieldArray(field, rhs)
+
+                def check(array, expected):
+                    self.assertEqual(array.to_elements(), expected)
+
+                check(lhs_array + rhs_array, [a + b for a, b in zip(lhs, rhs)])
+                check(lhs_array - rhs_array, [a - b for a, b in zip(lhs, rhs)])
+                check(lhs_array * rhs_array, [a * b for a, b in zip(lhs, rhs)])
+                check(lhs_array / rhs_array, [a / b for a, b in zip(lhs, rhs)])
+                check(-lhs_array, [-a for a in lhs])
+                check(lhs_array * 3, [a * field(3) for a in lhs])
+                check(2 - lhs_array, [field(2) - a for a in lhs])
+                check(lhs_array**5, [a**5 for a in lhs])
+                check(lhs_array**-2, [a.inverse() ** 2 for a in lhs])
+                check(lhs_array.inverse(), [a.inverse() for a in lhs])
+
+                expected = field(0)
+                for a, b in zip(lhs, rhs):
+                    expected = expected + a * b
+                self.assertEqual(lhs_array.dot(rhs_array), expected)
+
+    def test_errors(self):
+        F_7 = make_prime_field(7)
+        F_11 = make_prime_field(11)
+        with self.assertRaises(ZeroDivisionError):
+            FieldArray(F_7, [1, 0]).inverse()
+        with self.assertRaises(ValueError):
+            FieldArray(F_7, [1, 2]) + FieldArray(F_7, [1])
+        with self.assertRaises(TypeError):
+            FieldArray(F_7, [1, 2]) + FieldArray(F_11, [1, 2])
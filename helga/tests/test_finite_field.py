@@ -61,6 +61,10 @@ class TestPrimeField(unittest.TestCase):
     def test_inverse(self):
         F_7 = make_prime_field(7)
         self.assertEqual(F_7(3).inverse(), F_7(5))
+        with self.assertRaises(ZeroDivisionError):
+            F_7(0).inverse()
+        with self.assertRaises(ZeroDivisionError):
+            F_7(3) / F_7(0)
 
     def test_div(self):
         F_7 = make_prime_field(7)
@@ -101,6 +105,27 @@ class TestPrimeField(unittest.TestCase):
             x = F_3(2)
             x /= F_7(4)
 
+    def test_hash(self):
+        F_7 = make_prime_field(7)
+        self.assertEqual(len({F_7(3), F_7(10), F_7(4)}), 2)
+        self.assertEqual({F_7(3): "a"}[F_7(-4)], "a")
+
+    def test_compact(self):
+        F_7 = make_prime_field(7)
+        x = F_7(3)
+        self.assertFalse(hasattr(x, "__dict__"))
+        self.assertEqual(x.divisor, 7)
+        self.assertEqual(x.field_characteristic, 7)
+        self.assertIs(x.base_field, F_7)
+        self.assertEqual(F_7(x), x)
+
+    def test_iadd_does_not_alias(self):
+        F_7 = make_prime_field(7)
+        x = F_7(3)
+        y = x
+        x += F_7(1)
+        self.assertEqual(y, F_7(3))
+
 
 class TestNonPrimeField(unittest.TestCase):
     def test_construction_from_poly(self):
@@ -117,8 +142,201 @@ class TestNonPrimeField(unittest.TestCase):
         F_7 = make_prime_field(7)
         F_343 = make_finite_field(7, 3, polynomial("x^3 - 3", F_7))
         self.assertEqual(F_343("x^2 + 1").inverse(), F_343("2x^2 + x + 5"))
+        with self.assertRaises(ZeroDivisionError):
+            F_343(0).inverse()
 
     def test_pow(self):
         F_7 = make_prime_field(7)
         F_343 = make_finite_field(7, 3, polynomial("x^3 - 3", F_7))
         self.assertEqual(F_343("x^2 + 1") ** 2, F_343("2x^2 + 3x + 1"))
+
+    def test_hash(self):
+        F_2 = make_prime_field(2)
+        for representation in ("residue", "table", "binary"):
+            F_16 = make_finite_field(2, 4, representation=representation)
+            elements = {F_16("x^3 + 1"), F_16("x^3 + 1"), F_16("x"), F_16(0)}
+            self.assertEqual(len(elements), 3)
+            self.assertFalse(hasattr(F_16("x"), "__dict__"))
+        F_9 = make_finite_field(3, 2)
+        self.assertEqual(F_9("x").divisor, F_9.divisor)
+        self.assertEqual(F_9("x").base_field, make_prime_field(3))
+        self.assertEqual(F_9(polynomial("x", make_prime_field(3))), F_9("x"))
+
+    def test_int(self):
+        # the base-p digits of int() are the coefficients in every representation
+        for representation in ("residue", "table", "binary"):
+            F_16 = make_finite_field(2, 4, representation=representation)
+            self.assertEqual(int(F_16("x^3 + 1")), 0b1001)
+            self.assertEqual(int(F_16(0)), 0)
+        for representation in ("residue", "table"):
+            F_9 = make_finite_field(3, 2, representation=representation)
+            self.assertEqual(int(F_9("2x + 1")), 7)
+            self.assertEqual(int(F_9(0)), 0)
+
+
+class TestTableField(unittest.TestCase):
+    def test_matches_residue_field(self):
+        F_2 = make_prime_field(2)
+        F_7 = make_prime_field(7)
+        for p, n, irreducible_polynomial in (
+            (2, 8, polynomial("x^8 + x^4 + x^3 + x + 1", F_2)),
+            (7, 3, polynomial("x^3 - 3", F_7)),
+            (3, 5, None),
+        ):
+            residue = make_finite_field(
+                p, n, irreducible_polynomial, representation="residue"
+            )
+            table = make_finite_field(
+                p, n, irreducible_polynomial, representation="table"
+            )
+            self.assertEqual(table.representation, "table")
+            F_p = make_prime_field(p)
+            values = [
+                polynomial([(i * 7 + j * 3) % p for j in range(n)], F_p)
+                for i in range(12)
+            ]
+            for lhs in values:
+                for rhs in values:
+                    self.assertSameResults(
+                        residue(lhs), residue(rhs), table(lhs), table(rhs)
+                    )
+                self.assertEqual((table(lhs) ** 5).value, (residue(lhs) ** 5).value)
+
+    def assertSameResults(self, lhs, rhs, table_lhs, table_rhs):
+        self.assertEqual((table_lhs + table_rhs).value, (lhs + rhs).value)
+        self.assertEqual((table_lhs - table_rhs).value, (lhs - rhs).value)
+        self.assertEqual((table_lhs * table_rhs).value, (lhs * rhs).value)
+        self.assertEqual((-table_lhs).value, (-lhs).value)
+        if rhs:
+            self.assertEqual((table_lhs / table_rhs).value, (lhs / rhs).value)
+
+    def test_zero(self):
+        F_256 = make_finite_field(2, 8, representation="table")
+        zero = F_256(0)
+        x = F_256("x")
+        self.assertFalse(zero)
+        self.assertEqual(zero.value, polynomial(0, make_prime_field(2)))
+        self.assertEqual(x + x, zero)
+        self.assertEqual(x * zero, zero)
+        self.assertEqual(zero**0, F_256(1))
+        with self.assertRaises(ZeroDivisionError):
+            zero.inverse()
+
+    def test_primitive_element(self):
+        F_256 = make_finite_field(2, 8, representation="table")
+        g = F_256.primitive_element
+        self.assertEqual(g.log, 1)
+        self.assertEqual(len({(g**k).log for k in range(255)}), 255)
+        self.assertEqual(g**255, F_256(1))
+
+    def test_too_large(self):
+        with self.assertRaises(ValueError):
+            make_finite_field(2, 17, representation="table")
+        with self.assertRaises(ValueError):
+            make_finite_field(7, 1, representation="table")
+        with self.assertRaises(ValueError):
+            make_finite_field(7, 2, representation="foo")
+
+
+class TestBinaryField(unittest.TestCase):
+    def test_default(self):
+        self.assertEqual(make_finite_field(2, 8).representation, "binary")
+        self.assertEqual(make_finite_field(2, 1).representation, "residue")
+        self.assertEqual(make_finite_field(3, 2).representation, "residue")
+        with self.assertRaises(ValueError):
+            make_finite_field(3, 2, representation="binary")
+
+    def test_matches_residue_field(self):
+        F_2 = make_prime_field(2)
+        for n, irreducible_polynomial in (
+            (8, polynomial("x^8 + x^4 + x^3 + x + 1", F_2)),
+            (8, polynomial("x^8 + x^7 + x^6 + x + 1", F_2)),
+            (64, None),
+        ):
+            residue = make_finite_field(
+                2, n, irreducible_polynomial, representation="residue"
+            )
+            binary = make_finite_field(2, n, irreducible_polynomial)
+            values = [
+                polynomial([(i * j * 7 + j // 3) % 5 % 2 for j in range(n)], F_2)
+                for i in range(10)
+            ]
+            for lhs in values:
+                for rhs in values:
+                    self.assertEqual(
+                        (binary(lhs) + binary(rhs)).value,
+                        (residue(lhs) + residue(rhs)).value,
+                    )
+                    self.assertEqual(
+                        (binary(lhs) * binary(rhs)).value,
+                        (residue(lhs) * residue(rhs)).value,
+                    )
+                    if rhs:
+                        self.assertEqual(
+                            (binary(lhs) / binary(rhs)).value,
+                            (residue(lhs) / residue(rhs)).value,
+                        )
+                self.assertEqual((binary(lhs) ** 5).value, (residue(lhs) ** 5).value)
+
+    def test_int(self):
+        F_2 = make_prime_field(2)
+        F_256 = make_finite_field(2, 8, polynomial("x^8 + x^4 + x^3 + x + 1", F_2))
+        self.assertEqual(int(F_256("x^7 + x + 1")), 0b10000011)
+        self.assertEqual(F_256.from_int(0b10000011), F_256("x^7 + x + 1"))
+        self.assertEqual(F_256.from_int(0x100), F_256.from_int(0x1B))
+        # the AES S-box is built on this inverse
+        self.assertEqual(int(F_256.from_int(0x53).inverse()), 0xCA)
+
+    def test_large_field(self):
+        F = make_finite_field(2, 233)
+        x = F("x")
+        self.assertEqual(x ** (2**233 - 1), F(1))
+        self.assertEqual(x * x.inverse(), F(1))
+        self.assertEqual(-x, x)
+        self.assertFalse(x - x)
+        with self.assertRaises(ZeroDivisionError):
+            F(0).inverse()
+
+
+class TestMontgomeryField(unittest.TestCase):
+    def test_matches_residue_field(self):
+        for p in (101, 2**127 - 1, 2**256 - 2**32 - 977):
+            residue = make_prime_field(p)
+            montgomery = make_finite_field(p, 1, representation="montgomery")
+            values = [0, 1, 2, p - 1, p // 3, -5, 3 * p + 7]
+            for lhs in values:
+                for rhs in values:
+                    self.assertSameResults(
+                        residue(lhs), residue(rhs), montgomery(lhs), montgomery(rhs)
+                    )
+                for power in (0, 1, 2, 3, 15, 16, p - 2):
+                    expected = residue(lhs) ** power
+                    self.assertEqual((montgomery(lhs) ** power).value, expected.value)
+                self.assertEqual((-montgomery(lhs)).value, (-residue(lhs)).value)
+
+    def assertSameResults(self, lhs, rhs, montgomery_lhs, montgomery_rhs):
+        self.assertEqual(int(montgomery_lhs + montgomery_rhs), (lhs + rhs).value)
+        self.assertEqual(int(montgomery_lhs - montgomery_rhs), (lhs - rhs).value)
+        self.assertEqual(int(montgomery_lhs * montgomery_rhs), (lhs * rhs).value)
+        if rhs.value:
+            self.assertEqual(int(montgomery_lhs / montgomery_rhs), (lhs / rhs).value)
+
+    def test_boundaries(self):
+        F_101 = make_finite_field(101, 1, representation="montgomery")
+        self.assertEqual(F_101(3), F_101(104))
+        self.assertNotEqual(F_101(3), F_101(4))
+        # like the residue field, elements are never equal to integers
+        self.assertNotEqual(F_101(3), 3)
+        self.assertEqual(int(F_101(104)), 3)
+        self.assertEqual(F_101(F_101(3)), F_101(3))
+        self.assertEqual(int(F_101(-1)), 100)
+        self.assertEqual(repr(F_101(5)), "F_101(5)")
+        self.assertFalse(F_101(101))
+        with self.assertRaises(ZeroDivisionError):
+            F_101(0).inverse()
+        with self.assertRaises(ZeroDivisionError):
+            F_101(1) / F_101(0)
+        with self.assertRaises(ValueError):
+            make_finite_field(2, 1, representation="montgomery")
+        with self.assertRaises(ValueError):
+            make_finite_field(3, 2, representation="montgomery")
@@ -0,0 +1,231 @@
+import random
+import unittest
+from fractions import Fraction
+
+from helga.finite_field import make_finite_field, make_prime_field
+from helga.matrix import Matrix
+
+
+def random_matrix(field, nrows, ncols, rng, order):
+    return Matrix(
+        [[field(rng.randrange(order)) for _ in range(ncols)] for _ in range(nrows)],
+        field,
+    )
+
+
+def low_rank_matrix(field, nrows, ncols, rank, rng, order):
+    lhs = random_matrix(field, nrows, rank, rng, order)
+    rhs = random_matrix(field, rank, ncols, rng, order)
+    return lhs * rhs
+
+
+def reference_rref(matrix):
+    rows = matrix.to_lists()
+    zero = matrix.field(0)
+    rank = 0
+    for col in range(matrix.ncols):
+        pivot = next((r for r in range(rank, len(rows)) if rows[r][col] != zero), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        value = rows[rank][col]
+        rows[rank] = [x / value for x in rows[rank]]
+        for r in range(len(rows)):
+            if r != rank and rows[r][col] != zero:
+                value = rows[r][col]
+                rows[r] = [x - value * y for x, y in zip(rows[r], rows[rank])]
+        rank += 1
+    return Matrix(rows, matrix.field)
+
+
+class TestMatrix(unittest.TestCase):
+    def fields(self):
+        return [
+            (make_prime_field(2), 2),
+            (make_prime_field(7), 7),
+            (make_finite_field(101, 1, representation="montgomery"), 101),
+            (Fraction, 10),
+        ]
+
+    def test_construction(self):
+        F_7 = make_prime_field(7)
+        matrix = Matrix([[1, 2, 3], [4, 5, 13]], F_7)
+        self.assertEqual(matrix.shape, (2, 3))
+        self.assertEqual(matrix[1, 2], F_7(6))
+        self.assertEqual(matrix.to_lists()[0], [F_7(1), F_7(2), F_7(3)])
+        self.assertEqual(Matrix([[F_7(1), F_7(2)]]).field, F_7)
+        self.assertEqual(matrix.transpose(), Matrix([[1, 4], [2, 5], [3, 6]], F_7))
+        with self.assertRaises(ValueError):
+            Matrix([[1, 2], [3]], F_7)
+
+        F_2 = make_prime_field(2)
+        matrix = Matrix([[1, 0, 1], [0, 1, 1]], F_2)
+        self.assertEqual(matrix[0, 2], F_2(1))
+        self.assertEqual(matrix[1, 0], F_2(0))
+        self.assertEqual(matrix.transpose(), Matrix([[1, 0], [0, 1], [1, 1]], F_2))
+
+    def test_arithmetic(self):
+        rng = random.Random(1)
+        for field, order in self.fields():
+            lhs = random_matrix(field, 3, 4, rng, order)
+            rhs = random_matrix(field, 4, 2, rng, order)
+            entries = lhs.to_lists()
+            columns = rhs.transpose().to_lists()
+            zero = field(0)
+            expected = [
+                [sum((a * b for a, b in zip(row, column)), zero) for column in columns]
+                for row in entries
+            ]
+            self.assertEqual((lhs * rhs).to_lists(), expected)
+            self.assertEqual(lhs + lhs - lhs, lhs)
+            self.assertEqual(Matrix.identity(3, field) * lhs, lhs)
+            with self.assertRaises(ValueError):
+                rhs * rhs
+
+    def test_gf2_multiplication(self):
+        rng = random.Random(2)
+        F_2 = make_prime_field(2)
+        lhs = random_matrix(F_2, 20, 37, rng, 2)
+        rhs = random_matrix(F_2, 37, 11, rng, 2)
+        generic = [
+            [sum((lhs[i, k] * rhs[k, j] for k in range(37)), F_2(0)) for j in range(11)]
+            for i in range(20)
+        ]
+        self.assertEqual((lhs * rhs).to_lists(), generic)
+
+    def test_determinant(self):
+        F_7 = make_prime_field(7)
+        matrix = Matrix([[2, 0, 1], [1, 3, 2], [1, 1, 1]], F_7)
+        # 2 * (3 - 2) - 0 + 1 * (1 - 3) = 0
+        self.assertEqual(matrix.determinant(), F_7(0))
+        matrix = Matrix([[0, 1], [1, 0]], F_7)
+        self.assertEqual(matrix.determinant(), F_7(-1))
+        matrix = Matrix([[Fraction(1), Fraction(2)], [Fraction(3), Fraction(4)]])
+        self.assertEqual(matrix.determinant(), Fraction(-2))
+        for field in (make_finite_field(2, 4), make_finite_field(3, 2)):
+            x = field("x")
+            self.assertEqual(Matrix.identity(2, field).determinant(), field(1))
+            matrix = Matrix([[x, field(1)], [field(2), x]], field)
+            self.assertEqual(matrix.determinant(), field("x^2 - 2"))
+        with self.assertRaises(ValueError):
+            Matrix([[1, 2]], F_7).determinant()
+
+        rng = random.Random(3)
+        for field, order in self.fields():
+            lhs = random_matrix(field, 5, 5, rng, order)
+            rhs = random_matrix(field, 5, 5, rng, order)
+            self.assertEqual(
+                (lhs * rhs).determinant(), lhs.determinant() * rhs.determinant()
+            )
+
+    def test_rank_and_kernel(self):
+        rng = random.Random(4)
+        for field, order in self.fields():
+            for nrows, ncols, rank in ((6, 9, 4), (9, 6, 3), (40, 40, 25)):
+                matrix = low_rank_matrix(field, nrows, ncols, rank, rng, order)
+                self.assertLessEqual(matrix.rank(), rank)
+                kernel = matrix.kernel()
+                self.assertEqual(kernel.shape, (ncols - matrix.rank(), ncols))
+                self.assertEqual(kernel.rank(), kernel.nrows)
+                self.assertEqual(
+                    matrix * kernel.transpose(),
+                    Matrix.zeros(nrows, kernel.nrows, field),
+                )
+
+        F_5 = make_prime_field(5)
+        self.assertEqual(Matrix.identity(4, F_5).kernel().shape, (0, 4))
+        self.assertEqual(Matrix.zeros(2, 3, F_5).rank(), 0)
+
+    def test_rref(self):
+        rng = random.Random(9)
+        for field, order in self.fields():
+            for nrows, ncols, rank in ((3, 6, 3), (8, 8, 5), (30, 40, 20)):
+                matrix = low_rank_matrix(field, nrows, ncols, rank, rng, order)
+                reduced, pivots = matrix.rref()
+                self.assertEqual(reduced, Matrix(reduced.to_lists(), field))
+                self.assertEqual(reduced, reference_rref(matrix))
+                rows = reduced.to_lists()[: len(pivots)]
+                self.assertEqual(pivots, [row.index(field(1)) for row in rows])
+
+    def test_inverse(self):
+        rng = random.Random(5)
+        for field, order in self.fields():
+            for n in (1, 4, 30):
+                matrix = random_matrix(field, n, n, rng, order)
+                while matrix.rank() < n:
+                    matrix = random_matrix(field, n, n, rng, order)
+                self.assertEqual(matrix * matrix.inverse(), Matrix.identity(n, field))
+
+            singular = low_rank_matrix(field, 5, 5, 3, rng, order)
+            with self.assertRaises(ValueError):
+                singular.inverse()
+
+    def test_solve(self):
+        rng = random.Random(6)
+        for field, order in self.fields():
+            matrix = low_rank_matrix(field, 12, 10, 7, rng, order)
+            x = [field(rng.randrange(order)) for _ in range(10)]
+            b = (matrix * Matrix([[entry] for entry in x], field)).transpose()
+            solution = matrix.solve(b.to_lists()[0])
+            self.assertEqual(len(solution), 10)
+            check = matrix * Matrix([[entry] for entry in solution], field)
+            self.assertEqual(check, b.transpose())
+
+            rhs = random_matrix(field, 12, 3, rng, order)
+            if matrix.rank() < 12:
+                with self.assertRaises(ValueError):
+                    matrix.solve(rhs)
+
+            square = random_matrix(field, 6, 6, rng, order)
+            while square.rank() < 6:
+                square = random_matrix(field, 6, 6, rng, order)
+            rhs = random_matrix(field, 6, 3, rng, order)
+            self.assertEqual(square * square.solve(rhs), rhs)
+
+    def test_extension_field(self):
+        F_8 = make_finite_field(2, 3)
+        F_9 = make_finite_field(3, 2, representation="residue")
+        rng = random.Random(7)
+        for field in (F_8, F_9):
+            elements = [field(int(i)) for i in range(field.characteristic)]
+            elements += [field("x"), field("x") + field(1)]
+            matrix = Matrix(
+                [[rng.choice(elements) for _ in range(5)] for _ in range(5)], field
+            )
+            if matrix.rank() == 5:
+                self.assertEqual(matrix * matrix.inverse(), Matrix.identity(5, field))
+            kernel = matrix.kernel()
+            self.assertEqual(
+                matrix * kernel.transpose(), Matrix.zeros(5, kernel.nrows, field)
+            )
+
+    def test_large_systems(self):
+        rng = random.Random(8)
+        F_2 = make_prime_field(2)
+        n = 300
+        matrix = Matrix([[rng.randrange(2) for _ in range(n)] for _ in range(n)], F_2)
+        rank = matrix.rank()
+        # compare with plain elimination on the bit rows
+        rows = list(matrix._rows)
+        plain_rank = 0
+        for col in range(n):
+            for r in range(plain_rank, n):
+                if rows[r] >> col & 1:
+                    break
+            else:
+                continue
+            rows[plain_rank], rows[r] = rows[r], rows[plain_rank]
+            for s in range(n):
+                if s != plain_rank and rows[s] >> col & 1:
+                    rows[s] ^= rows[plain_rank]
+            plain_rank += 1
+        self.assertEqual(rank, plain_rank)
+
+        x = [rng.randrange(2) for _ in range(n)]
+        b = matrix * Matrix([[entry] for entry in x], F_2)
+        solution = matrix.solve(b)
+        self.assertEqual(matrix * solution, b)
+
+        F_p = make_prime_field(10007)
+        matrix = random_matrix(F_p, 60, 60, rng, 10007)
+        self.assertEqual(matrix * matrix.inverse(), Matrix.identity(60, F_p))
@@ -1,8 +1,16 @@
 from fractions import Fraction
+import random
 import unittest
+from unittest.mock import patch
 
-from helga.polynomial import parse_polynomial_string, polynomial
-from helga.finite_field import make_prime_field
+from helga.polynomial import (
+    SubproductTree,
+    make_polynomial_ring,
+    multiplication_strategy,
+    parse_polynomial_string,
+    polynomial,
+)
+from helga.finite_field import make_finite_field, make_prime_field
 
 
 class TestParsePolynomialString(unittest.TestCase):
@@ -255,3 +263,287 @@ class TestPolynomial(unittest.TestCase):
             polynomial("x") * F_3(2)
         with self.assertRaises(TypeError):
             polynomial("x", F_3) * F_7(2)
+
+    def test_content(self):
+        f = polynomial([6 * 10**40 + 6, -9, 12])
+        self.assertEqual(f.content(), 3)
+        self.assertEqual(f.primitive_part(), polynomial([2 * 10**40 + 2, -3, 4]))
+
+        f = polynomial([Fraction(1, 2), Fraction(1, 3)])
+        self.assertEqual(f.content(), Fraction(1, 6))
+        self.assertEqual(f.primitive_part(), polynomial([3, 2]))
+        self.assertEqual(polynomial({}).primitive_part(), polynomial({}))
+
+
+class TestRepresentation(unittest.TestCase):
+    def test_automatic(self):
+        self.assertEqual(polynomial("1 + 4x^2 + 5x^3").representation, "dense")
+        self.assertEqual(polynomial("1 + x^1000").representation, "sparse")
+        self.assertEqual(polynomial([1, 0, 4, 5]).representation, "dense")
+
+    def test_requested(self):
+        poly = polynomial("1 + x^1000", representation="dense")
+        self.assertEqual(poly.representation, "dense")
+        self.assertEqual(poly.coefficients, {0: 1, 1000: 1})
+        poly = polynomial("1 + x", representation="sparse")
+        self.assertEqual(poly.representation, "sparse")
+        self.assertEqual(poly.with_representation("dense").representation, "dense")
+        with self.assertRaises(ValueError):
+            polynomial("x", representation="foo")
+
+    def test_eq(self):
+        dense = polynomial("1 + 4x^2 + 5x^3", representation="dense")
+        sparse = polynomial("1 + 4x^2 + 5x^3", representation="sparse")
+        self.assertEqual(dense, sparse)
+        self.assertEqual(sparse, dense)
+
+    def test_mixed_arithmetic(self):
+        F_7 = make_prime_field(7)
+        for ring in (int, Fraction, F_7):
+            dense = polynomial("3 + 4x^2 + 5x^3", ring, representation="dense")
+            sparse = polynomial("1 - x + 2x^4", ring, representation="sparse")
+            monic = polynomial("x^2 + 1", ring, representation="sparse")
+            self.assertEqual(
+                dense + sparse, polynomial("4 - x + 4x^2 + 5x^3 + 2x^4", ring)
+            )
+            self.assertEqual(
+                dense - sparse, polynomial("2 + x + 4x^2 + 5x^3 - 2x^4", ring)
+            )
+            self.assertEqual(
+                dense * sparse,
+                polynomial("3 - 3x + 4x^2 + x^3 + x^4 + 8x^6 + 10x^7", ring),
+            )
+            self.assertEqual(dense * sparse, sparse * dense)
+            self.assertEqual(
+                dense * sparse, dense.with_representation("sparse") * sparse
+            )
+            quotient, remainder = dense / monic
+            self.assertEqual(quotient * monic + remainder, dense)
+            self.assertLess(remainder.degree, monic.degree)
+
+    def test_prime_field_wraps_values(self):
+        F_5 = make_prime_field(5)
+        poly = polynomial([4, 4, 4], F_5) * polynomial([4, 1], F_5)
+        self.assertEqual(poly.coefficients, {0: F_5(1), 3: F_5(4)})
+        self.assertEqual(poly, polynomial([1, 0, 0, 4], F_5))
+        self.assertEqual(poly.evaluate(F_5(2)), F_5(3))
+
+
+class TestMultiplication(unittest.TestCase):
+    def assertMatchesSchoolbook(self, lhs, rhs):
+        expected = lhs.with_representation("sparse") * rhs.with_representation("sparse")
+        self.assertEqual(lhs * rhs, expected)
+        self.assertEqual(rhs * lhs, expected)
+
+    def test_large_products(self):
+        rng = random.Random(0)
+        F_101 = make_prime_field(101)
+        for ring, make in (
+            (int, lambda: rng.randint(-1000, 1000)),
+            (F_101, lambda: rng.randrange(101)),
+            (Fraction, lambda: Fraction(rng.randint(-9, 9), rng.randint(1, 9))),
+        ):
+            for n, m in ((150, 150), (300, 40), (301, 250), (35, 33)):
+                lhs = polynomial([make() for _ in range(n)], ring)
+                rhs = polynomial([make() for _ in range(m)], ring)
+                self.assertMatchesSchoolbook(lhs, rhs)
+
+    def test_large_product_over_extension_field(self):
+        rng = random.Random(1)
+        F_7 = make_prime_field(7)
+        F_343 = make_finite_field(7, 3, polynomial("x^3 - 3", F_7))
+
+        def make():
+            return F_343(polynomial([rng.randrange(7) for _ in range(3)], F_7))
+
+        lhs = polynomial([make() for _ in range(70)], F_343)
+        rhs = polynomial([make() for _ in range(50)], F_343)
+        self.assertMatchesSchoolbook(lhs, rhs)
+
+    def test_strategies(self):
+        rng = random.Random(2)
+        F_101 = make_prime_field(101)
+        F_998244353 = make_prime_field(998244353)
+        for ring, make, strategies in (
+            (int, lambda: rng.randint(-(10**30), 10**30), ["multi_ntt"]),
+            (F_101, lambda: rng.randrange(101), ["kronecker", "multi_ntt"]),
+            (
+                F_998244353,
+                lambda: rng.randrange(998244353),
+                ["kronecker", "ntt", "multi_ntt"],
+            ),
+            (
+                Fraction,
+                lambda: Fraction(rng.randint(-9, 9), rng.randint(1, 9)),
+                ["multi_ntt"],
+            ),
+        ):
+            lhs = polynomial([make() for _ in range(100)], ring)
+            rhs = polynomial([make() for _ in range(77)], ring)
+            expected = lhs.multiply(rhs, "schoolbook")
+            for strategy in ["sparse", "karatsuba"] + strategies:
+                self.assertEqual(lhs.multiply(rhs, strategy), expected)
+
+        with self.assertRaises(ValueError):
+            lhs = polynomial([1] * 10, make_prime_field(7))
+            lhs.multiply(lhs, "ntt")
+        with self.assertRaises(ValueError):
+            lhs = polynomial([1] * 10, int)
+            lhs.multiply(lhs, "kronecker")
+        with self.assertRaises(ValueError):
+            lhs = polynomial("x + 1", F_101)
+            lhs.multiply(lhs, "foo")
+
+    def test_multiplication_strategy(self):
+        F_101 = make_prime_field(101)
+        F_998244353 = make_prime_field(998244353)
+        small = polynomial([1] * 10, F_101)
+        medium = polynomial([1] * 200, F_101)
+        large = polynomial([1] * 5000, F_101)
+        self.assertEqual(multiplication_strategy(small, large), "schoolbook")
+        self.assertEqual(multiplication_strategy(medium, large), "kronecker")
+        self.assertEqual(multiplication_strategy(large, large), "kronecker")
+        self.assertEqual(
+            multiplication_strategy(polynomial("1 + x^1000", F_101), large), "sparse"
+        )
+        with patch("helga.polynomial.KRONECKER_THRESHOLD", 10**9):
+            self.assertEqual(multiplication_strategy(medium, large), "karatsuba")
+            self.assertEqual(multiplication_strategy(large, large), "multi_ntt")
+
+        # the transform takes over from Kronecker substitution for NTT-friendly primes
+        large = polynomial([1] * 5000, F_998244353)
+        self.assertEqual(multiplication_strategy(large, large), "kronecker")
+        with patch("helga.polynomial.NTT_THRESHOLD", 4096):
+            self.assertEqual(multiplication_strategy(large, large), "ntt")
+            large = polynomial([1] * 5000, F_101)
+            self.assertEqual(multiplication_strategy(large, large), "kronecker")
+
+        medium = polynomial([1] * 200, int)
+        large = polynomial([1] * 5000, int)
+        self.assertEqual(multiplication_strategy(medium, large), "karatsuba")
+        self.assertEqual(multiplication_strategy(large, large), "multi_ntt")
+
+
+class TestDivision(unittest.TestCase):
+    def test_reversed_inverse(self):
+        F_7 = make_prime_field(7)
+        poly = polynomial("x^3 + 2x + 3", F_7)
+        inverse = poly.reversed_inverse(10)
+        # 1 + 2x^2 + 3x^3 reverses poly
+        product = inverse * polynomial("1 + 2x^2 + 3x^3", F_7)
+        self.assertEqual(product % polynomial({10: 1}, F_7), polynomial(1, F_7))
+        self.assertLess(inverse.degree, 10)
+
+        with self.assertRaises(ZeroDivisionError):
+            polynomial(0, F_7).reversed_inverse(3)
+
+    def test_newton_division(self):
+        rng = random.Random(3)
+        F_101 = make_prime_field(101)
+        for ring, make, lc in (
+            (F_101, lambda: rng.randrange(101), 5),
+            (Fraction, lambda: Fraction(rng.randint(-9, 9), rng.randint(1, 9)), 7),
+            (int, lambda: rng.randint(-9, 9), 1),
+        ):
+            divisor = polynomial([make() for _ in range(20)] + [lc], ring)
+            dividends = [
+                polynomial([make() for _ in range(n)], ring) for n in (10, 21, 50, 90)
+            ]
+            expected = [dividend / divisor for dividend in dividends]
+            with patch("helga.polynomial.NEWTON_DIVISION_THRESHOLD", 1):
+                for dividend, (quotient, remainder) in zip(dividends, expected):
+                    self.assertEqual(dividend / divisor, (quotient, remainder))
+                    self.assertEqual(dividend // divisor, quotient)
+                    self.assertEqual(dividend % divisor, remainder)
+
+
+class TestEvaluation(unittest.TestCase):
+    def test_sparse_evaluate(self):
+        F_11 = make_prime_field(11)
+        for ring, point in ((int, 3), (F_11, F_11(3)), (Fraction, Fraction(1, 2))):
+            poly = polynomial({0: 2, 5: 1, 40: 3, 100: -1}, ring)
+            self.assertEqual(poly.representation, "sparse")
+            expected = poly.with_representation("dense").evaluate(point)
+            self.assertEqual(poly.evaluate(point), expected)
+        self.assertEqual(polynomial({7: 1}).evaluate(0), 0)
+        self.assertEqual(polynomial({}, int).evaluate(5), 0)
+
+        rng = random.Random(6)
+        p = 2**61 - 1
+        F_p = make_prime_field(p)
+        terms = {rng.randrange(10**6): rng.randrange(p) for _ in range(200)}
+        poly = polynomial(terms, F_p)
+        self.assertEqual(poly.representation, "sparse")
+        point = rng.randrange(p)
+        expected = sum(c * pow(point, degree, p) for degree, c in terms.items()) % p
+        self.assertEqual(poly.evaluate(F_p(point)), F_p(expected))
+
+    def test_derivative(self):
+        self.assertEqual(
+            polynomial("1 + 4x^2 + 5x^3").derivative(), polynomial("8x + 15x^2")
+        )
+        F_5 = make_prime_field(5)
+        self.assertEqual(
+            polynomial("x^5 + 2x^3 + x", F_5).derivative(), polynomial("x^2 + 1", F_5)
+        )
+        self.assertEqual(polynomial("3", F_5).derivative(), polynomial({}, F_5))
+
+    def test_evaluate_many(self):
+        rng = random.Random(4)
+        F_p = make_prime_field(998244353)
+        for n in (0, 1, 5, 300):
+            points = [rng.randrange(998244353) for _ in range(n)]
+            poly = polynomial([rng.randrange(998244353) for _ in range(300)], F_p)
+            expected = [poly.evaluate(F_p(point)) for point in points]
+            self.assertEqual(poly.evaluate_many(points), expected)
+            tree = SubproductTree(points, make_polynomial_ring(F_p))
+            self.assertEqual(poly.evaluate_many(tree), expected)
+
+        F_9 = make_finite_field(3, 2, representation="residue")
+        points = [F_9([a, b]) for a in range(3) for b in range(3)]
+        poly = polynomial([F_9("x"), F_9(1), F_9(2), F_9("x + 1")], F_9)
+        tree = make_polynomial_ring(F_9).subproduct_tree(points)
+        self.assertEqual(
+            poly.evaluate_many(tree), [poly.evaluate(point) for point in points]
+        )
+
+    def test_interpolate(self):
+        rng = random.Random(5)
+        F_p = make_prime_field(2**61 - 1)
+        ring = make_polynomial_ring(F_p)
+        points = rng.sample(range(10**6), 100)
+        tree = ring.subproduct_tree(points)
+        for _ in range(3):
+            poly = polynomial([rng.randrange(2**61 - 1) for _ in range(100)], F_p)
+            values = poly.evaluate_many(tree)
+            self.assertEqual(ring.interpolate(tree, values), poly)
+        self.assertEqual(tree.root.degree, 100)
+
+        # fewer coefficients than points
+        poly = polynomial("3x^2 + 1", F_p)
+        values = poly.evaluate_many(points[:5])
+        self.assertEqual(ring.interpolate(points[:5], values), poly)
+
+        for field in (
+            make_finite_field(3, 2, representation="residue"),
+            make_finite_field(2, 4),
+        ):
+            ring = make_polynomial_ring(field)
+            q = field.characteristic
+            points = [field([a, b]) for a in range(q) for b in range(q)]
+            poly = polynomial([field("x"), field(1), field("x + 1")], field)
+            values = poly.evaluate_many(points)
+            self.assertEqual(ring.interpolate(points, values), poly)
+            self.assertEqual(ring.interpolate(points[:3], [1, 0, 1]).degree, 2)
+
+        ring = make_polynomial_ring(Fraction)
+        poly = ring.interpolate([0, 1, 2], [1, 2, 5])
+        self.assertEqual(poly, polynomial("x^2 + 1", Fraction))
+        self.assertEqual(ring.interpolate([], []), polynomial({}, Fraction))
+
+        with self.assertRaises(ValueError):
+            ring.interpolate([1, 1], [2, 3])
+        with self.assertRaises(ValueError):
+            ring.interpolate([1, 2], [2])
+        with self.assertRaises(ValueError):
+            make_polynomial_ring(int).interpolate([1, 2], [2, 3])
@@ -2,6 +2,8 @@ from unittest import TestCase
 from helga.projective_geometry import ProjectivePoint
 from fractions import Fraction
 
+from helga.finite_field import make_prime_field
+
 
 class TestProjectivePoint(TestCase):
     def test_construction(self):
@@ -14,3 +16,36 @@ class TestProjectivePoint(TestCase):
         point = ProjectivePoint([Fraction(1, 2), Fraction(2, 3)])
         point2 = ProjectivePoint([3, 4], field=Fraction)
         self.assertEqual(point, point2)
+
+    def test_batch(self):
+        F_7 = make_prime_field(7)
+        coords_list = [(1, 2, 3), (4, 5, 0), (0, 3, 0), (2, 2, 2)]
+        points = ProjectivePoint.batch(coords_list, F_7)
+        self.assertEqual(
+            points, [ProjectivePoint(coords, F_7) for coords in coords_list]
+        )
+        self.assertEqual(points[0].coords, (F_7(5), F_7(3), F_7(1)))
+        with self.assertRaises(ValueError):
+            ProjectivePoint.batch([(1, 2), (0, 0)], F_7)
+
+    def test_lazy_normalization(self):
+        F_7 = make_prime_field(7)
+        point = ProjectivePoint((2, 4, 6), F_7)
+        self.assertEqual(point.raw_coords, (F_7(2), F_7(4), F_7(6)))
+        self.assertIsNone(point._coords)
+        self.assertEqual(point, ProjectivePoint((1, 2, 3), F_7))
+        self.assertNotEqual(point, ProjectivePoint((1, 2, 4), F_7))
+        self.assertNotEqual(point, ProjectivePoint((1, 2, 0), F_7))
+        self.assertNotEqual(ProjectivePoint((1, 2, 0), F_7), point)
+        self.assertIsNone(point._coords)
+        self.assertEqual(point.coords, (F_7(5), F_7(3), F_7(1)))
+        self.assertEqual(point[0], F_7(5))
+        self.assertFalse(hasattr(point, "__dict__"))
+        with self.assertRaises(ValueError):
+            ProjectivePoint((0, 0, 0), F_7)
+
+    def test_hash(self):
+        point = ProjectivePoint([Fraction(1, 2), Fraction(2, 3)])
+        point2 = ProjectivePoint([3, 4], field=Fraction)
+        self.assertEqual(hash(point), hash(point2))
+        self.assertEqual(len({point, point2}), 1)